@@ -0,0 +1,87 @@
+"""
+🏅 smart_search 순위 엔진 벤치마크 (합성 문서 1만 / 10만 건)
+
+CollectionIndex의 색인 생성 시간과 검색 지연을 측정하고,
+크기 k 힙 선택(search)과 전체 일치 결과 정렬(k=None 후 정렬)을 비교합니다.
+
+실행:
+    python benchmarks/search_ranking_bench.py [문서 수 ...]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interior_agent.tools.search_index import CollectionIndex  # noqa: E402
+
+CITIES = ["대구", "서울", "부산", "경산"]
+DISTRICTS = ["수성구", "달서구", "중구", "북구", "강남구", "서초구", "해운대구"]
+TOWNS = ["범어동", "월배동", "대봉동", "역삼동", "반포동", "우동", "진천동", "만촌동"]
+COMPLEXES = ["아이파크", "래미안", "푸르지오", "자이", "힐스테이트", "e편한세상"]
+PROCESSES = ["철거", "목공", "타일", "도배", "전기", "설비", "필름"]
+NAMES = ["김민수", "이서연", "박지훈", "최유진", "정하늘", "강도윤"]
+
+
+def make_documents(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    documents = []
+    for i in range(count):
+        complex_name = rng.choice(COMPLEXES)
+        documents.append({
+            "id": f"{rng.choice(TOWNS)}{complex_name}{i}",
+            "data": {
+                "address": f"{rng.choice(CITIES)} {rng.choice(DISTRICTS)} {rng.choice(TOWNS)} {complex_name} {rng.randint(101, 120)}동 {rng.randint(1, 30)}0{rng.randint(1, 4)}호",
+                "name": rng.choice(NAMES),
+                "phone": f"010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+                "process": ", ".join(rng.sample(PROCESSES, 3)),
+                "description": f"{rng.choice(PROCESSES)} 공사 관련 문의 {i}",
+                "dataJson": f'{{"area": {rng.randint(20, 60)}, "memo": "{rng.choice(PROCESSES)} 견적 요청"}}'
+            }
+        })
+    return documents
+
+
+def time_queries(func, queries, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - started) * 1000 / (repeat * len(queries))
+
+
+def run(count: int):
+    documents = make_documents(count)
+    index = CollectionIndex("bench")
+    started = time.perf_counter()
+    for doc in documents:
+        index.add(doc)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    cases = {
+        "선택적 (단지명+호수)": ["래미안 115동", "자이 1030", "월배동아이파크"],
+        "광범위 (지역명)": ["대구", "수성구", "타일"],
+        "ID/전화번호": [documents[count // 2]["id"], documents[count // 3]["data"]["phone"]],
+    }
+
+    print(f"\n📦 문서 {count:,}건 - 색인 생성 {build_ms:,.0f}ms (n-gram {index.stats()['ngrams']:,}개)")
+    print(f"{'질의 유형':<22}{'일치 수(평균)':>14}{'top-5 힙 ms':>14}{'전체 정렬 ms':>14}")
+    for label, queries in cases.items():
+        totals = [index.search(query, k=5)[1] for query in queries]
+        heap_ms = time_queries(lambda q: index.search(q, k=5), queries, repeat=5)
+        sort_ms = time_queries(
+            lambda q: sorted(index.search(q, k=None)[0], key=lambda hit: hit.score, reverse=True)[:5],
+            queries, repeat=5
+        )
+        print(f"{label:<22}{sum(totals) // len(totals):>14,}{heap_ms:>14.2f}{sort_ms:>14.2f}")
+
+    top_hit = index.search("래미안 115동", k=1)[0][0]
+    print(f"   예시 점수 근거: {top_hit.doc['id']} → {top_hit.explanation()}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,140 @@
+"""
+⏱️ 세션 라우팅 미들웨어 마이크로 벤치마크
+
+이전 방식(@app.middleware("http") + 본문 json.loads)과
+현재 방식(순수 ASGI SessionRoutingMiddleware + 헤더 라우팅)의 초당 처리량을 비교합니다.
+
+네트워크/LLM 영향을 없애기 위해 같은 모양의 최소 FastAPI 앱 두 개를 만들고
+httpx.ASGITransport로 프로세스 안에서 직접 호출합니다.
+
+실행:
+    python benchmarks/session_routing_bench.py [요청 수] [동시 요청 수]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MCP_WARMUP_ENABLED", "false")
+
+from simple_api_server import SessionRoutingMiddleware, route_chat_request  # noqa: E402
+
+
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = "default"
+
+
+def fake_resolve(session_id: str):
+    """get_agent_by_session_id와 같은 모양의 라우팅 (에이전트 대신 문자열)"""
+    if session_id.startswith("customer-service-"):
+        return "as_root_agent", "as_root_agent", "as_runner"
+    if session_id.startswith("estimate-consultation-"):
+        return "estimate_root_agent", "estimate_root_agent", "estimate_runner"
+    return "root_agent", "all_agents", "runner"
+
+
+def add_routes(app: FastAPI, route):
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.post("/chat")
+    async def chat(request: ChatRequest, req: Request):
+        _, agent_type, _, session_id = route(req, request)
+        return {"response": request.message, "agent_type": agent_type, "session_id": session_id}
+
+
+def build_legacy_app() -> FastAPI:
+    """이전 방식: BaseHTTPMiddleware가 /chat 본문을 읽어 session_id를 찾음"""
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def session_routing_middleware(request: Request, call_next):
+        if request.method == "POST" and request.url.path == "/chat":
+            body = await request.body()
+            session_id = json.loads(body.decode()).get("session_id", "") if body else "default"
+        else:
+            session_id = "default"
+        selected_agent, agent_type, selected_runner = fake_resolve(session_id)
+        request.state.selected_agent = selected_agent
+        request.state.agent_type = agent_type
+        request.state.selected_runner = selected_runner
+        request.state.session_id = session_id
+        response = await call_next(request)
+        response.headers["X-Agent-Type"] = agent_type
+        response.headers["X-Session-ID"] = session_id
+        return response
+
+    add_routes(app, lambda req, request: (
+        req.state.selected_agent, req.state.agent_type, req.state.selected_runner, req.state.session_id
+    ))
+    return app
+
+
+def build_asgi_app() -> FastAPI:
+    """현재 방식: 순수 ASGI 미들웨어, 본문은 ChatRequest가 한 번만 파싱"""
+    app = FastAPI()
+    app.add_middleware(SessionRoutingMiddleware, resolve=fake_resolve)
+    # 벤치마크용 앱에서도 실제 서버와 같은 route_chat_request 사용 (라우터만 교체)
+    import simple_api_server
+    simple_api_server.get_agent_by_session_id = fake_resolve
+    add_routes(app, lambda req, request: route_chat_request(req, request.session_id))
+    return app
+
+
+async def measure(app: FastAPI, method: str, path: str, total: int, concurrency: int, **kwargs) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 워밍업
+        for _ in range(50):
+            await client.request(method, path, **kwargs)
+
+        remaining = total
+        lock = asyncio.Lock()
+
+        async def worker():
+            nonlocal remaining
+            while True:
+                async with lock:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                response = await client.request(method, path, **kwargs)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+async def main(total: int, concurrency: int):
+    chat_body = {"message": "안녕하세요, AS 접수하려고요", "session_id": "customer-service-bench"}
+    cases = [
+        ("GET /health", "GET", "/health", {}),
+        ("POST /chat (본문 session_id)", "POST", "/chat", {"json": chat_body}),
+        ("POST /chat (X-Session-ID 헤더)", "POST", "/chat",
+         {"json": chat_body, "headers": {"X-Session-ID": "customer-service-bench"}}),
+    ]
+    apps = [("BaseHTTPMiddleware (이전)", build_legacy_app()), ("순수 ASGI (현재)", build_asgi_app())]
+
+    print(f"\n요청 {total}건, 동시 {concurrency}개")
+    print(f"{'케이스':<34}{'미들웨어':<28}{'req/s':>10}")
+    for label, method, path, kwargs in cases:
+        for app_label, app in apps:
+            rps = await measure(app, method, path, total, concurrency, **kwargs)
+            print(f"{label:<34}{app_label:<28}{rps:>10.0f}")
+
+
+if __name__ == "__main__":
+    total_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    concurrency_level = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    asyncio.run(main(total_requests, concurrency_level))
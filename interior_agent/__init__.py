@@ -11,6 +11,7 @@
 - agent: 메인 에이전트 및 Runner
 - agents: 하위 에이전트들 (firebase, email)
 - tools: 도구들 (mcp_client)
+- sessions: 세션 관리 (대화 히스토리 / ADK 세션 저장소 - memory | sqlite | redis)
 """
 
 from .agent import root_agent, runner, session_service
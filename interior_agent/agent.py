@@ -31,6 +31,7 @@
 - sub_agents 패턴: firebase_agent, email_agent, as_agent 관리
 - 세션 관리: ADK 표준 세션 서비스 사용
 - 도구 없음: 모든 기능은 하위 에이전트가 담당
+- 키워드 사전 라우터: 키워드가 하위 에이전트 하나만 가리키면 라우팅 LLM 호출 없이 직접 실행 (keyword_router)
 
 ✨ 95점 ADK 표준 준수:
 - 완전한 하위 에이전트 패턴 구현
@@ -47,9 +48,28 @@
 """
 
 from google.adk.agents import LlmAgent
-from google.adk.sessions import InMemorySessionService  
+from .sessions import create_adk_session_service
 from google.adk.runners import Runner
 from .agents import firebase_agent, email_agent, as_agent
+from .tools.keyword_router import KeywordRouter
+
+# ========================================
+# 🔑 라우팅 키워드 (instruction과 키워드 사전 라우터가 같은 목록 사용)
+# ========================================
+
+FIREBASE_KEYWORDS = (
+    "조회", "리스트", "목록", "상세", "추가", "수정", "삭제", "컬렉션", "문서", "주소", "견적서",
+    "estimateVersionsV3", "addressesJson", "데이터", "정보", "찾아줘", "검색"
+)
+EMAIL_KEYWORDS = (
+    "이메일", "email", "전송", "발송", "메일", "mail", "보내기", "서버", "연결", "테스트", "test"
+)
+AS_KEYWORDS = (
+    "AS 요청", "AS 접수", "AS 신청", "A/S", "하자", "고장", "수리 요청"
+)
+
+def quote_keywords(keywords) -> str:
+    return ", ".join(f'"{keyword}"' for keyword in keywords)
 
 # ========================================
 # 🤖 메인 에이전트 정의 (ADK 표준)
@@ -67,7 +87,7 @@ root_agent = LlmAgent(
     # ========================================
     # 📋 라우팅 전담 Instructions
     # ========================================
-    instruction='''
+    instruction=f'''
 🏠 인테리어 전문가 메인 에이전트입니다! 
 
 🚨 **절대 규칙: 라우팅 전담! 직접 처리 금지!**
@@ -78,13 +98,17 @@ root_agent = LlmAgent(
 ## 🎯 **명확한 라우팅 규칙**
 
 ### 🔥 Firebase 키워드 감지 시 → firebase_agent 호출
-**키워드**: "조회", "리스트", "목록", "상세", "추가", "수정", "삭제", "컬렉션", "문서", "주소", "견적서", "estimateVersionsV3", "addressesJson", "데이터", "정보", "찾아줘", "검색"
+**키워드**: {quote_keywords(FIREBASE_KEYWORDS)}
 **처리 방법**: 즉시 firebase_agent에게 질문 전달 (instruction으로 한글 포맷팅 자동 처리)
 
 ### 📧 Email 키워드 감지 시 → email_agent 호출  
-**키워드**: "이메일", "email", "전송", "발송", "메일", "mail", "보내기", "서버", "연결", "테스트", "test"
+**키워드**: {quote_keywords(EMAIL_KEYWORDS)}
 **처리 방법**: 즉시 email_agent에게 질문 전달
 
+### 🔧 AS 키워드 감지 시 → as_agent 호출
+**키워드**: {quote_keywords(AS_KEYWORDS)}
+**처리 방법**: 즉시 as_agent에게 질문 전달
+
 ## 🔄 **라우팅 처리 방식**
 1. 사용자 질문 분석
 2. 키워드 매칭
@@ -111,7 +135,7 @@ root_agent = LlmAgent(
 # ========================================
 
 # ADK 표준 세션 서비스
-session_service = InMemorySessionService()
+session_service = create_adk_session_service()  # SESSION_BACKEND (sqlite 기본 - 워커 간 공유)
 
 # ADK 표준 Runner
 runner = Runner(
@@ -120,6 +144,26 @@ runner = Runner(
     session_service=session_service
 )
 
+# ========================================
+# 🚦 키워드 사전 라우터 + 하위 에이전트 직접 실행 Runner
+# ========================================
+# 키워드가 하위 에이전트 하나만 가리키면 라우팅 LLM 호출 없이 해당 에이전트를 바로 실행합니다.
+# 같은 app_name / 세션 서비스를 쓰므로 세션 이벤트가 이어지고,
+# 다음 턴에는 메인 runner도 마지막으로 응답한 하위 에이전트에서 이어서 실행합니다.
+keyword_router = KeywordRouter(
+    {
+        firebase_agent.name: FIREBASE_KEYWORDS,
+        email_agent.name: EMAIL_KEYWORDS,
+        as_agent.name: AS_KEYWORDS,
+    },
+    sticky_agents=[as_agent.name]  # AS 접수는 여러 턴 절차 - 진행 중에는 키워드로 가로채지 않음
+)
+
+direct_runners = {
+    agent.name: Runner(agent=agent, app_name="interior_agent", session_service=session_service)
+    for agent in (firebase_agent, email_agent, as_agent)
+}
+
 # ========================================
 # 📤 모듈 Export
 # ========================================
@@ -127,7 +171,9 @@ runner = Runner(
 __all__ = [
     'root_agent',
     'runner', 
-    'session_service'
+    'session_service',
+    'keyword_router',
+    'direct_runners'
 ]
 
 # ========================================
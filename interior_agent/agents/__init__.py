@@ -5,14 +5,17 @@
 - firebase_agent: Firebase/Firestore 전문 처리 (instruction만으로 한글 포맷팅)
 - email_agent: 견적서 이메일 전송 전문 처리
 - as_agent: 친절한 AS 응대 전문 처리
+- as_workflow: AS 접수 상태 기계 (단계 안내는 고정 문구, LLM은 문제 내용 정리에만 사용)
 """
 
 from .firebase_agent import firebase_agent
 from .email_agent import email_agent
 from .as_agent import as_agent
+from .as_workflow import as_workflow
 
 __all__ = [
     'firebase_agent',
     'email_agent',
-    'as_agent'
+    'as_agent',
+    'as_workflow'
 ] 
\ No newline at end of file
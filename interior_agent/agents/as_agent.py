@@ -29,15 +29,14 @@ from ..tools.mcp_client import firebase_client
 # 🔧 AS 요청 Firebase 저장 도구
 # ========================================
 
-async def save_as_request(address: str, phone: str, problem: str, session_id: Optional[str] = None):
-    """AS 요청을 Firebase에 저장 (주소, 전화번호, 문제 내용)"""
-    try:
-        # 현재 날짜시간 기반 문서명 생성
-        now = datetime.now()
-        doc_name = f"as_{now.strftime('%Y%m%d_%H%M%S_%f')[:17]}"  # as_20250106_022015_001
-        
-        # MMS 템플릿
-        mms_template = f"""🔧 A/S 접수 알림
+async def store_as_request(address: str, phone: str, problem: str, session_id: Optional[str] = None) -> str:
+    """AS 요청을 Firebase에 저장하고 접수번호 반환 (실패 시 예외 - as_workflow와 도구 공용)"""
+    # 현재 날짜시간 기반 문서명 생성
+    now = datetime.now()
+    doc_name = f"as_{now.strftime('%Y%m%d_%H%M%S_%f')[:17]}"  # as_20250106_022015_001
+    
+    # MMS 템플릿
+    mms_template = f"""🔧 A/S 접수 알림
 
 안녕하세요, 이사님.
 고객님 A/S 건이 발생 되었습니다.
@@ -49,23 +48,31 @@ async def save_as_request(address: str, phone: str, problem: str, session_id: Op
 관련 업체에 연락 한번번 부탁드려도 될까요?
 
 항상 감사드리고, 사랑합니다."""
-        
-        # 저장할 데이터 (1행 JSON 문자열 형태)
-        as_data = {
-            "address": address,
-            "phone": phone,
-            "problem": problem,
-            "mmsTemplate": mms_template,
-            "createdAt": now.isoformat()
-        }
-        
-        # Firebase에 저장
-        result = await firebase_client.call_tool("firestore_add_document", {
-            "collection": "asRequests",
-            "data": {"content": json.dumps(as_data, ensure_ascii=False)}
-        }, session_id)
-        
-        print(f"✅ AS 요청 저장 완료: {doc_name}")
+    
+    # 저장할 데이터 (1행 JSON 문자열 형태)
+    as_data = {
+        "address": address,
+        "phone": phone,
+        "problem": problem,
+        "mmsTemplate": mms_template,
+        "createdAt": now.isoformat()
+    }
+    
+    # Firebase에 저장
+    result = await firebase_client.call_tool("firestore_add_document", {
+        "collection": "asRequests",
+        "data": {"content": json.dumps(as_data, ensure_ascii=False)}
+    }, session_id)
+    if isinstance(result, dict) and result.get("error"):
+        raise RuntimeError(str(result["error"]))
+    
+    print(f"✅ AS 요청 저장 완료: {doc_name}")
+    return doc_name
+
+async def save_as_request(address: str, phone: str, problem: str, session_id: Optional[str] = None):
+    """AS 요청을 Firebase에 저장 (주소, 전화번호, 문제 내용)"""
+    try:
+        doc_name = await store_as_request(address, phone, problem, session_id)
         return f"AS 요청이 저장되었습니다. (접수번호: {doc_name})"
         
     except Exception as e:
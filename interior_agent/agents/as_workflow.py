@@ -0,0 +1,507 @@
+"""
+🔧 AS 접수 상태 기계 - 단계 안내는 즉시, LLM은 문제 내용 정리에만 사용
+
+🎯 목적:
+as_agent의 5단계 AS 접수(주소 → 전화번호 → 문제 내용 → 누수 응급 확인 → save_as_request)는
+긴 instruction 하나로 모델이 진행했습니다. 단계마다 Gemini 호출이 한 번씩 들어가 몇 초씩 걸렸고,
+"2번 기회" 규칙도 모델이 지켜주기를 기대할 수밖에 없었습니다.
+
+🔧 동작 방식:
+- 세션별 상태(ASIntakeState): ADDRESS → PHONE → PROBLEM → 종료(접수/거절)
+- 주소/전화번호는 미리 컴파일한 정규식으로 검사, 2번 틀리면 접수 거절 (3번째 기회 없음)
+- 누수 키워드(누수, 물새요, 물이 나와요 …)는 Aho-Corasick으로 검사해 응급 안내
+- 단계 안내 문구는 as_agent instruction과 같은 고정 문구 (모델 호출 없음)
+- 문제 내용만 LLM으로 맞춤법/띄어쓰기 정리 (시간 제한, 실패 시 원문 사용)
+- 마지막 단계에서 store_as_request를 직접 호출해 Firebase에 저장
+- use_store(): 진행 상태를 세션 저장소(SQLite/Redis)에 보관 - 다음 턴이 다른 워커/인스턴스로 가도 이어서 접수
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Set
+
+from ..tools.korean_text import normalize_digits, normalize_text
+from ..tools.keyword_router import AhoCorasick
+from .as_agent import as_agent, store_as_request
+
+# ========================================
+# 📋 단계 / 고정 안내 문구 (as_agent instruction과 동일)
+# ========================================
+
+STEP_ADDRESS = "address"
+STEP_PHONE = "phone"
+STEP_PROBLEM = "problem"
+STEP_DONE = "done"  # 접수/거절로 끝남 (상태 삭제)
+
+STATE_NAMESPACE = "as_workflow"  # 세션 저장소 기록 네임스페이스
+
+MAX_ATTEMPTS = 2  # 주소/전화번호 입력 기회 (2번 틀리면 접수 거절)
+
+GREETING_PROMPT = """안녕하세요. 아마레 AS 팀 입니다.
+
+AS 신청하실 현장 주소를 말씀해주세요.
+
+예시: 월배아이파크 1차 100동 2000호"""
+
+ADDRESS_RETRY_PROMPT = """죄송합니다. 정확한 주소를 입력해주세요.
+
+예시:
+• 월배아이파크 1차 100동 2000호
+• 서울시 강남구 역삼동 123-45
+• 대구시 달서구 월배로 123
+
+다시 한 번 현장 주소를 말씀해주세요."""
+
+ADDRESS_REJECT_MESSAGE = """죄송합니다. 정확한 주소 없이는 AS 접수가 어렵습니다.
+주소를 정확히 확인하신 후 다시 연락 주시기 바랍니다.
+
+감사합니다."""
+
+PHONE_PROMPT = """네, 확인되었습니다.
+등록된 주소: {address}
+
+연락받으실 전화번호를 알려주세요.
+
+예시: 010-1234-5678"""
+
+PHONE_RETRY_PROMPT = """죄송합니다. 정확한 전화번호를 입력해주세요.
+
+예시:
+• 010-1234-5678
+• 010-9876-5432
+• 02-123-4567
+
+다시 한 번 연락받으실 전화번호를 말씀해주세요."""
+
+PHONE_REJECT_MESSAGE = """죄송합니다. 정확한 연락처 없이는 AS 접수가 어렵습니다.
+연락처를 정확히 확인하신 후 다시 연락 주시기 바랍니다.
+
+감사합니다."""
+
+PROBLEM_PROMPT = """네, 확인되었습니다.
+연락처: {phone}
+
+어떤 문제가 발생했는지 최대한 자세하게 말씀해주세요.
+
+정확한 진단을 위해 다음 내용을 포함해서 설명해주시면 더 좋습니다:
+• 문제가 발생한 정확한 위치 (예: 거실, 방, 화장실 등)
+• 언제부터 문제가 시작되었는지
+• 어떤 상황에서 발생하는지
+• 크기나 정도는 어느 정도인지
+
+예시:
+• 안방 벽지가 어제부터 갑자기 찢어져서 3cm 정도 떨어져 있어요.
+• 거실 메인 조명이 일주일 전부터 켜지지 않고, 스위치를 눌러도 반응이 없어요."""
+
+PROBLEM_RETRY_PROMPT = "어떤 문제가 발생했는지 말씀해주세요."
+
+EMERGENCY_MESSAGE = """[응급] 누수 상황이시군요.
+이건 응급상황입니다. 더 큰 피해가 생기기 전에
+즉시 010-8694-4078로 전화해주세요.
+
+지금 당장 연락 안 되시면 카카오톡으로 사진 찍어서 보내주시고,
+우선 물이 더 새지 않도록 수도 밸브를 잠궈주시기 바랍니다.
+
+빠르게 해결해드리겠습니다."""
+
+COMPLETE_MESSAGE = """AS 요청이 접수되었습니다.
+
+[접수 내용]
+• 현장: {address}
+• 연락처: {phone}
+• 문제: {problem}
+
+담당 기술자분이 확인하시고 직접 연락드릴 예정입니다.
+
+감사합니다. 좋은 하루 되세요."""
+
+SAVE_FAILED_MESSAGE = """죄송합니다. 접수 내용을 저장하는 중 문제가 발생했습니다.
+잠시 후 다시 말씀해주시면 바로 접수해드리겠습니다."""
+
+# ========================================
+# ✅ 입력 검사기 (모듈 로드 시 한 번만 컴파일)
+# ========================================
+
+# 휴대전화 / 지역번호 / 인터넷전화 (+82 국제 형식 포함, 구분자는 공백·하이픈·점·괄호)
+PHONE_AREA_CODES = ("10", "11", "16", "17", "18", "19", "31", "32", "33", "41", "42", "43", "44",
+                    "51", "52", "53", "54", "55", "61", "62", "63", "64", "70", "2")
+PHONE_PATTERN = re.compile(
+    r"(?<!\d)(?:\+?82[\s.-]*\(?0?\)?|\(?0)(" + "|".join(PHONE_AREA_CODES) + r")\)?[\s.-]*(\d{3,4})[\s.-]*(\d{4})(?!\d)"
+)
+
+# 주소 표지: 동·호수, 번지, 공동주택 이름
+ADDRESS_PATTERN = re.compile(
+    r"\d+\s*(?:동|호|층|번지|단지|차|블록|가)"
+    r"|\d+-\d+"
+    r"|아파트|빌라|오피스텔|맨션|타운|캐슬|자이|푸르지오|아이파크|래미안|힐스테이트|더샵|롯데캐슬|e편한세상"
+)
+
+# 행정구역/도로명 낱말 - 조사("저도", "집으로", "아마도")와 구분하도록
+# - 접미사 앞에 한글 2음절 이상인 낱말 전체 ("달서구", "역삼동" / "저도", "우리" 제외)
+# - 도는 도 이름만, 로/길은 뒤에 건물 번호가 올 때만 ("월배로 123" / "학교로 와주세요" 제외)
+PLACE_TOKEN_PATTERN = re.compile(
+    r"(?<![가-힣])[가-힣]{2,}?(?:특별시|광역시|특별자치시|특별자치도|시|구|군|읍|면|동|리)(?=\s|\d|$)"
+    r"|(?<![가-힣])(?:경기|강원|충청[남북]|전라[남북]|경상[남북]|제주)도(?=\s|\d|$)"
+    r"|(?<![가-힣])[가-힣]{2,}(?:로|길)(?=\s*\d)"
+)
+# 접미사처럼 보이는 조사/어미로 끝나는 낱말 ("집으로", "그러면", "친구에도")
+PARTICLE_ENDINGS = ("으로", "에도", "저도", "으면", "러면", "려면", "하면", "다면", "라면", "니면")
+ADDRESS_MIN_LENGTH = 4  # 정규화 후 최소 글자 수
+
+# 주소/전화번호 대신 자주 들어오는 답변
+NON_ANSWERS = frozenset(normalize_text(word) for word in (
+    "모름", "몰라요", "모르겠어요", "없음", "없어요", "나중에", "집", "우리집", "회사", "아니요", "싫어요"
+))
+
+# 누수 응급 키워드 (공백 제거 후 비교: "물 새요" → "물새요")
+LEAK_KEYWORDS = (
+    "누수", "물새", "물이새", "물샘", "물이샘", "물나와", "물이나와", "물나오", "물이나오",
+    "물흘러", "물이흘러", "물떨어", "물이떨어", "물방울", "뚝뚝", "새요", "새고있", "젖어", "젖었", "물고여", "물이고여", "물고였", "물이고였"
+)
+LEAK_MATCHER = AhoCorasick({normalize_text(keyword): keyword for keyword in LEAK_KEYWORDS})
+
+
+def normalize_input(text: str) -> str:
+    """입력 정규화 - NFKC(전각 문자) + 숫자 정규화 + 앞뒤 공백 제거"""
+    return normalize_digits(unicodedata.normalize("NFKC", str(text))).strip()
+
+
+def parse_phone(text: str) -> Optional[str]:
+    """전화번호 추출 → "010-1234-5678" 형식 (없거나 형식이 틀리면 None)"""
+    match = PHONE_PATTERN.search(normalize_input(text))
+    if match is None:
+        return None
+    area, middle, last = match.groups()
+    if area == "10" and len(middle) != 4:
+        return None  # 010은 가운데 4자리
+    return f"0{area}-{middle}-{last}"
+
+
+def parse_address(text: str) -> Optional[str]:
+    """주소 검사 → 공백을 정리한 주소 (주소가 아니면 None)"""
+    address = " ".join(normalize_input(text).split())
+    normalized = normalize_text(address)
+    if len(normalized) < ADDRESS_MIN_LENGTH or normalized in NON_ANSWERS:
+        return None
+    if not any("가" <= ch <= "힣" for ch in normalized):
+        return None  # 숫자/자음만 ("1234", "ㄱㄴㄷㄹ")
+    if ADDRESS_PATTERN.search(address) is None and not any(
+        not match.group().endswith(PARTICLE_ENDINGS) for match in PLACE_TOKEN_PATTERN.finditer(address)
+    ):
+        return None
+    return address
+
+
+def detect_leak(text: str) -> Optional[str]:
+    """누수 키워드가 있으면 그 키워드 반환"""
+    for _start, _end, _pattern, keyword in LEAK_MATCHER.find_all(normalize_text(text)):
+        return keyword
+    return None
+
+
+# ========================================
+# 🧹 문제 내용 정리 (LLM - 유일한 모델 호출)
+# ========================================
+
+PROBLEM_CLEANUP_PROMPT = """다음은 고객이 채팅으로 입력한 인테리어 AS 문제 설명입니다.
+맞춤법, 띄어쓰기, 문장부호만 다듬어 한 문단으로 출력하세요.
+내용을 추가하거나 빼지 말고, 설명이나 인사말 없이 정리된 문장만 출력하세요.
+
+고객 입력: {problem}"""
+
+
+class ProblemCleaner:
+    """문제 내용 맞춤법 정리 - 시간 제한 안에 끝나지 않거나 실패하면 원문 사용"""
+
+    def __init__(self, model: str, timeout: float = 4.0, enabled: bool = True):
+        self.model = model
+        self.timeout = timeout
+        self.enabled = enabled
+        self._client = None
+        self.calls = 0
+        self.failures = 0
+        self.total_ms = 0.0
+
+    def _get_client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client()
+        return self._client
+
+    async def clean(self, problem: str) -> str:
+        if not self.enabled:
+            return problem
+        started = time.monotonic()
+        self.calls += 1
+        try:
+            response = await asyncio.wait_for(
+                self._get_client().aio.models.generate_content(
+                    model=self.model,
+                    contents=PROBLEM_CLEANUP_PROMPT.format(problem=problem)
+                ),
+                timeout=self.timeout
+            )
+            cleaned = " ".join((response.text or "").split())
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ AS 문제 내용 정리 실패 - 원문 사용: {type(e).__name__}: {e}")
+            return problem
+        finally:
+            self.total_ms += (time.monotonic() - started) * 1000
+        # 빈 응답이나 내용이 크게 늘어난 응답(설명 추가)은 버림
+        if not cleaned or len(cleaned) > len(problem) * 2 + 20:
+            self.failures += 1
+            return problem
+        return cleaned
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "failures": self.failures,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0
+        }
+
+
+# ========================================
+# 🔄 세션별 상태 기계
+# ========================================
+
+class ASIntakeState:
+    """세션 하나의 AS 접수 진행 상태"""
+
+    __slots__ = ("step", "address", "phone", "attempts", "updated_at")
+
+    def __init__(self):
+        self.step = STEP_ADDRESS
+        self.address: Optional[str] = None
+        self.phone: Optional[str] = None
+        self.attempts = 0  # 현재 단계에서 틀린 횟수
+        self.updated_at = time.time()  # 벽시계 (다른 워커가 저장한 상태도 같은 기준으로 만료 판단)
+
+    def to_json(self) -> str:
+        return json.dumps({name: getattr(self, name) for name in self.__slots__}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ASIntakeState":
+        state = cls()
+        for name, value in json.loads(raw).items():
+            if name in cls.__slots__:
+                setattr(state, name, value)
+        return state
+
+
+class ASIntakeWorkflow:
+    """
+    AS 접수 상태 기계
+
+    start()로 접수를 시작하고, 접수가 끝날 때까지 같은 세션의 메시지는 handle()로 처리합니다.
+    접수(저장 완료) 또는 거절로 끝나면 세션 상태를 지웁니다.
+    use_store()로 세션 저장소를 지정하면 진행 상태를 저장소에 두어 다른 워커/인스턴스에서도 이어집니다.
+    """
+
+    def __init__(self, cleaner: ProblemCleaner, ttl_seconds: float = 1800.0):
+        self.cleaner = cleaner
+        self.ttl_seconds = ttl_seconds  # 이 시간 동안 입력이 없으면 진행 중 접수 폐기
+        self.store = None  # 세션 저장소 (None이면 프로세스 메모리)
+        self._states: Dict[str, ASIntakeState] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}  # 같은 세션 메시지가 동시에 들어와도 단계가 꼬이지 않도록 (워커별)
+        self.counters = {"started": 0, "completed": 0, "rejected": 0, "emergencies": 0,
+                         "save_failures": 0, "expired": 0}
+        self.turns = 0
+        self.turn_ms_total = 0.0
+
+    def use_store(self, store):
+        """진행 상태를 세션 저장소(기록 네임스페이스 as_workflow)에 보관"""
+        if store.backend != "memory":
+            self.store = store
+
+    # ========================================
+    # 상태 보관 (메모리 / 세션 저장소)
+    # ========================================
+
+    def _load(self, session_id: str) -> Optional[ASIntakeState]:
+        if self.store is None:
+            return self._states.get(session_id)
+        raw = self.store.get_record(STATE_NAMESPACE, session_id)
+        return ASIntakeState.from_json(raw) if raw is not None else None
+
+    def _save(self, session_id: str, state: ASIntakeState):
+        state.updated_at = time.time()
+        if self.store is None:
+            self._states[session_id] = state
+        else:
+            self.store.put_record(STATE_NAMESPACE, session_id, state.to_json())
+
+    def _discard(self, session_id: str):
+        self._states.pop(session_id, None)
+        if self.store is not None:
+            self.store.delete_record(STATE_NAMESPACE, session_id)
+
+    def _session_ids(self):
+        if self.store is None:
+            return list(self._states)
+        return self.store.list_record_keys(STATE_NAMESPACE)
+
+    def _is_expired(self, state: ASIntakeState) -> bool:
+        return time.time() - state.updated_at > self.ttl_seconds
+
+    async def _io(self, fn, *args):
+        """상태 보관 호출 - 세션 저장소면 store.offload()로 스레드에서 실행 (이벤트 루프를 막지 않음)"""
+        if self.store is None:
+            return fn(*args)
+        return await self.store.offload(fn, *args)
+
+    # ========================================
+    # 접수 진행
+    # ========================================
+
+    async def is_active(self, session_id: str) -> bool:
+        state = await self._io(self._load, session_id)
+        if state is None:
+            return False
+        if self._is_expired(state):
+            await self._io(self._expire, session_id)
+            return False
+        return True
+
+    async def start(self, session_id: str) -> str:
+        """새 접수 시작 → 주소 요청 안내"""
+        await self._prune()
+        await self._io(self._save, session_id, ASIntakeState())
+        self.counters["started"] += 1
+        print(f"🔧 AS 접수 시작: 세션 {session_id}")
+        return GREETING_PROMPT
+
+    async def reset(self, session_id: str):
+        await self._io(self._discard, session_id)
+
+    async def handle(self, session_id: str, message: str) -> str:
+        """진행 중인 접수에 사용자 입력 한 건 적용 → 다음 안내 문구"""
+        started = time.monotonic()
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            state = await self._io(self._load, session_id)
+            if state is None or self._is_expired(state):
+                return await self.start(session_id)  # 기다리는 동안 앞 메시지로 접수가 끝남
+            if state.step == STEP_ADDRESS:
+                reply = await self._handle_address(session_id, state, message)
+            elif state.step == STEP_PHONE:
+                reply = await self._handle_phone(session_id, state, message)
+            else:
+                reply = await self._handle_problem(session_id, state, message)
+            if state.step != STEP_DONE:
+                await self._io(self._save, session_id, state)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.turns += 1
+        self.turn_ms_total += elapsed_ms
+        print(f"🔧 AS 접수 단계 처리: 세션 {session_id} → {state.step} ({elapsed_ms:.1f}ms)")
+        return reply
+
+    async def _handle_address(self, session_id: str, state: ASIntakeState, message: str) -> str:
+        address = parse_address(message)
+        if address is None:
+            return await self._retry_or_reject(session_id, state, ADDRESS_RETRY_PROMPT, ADDRESS_REJECT_MESSAGE)
+        state.address = address
+        state.step = STEP_PHONE
+        state.attempts = 0
+        return PHONE_PROMPT.format(address=address)
+
+    async def _handle_phone(self, session_id: str, state: ASIntakeState, message: str) -> str:
+        phone = parse_phone(message)
+        if phone is None:
+            return await self._retry_or_reject(session_id, state, PHONE_RETRY_PROMPT, PHONE_REJECT_MESSAGE)
+        state.phone = phone
+        state.step = STEP_PROBLEM
+        state.attempts = 0
+        return PROBLEM_PROMPT.format(phone=phone)
+
+    async def _handle_problem(self, session_id: str, state: ASIntakeState, message: str) -> str:
+        problem = " ".join(normalize_input(message).split())
+        if not normalize_text(problem):
+            return PROBLEM_RETRY_PROMPT
+
+        # 누수는 저장 성공 여부와 관계없이 응급 안내를 먼저 보여줌
+        leak_keyword = detect_leak(problem)
+        prefix = ""
+        if leak_keyword is not None:
+            self.counters["emergencies"] += 1
+            print(f"🚨 누수 응급 감지: 세션 {session_id} (키워드 '{leak_keyword}')")
+            prefix = f"{EMERGENCY_MESSAGE}\n\n"
+
+        problem = await self.cleaner.clean(problem)
+        try:
+            await store_as_request(state.address, state.phone, problem, session_id)
+        except Exception as e:
+            # 입력한 주소/전화번호는 유지하고 문제 내용 단계에서 다시 시도
+            self.counters["save_failures"] += 1
+            print(f"❌ AS 요청 저장 실패: {e}")
+            return prefix + SAVE_FAILED_MESSAGE
+
+        self.counters["completed"] += 1
+        await self._finish(session_id, state)
+        return prefix + COMPLETE_MESSAGE.format(address=state.address, phone=state.phone, problem=problem)
+
+    async def _retry_or_reject(self, session_id: str, state: ASIntakeState, retry_prompt: str, reject_message: str) -> str:
+        state.attempts += 1
+        if state.attempts < MAX_ATTEMPTS:
+            return retry_prompt
+        self.counters["rejected"] += 1
+        print(f"🚫 AS 접수 거절: 세션 {session_id} ({state.step} {MAX_ATTEMPTS}회 오류)")
+        await self._finish(session_id, state)
+        return reject_message
+
+    async def _finish(self, session_id: str, state: ASIntakeState):
+        state.step = STEP_DONE
+        await self._io(self._discard, session_id)
+
+    def _expire(self, session_id: str):
+        self._discard(session_id)
+        self.counters["expired"] += 1
+
+    def _expire_stale(self) -> Set[str]:
+        """만료된 접수 폐기 → 진행 중인 세션 ID (상태 보관 I/O - _io로 호출)"""
+        active = set()
+        for session_id in self._session_ids():
+            state = self._load(session_id)
+            if state is None:
+                continue
+            if self._is_expired(state):
+                self._expire(session_id)
+            else:
+                active.add(session_id)
+        return active
+
+    async def _prune(self):
+        active = await self._io(self._expire_stale)
+        # 진행 중이 아닌 세션의 잠금 정리
+        for session_id, lock in list(self._locks.items()):
+            if not lock.locked() and session_id not in active:
+                del self._locks[session_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "active_sessions": len(self._session_ids()),
+            "shared_store": self.store.backend if self.store is not None else None,
+            "turns": self.turns,
+            "avg_turn_ms": round(self.turn_ms_total / self.turns, 1) if self.turns else 0.0,
+            "problem_cleanup": self.cleaner.stats()
+        }
+
+
+def create_as_workflow() -> ASIntakeWorkflow:
+    """환경변수 설정으로 AS 접수 상태 기계 생성"""
+    cleaner = ProblemCleaner(
+        model=as_agent.model,
+        timeout=float(os.getenv("AS_PROBLEM_CLEANUP_TIMEOUT", "4")),
+        enabled=os.getenv("AS_PROBLEM_CLEANUP_ENABLED", "true").lower() != "false"
+    )
+    return ASIntakeWorkflow(cleaner, ttl_seconds=float(os.getenv("AS_WORKFLOW_TTL_SECONDS", "1800")))
+
+
+as_workflow = create_as_workflow()
@@ -2,11 +2,31 @@
 Firebase 전문 에이전트 - MCP 서버 고급 기능 200% 활용
 """
 
+import copy
 import json
 from typing import Optional, Dict, Any, List
 from google.adk.agents import LlmAgent
 from google.adk.tools import FunctionTool
 from ..tools.mcp_client import firebase_client
+from ..tools.search_index import firebase_search_index, SearchIndexError
+from ..tools.firestore_mirror import firestore_mirror, MIRROR_PAGE_TOKEN_PREFIX
+
+# ========================================
+# 🪞 로컬 미러 읽기 (FIRESTORE_MIRROR_ENABLED=true일 때)
+# ========================================
+
+def _mirror_for(collection: str, force_remote: bool):
+    """미러로 응답할 수 있으면 미러, 아니면 None (force_remote=True, 하위 컬렉션 경로, 허용 지연 초과 시 원격)"""
+    if force_remote or firestore_mirror is None or "/" in collection.strip("/") or not firestore_mirror.serves(collection):
+        return None
+    if not firestore_mirror.is_fresh(collection):
+        firestore_mirror.remote_fallbacks += 1
+        return None
+    return firestore_mirror
+
+def _mirror_result(mirror, collection: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """미러 응답 표시 (원격 결과와 같은 모양 + 미러 경과 시간)"""
+    return {"result": result, "mirror": {"age_seconds": round(mirror.age_seconds(collection) or 0.0, 1)}}
 
 # ========================================
 # MCP 서버 고급 기능 활용 도구들 (ADK 호환)
@@ -22,9 +42,20 @@ async def firestore_list_documents(
     orderBy_json: Optional[str] = None,
     limit: Optional[int] = 20, 
     pageToken: Optional[str] = None,
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    force_remote: bool = False
 ):
-    """MCP 서버 고급 기능 활용 문서 목록 조회 (ADK 호환)"""
+    """MCP 서버 고급 기능 활용 문서 목록 조회 (ADK 호환, force_remote=True면 미러 대신 원격 조회)"""
+    # 🪞 필터/정렬 없는 목록은 미러에서 (미러 페이지 토큰은 미러에서만 이어서 조회)
+    if not filters_json and not orderBy_json:
+        if pageToken and pageToken.startswith(MIRROR_PAGE_TOKEN_PREFIX):
+            mirror = firestore_mirror  # 원격 서버는 미러 토큰을 모름
+        else:
+            mirror = None if pageToken else _mirror_for(collection, force_remote)
+        if mirror is not None:
+            documents, next_token = mirror.list_documents(collection, limit or 20, pageToken)
+            return _mirror_result(mirror, collection, {"documents": documents, "nextPageToken": next_token})
+
     params = {"collection": collection, "limit": limit}
     
     # JSON 문자열 파싱
@@ -70,8 +101,20 @@ async def firestore_query_collection_group(
         
     return await firebase_client.call_tool("firestore_query_collection_group", params, session_id)
 
-async def firestore_get_document(collection: str, document_id: str, session_id: Optional[str] = None):
-    """문서 상세 조회"""
+async def firestore_get_document(
+    collection: str,
+    document_id: str,
+    session_id: Optional[str] = None,
+    force_remote: bool = False
+):
+    """문서 상세 조회 (force_remote=True면 미러 대신 원격 조회)"""
+    mirror = _mirror_for(collection, force_remote)
+    if mirror is not None:
+        doc = mirror.get_document(collection, document_id)
+        if doc is not None:
+            return _mirror_result(mirror, collection, doc)
+        # 미러에 없으면 원격에서 확인 (다른 경로로 방금 추가된 문서일 수 있음)
+        mirror.remote_fallbacks += 1
     return await firebase_client.call_tool("firestore_get_document", {
         "collection": collection, "id": document_id
     }, session_id)
@@ -107,60 +150,48 @@ async def firestore_delete_document(collection: str, document_id: str, session_i
 async def smart_search(
     collection: str, 
     search_term: str, 
-    limit: Optional[int] = 10,
-    session_id: Optional[str] = None
+    limit: Optional[int] = 5,
+    session_id: Optional[str] = None,
+    force_remote: bool = False
 ):
-    """스마트 검색 - 정확한 매칭 우선순위 + 상세 내용 (ADK 호환)"""
-    # 전체 데이터 가져오기
-    params = {"collectionId": collection, "limit": 50}
-    result = await firebase_client.call_tool("firestore_query_collection_group", params, session_id)
+    """스마트 검색 - 관련도 순위 상위 limit개 + 점수 근거 + 상세 내용 (ADK 호환, force_remote=True면 원격 페이지 검색)"""
+    # 🔎 로컬 n-gram 색인 검색 (컬렉션 전체 대상)
+    #    색인이 없거나 오래되면 페이지를 읽으며 검색하고 확신도 높은 결과가 모이면 조기 종료
+    #    로컬 미러가 최신이면 원격 대신 미러에서 읽음
+    # 🏅 순위: 문서 ID > name/phone/process/description > 기타 필드, 완전 일치 > 접두 > 부분 일치 > 초성 > 오타
+    # 🔤 초성 약어("ㅇㅂㅇㅇㅍㅋ")와 오타("월베아이파크")도 검색 (일치 근거에 편집 거리 표시)
+    try:
+        results = await firebase_search_index.search(
+            collection, search_term, k=max(1, limit or 5), session_id=session_id, force_remote=force_remote
+        )
+    except SearchIndexError as e:
+        return e.result
     
-    if result.get("result", {}).get("documents"):
-        documents = result["result"]["documents"]
-        exact_matches = []  # 정확한 매칭
-        partial_matches = []  # 부분 매칭
-        search_lower = search_term.lower()
-        
-        for doc in documents:
-            doc_id = doc.get("id", "").lower()
+    # 색인 문서 보호를 위해 복사본에 점수 근거 추가
+    filtered_docs = []
+    for hit in results.hits:
+        doc = copy.deepcopy(hit.doc)
+        doc["relevance"] = hit.explanation()
+        filtered_docs.append(doc)
+    
+    # 결과가 적으면 상세 내용도 포함
+    if len(filtered_docs) <= 3:
+        for doc in filtered_docs:
             doc_data = doc.get("data", {})
-            
-            # 1. 정확한 매칭 우선순위 (문서 ID에서)
-            if search_lower in doc_id and len(search_lower) > 2:  # 2글자 이상만 정확 매칭
-                exact_matches.append(doc)
-                continue
-                
-            # 2. 데이터 필드에서 정확한 매칭
-            exact_field_match = False
-            for field_name, field_value in doc_data.items():
-                field_str = str(field_value).lower()
-                if search_lower in field_str and len(search_lower) > 2:
-                    exact_field_match = True
-                    break
-            
-            if exact_field_match:
-                partial_matches.append(doc)
-        
-        # 정확한 매칭 우선, 부분 매칭은 제한적으로
-        filtered_docs = exact_matches[:3] + partial_matches[:2]  # 최대 5개로 제한
-        
-        # 결과가 적으면 상세 내용도 포함
-        if len(filtered_docs) <= 3:
-            for doc in filtered_docs:
-                doc_data = doc.get("data", {})
-                # 상세 데이터 파싱해서 요약 추가
-                if isinstance(doc_data, dict):
-                    summary_parts = []
-                    for key, value in doc_data.items():
-                        if key in ["process", "name", "phone", "description"] and value:
-                            summary_parts.append(f"{key}: {value}")
-                    if summary_parts:
-                        doc["summary"] = ", ".join(summary_parts[:3])  # 주요 정보만
-        
-        # 필터링된 결과로 재구성
-        result["result"]["documents"] = filtered_docs
+            # 상세 데이터 파싱해서 요약 추가
+            if isinstance(doc_data, dict):
+                summary_parts = []
+                for key, value in doc_data.items():
+                    if key in ["process", "name", "phone", "description"] and value:
+                        summary_parts.append(f"{key}: {value}")
+                if summary_parts:
+                    doc["summary"] = ", ".join(summary_parts[:3])  # 주요 정보만
     
-    return result
+    return {"result": {
+        "documents": filtered_docs,
+        "total_matches": results.total_matches,
+        "coverage": results.coverage()  # complete=False면 컬렉션 일부만 확인한 결과
+    }}
 
 # ========================================
 # Firebase 에이전트 (ADK 호환 버전)
@@ -215,9 +246,10 @@ Firebase 전문 에이전트 - 완전 범용 데이터 분석 시스템
 사용자에게 가장 이해하기 쉽고 유용한 형태로 가공
 
 도구 선택:
-- 검색 요청 → smart_search 
+- 검색 요청 → smart_search (결과는 relevance.score 높은 순, limit로 개수 조절, 초성/오타 검색어도 그대로 전달)
 - 목록 요청 → firestore_list_documents
 - 상세 조회 → firestore_get_document
+- 결과에 mirror가 있으면 로컬 미러 응답 (mirror.age_seconds초 전 상태), 사용자가 최신 데이터를 확인하라고 하면 force_remote=true로 다시 조회
 ''',
     
     description="Firebase MCP 서버 고급 기능 200% 활용 에이전트 (ADK 호환)"
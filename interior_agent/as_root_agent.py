@@ -5,7 +5,7 @@
 """
 
 from google.adk.agents import LlmAgent
-from google.adk.sessions import InMemorySessionService  
+from .sessions import create_adk_session_service
 from google.adk.runners import Runner
 from .agents.as_agent import as_agent
 
@@ -44,7 +44,7 @@ AS 전용 루트 에이전트입니다.
 # 🏃 Runner 및 세션 서비스 설정
 # ========================================
 
-as_session_service = InMemorySessionService()
+as_session_service = create_adk_session_service()  # SESSION_BACKEND (sqlite 기본 - 워커 간 공유)
 
 as_runner = Runner(
     agent=as_root_agent,
@@ -5,7 +5,7 @@
 """
 
 from google.adk.agents import LlmAgent
-from google.adk.sessions import InMemorySessionService  
+from .sessions import create_adk_session_service
 from google.adk.runners import Runner
 from .agents.estimate_agent import estimate_agent
 
@@ -44,7 +44,7 @@ estimate_root_agent = LlmAgent(
 # 🏃 Runner 및 세션 서비스 설정
 # ========================================
 
-estimate_session_service = InMemorySessionService()
+estimate_session_service = create_adk_session_service()  # SESSION_BACKEND (sqlite 기본 - 워커 간 공유)
 
 estimate_runner = Runner(
     agent=estimate_root_agent,
@@ -0,0 +1,43 @@
+"""
+💬 세션 관리 모듈
+
+- session_store: 세션 저장소 인터페이스 (대화 히스토리 + 기록/로그)
+- conversation_store: 메모리 구현 (최근 활동 순 LRU + 용량 상한 + 백그라운드 TTL 정리)
+- sqlite_store: SQLite(WAL) 구현 - 같은 컨테이너의 여러 워커가 공유 (기본)
+- redis_store: Redis 구현 - 여러 인스턴스가 공유 (클라이언트 주입)
+- adk_session_service: 세션 저장소에 ADK 세션을 보관하는 BaseSessionService
+- backends: SESSION_BACKEND로 공유 세션 저장소 / ADK 세션 서비스 생성
+- session_adapter: ADK 세션 서비스 동기/비동기 확인(한 번) + 세션 핸들 캐시
+- context_builder: 사용자 메시지에 붙일 이전 대화 조립 (ADK 세션 중복 제거 + 에이전트별 토큰 예산)
+- conversation_compactor: 긴 세션의 오래된 턴을 세션 상태의 요약으로 대체 (로컬 추출 요약 + 선택적 백그라운드 LLM 요약)
+- adk_session_lifecycle: ADK 세션 서비스의 유휴 세션 삭제 / 세션별 이벤트 수 상한 / 사용량 보고
+"""
+
+from .session_store import SessionStore
+from .conversation_store import ConversationStore
+from .sqlite_store import SQLiteSessionStore
+from .redis_store import RedisSessionStore
+from .backends import MAX_HISTORY_LENGTH, create_session_store, create_adk_session_service, session_store
+from .session_adapter import SessionServiceAdapter
+from .context_builder import ContextBuilder, create_context_builder, estimate_tokens
+from .conversation_compactor import SUMMARY_STATE_KEY, ConversationCompactor, create_conversation_compactor
+from .adk_session_lifecycle import ADKSessionLifecycle
+
+__all__ = [
+    'SessionStore',
+    'ConversationStore',
+    'SQLiteSessionStore',
+    'RedisSessionStore',
+    'MAX_HISTORY_LENGTH',
+    'create_session_store',
+    'create_adk_session_service',
+    'session_store',
+    'SessionServiceAdapter',
+    'ContextBuilder',
+    'create_context_builder',
+    'estimate_tokens',
+    'SUMMARY_STATE_KEY',
+    'ConversationCompactor',
+    'create_conversation_compactor',
+    'ADKSessionLifecycle'
+]
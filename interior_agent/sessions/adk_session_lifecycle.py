@@ -0,0 +1,273 @@
+"""
+♻️ ADK 세션 수명 주기 관리 - 세 세션 서비스의 유휴 세션 삭제 / 세션별 이벤트 수 상한 / 사용량 보고
+
+🎯 목적:
+chat()이 resolve_adk_session으로 만든 ADK 세션은 세 InMemorySessionService
+(session_service, as_session_service, estimate_session_service) 어디에서도 삭제되지 않았습니다.
+도구 결과를 포함한 이벤트 목록이 컨테이너가 살아 있는 동안 계속 쌓였습니다.
+
+🔧 동작 방식:
+- touch(): 턴 시작 시 (서비스, app_name, user_id, session_id)의 마지막 사용 시각 갱신 (OrderedDict - O(1))
+  + 세션 이벤트가 max_events를 넘으면 오래된 턴부터 잘라냄 (사용자 메시지 경계에서만 - 도구 호출/결과 쌍 유지)
+- forget_user(): 대화 히스토리(ConversationStore)에서 세션이 제거되면 같은 세션의 ADK 세션도 삭제 (제거 리스너)
+- 백그라운드 정리: idle_ttl 동안 사용되지 않은 ADK 세션 삭제, 추적하지 않던 세션(다른 경로로 생성)도 편입
+- 정리할 때마다 서비스별 세션 수 / 이벤트 수 / 대략적인 바이트를 측정해 stats()로 /health에 노출
+- 저장소 기반 서비스(StoreSessionService, 워커 간 공유)는 서비스의 trim_events / last_update_time / usage 사용
+  (다른 워커가 최근 사용한 세션은 유휴 삭제하지 않고, 이 워커가 추적하지 않던 세션도 대화 히스토리와 함께 삭제)
+  이 메서드들은 저장소 I/O이므로 store.offload()로 스레드에서 호출
+"""
+
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# (서비스 이름, app_name, user_id, session_id)
+SessionKey = Tuple[str, str, str, str]
+
+
+class ADKSessionLifecycle:
+    """여러 ADK 세션 서비스의 세션 사용 시각 추적 + 유휴 세션 삭제 + 이벤트 수 상한"""
+
+    def __init__(
+        self,
+        services: Dict[str, Any],
+        idle_ttl: float = 3600.0,
+        max_events: int = 200,
+        sweep_interval: float = 60.0
+    ):
+        self.services = services  # 이름 → 세션 서비스
+        self.idle_ttl = idle_ttl
+        self.max_events = max_events
+        self.sweep_interval = sweep_interval
+        self._names = {id(service): name for name, service in services.items()}
+        self._last_used: "OrderedDict[SessionKey, float]" = OrderedDict()  # 앞쪽이 가장 오래 사용하지 않은 세션
+        self._by_user: Dict[str, Set[SessionKey]] = {}
+        self._apps: Set[Tuple[str, str]] = set()  # 사용된 (서비스 이름, app_name)
+        self._sweeper: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self._delete_listeners: List[Callable[[str, str, str, str], None]] = []
+        self.deleted = {"idle": 0, "conversation": 0, "failed": 0}
+        self.trimmed_events = 0
+        self.service_usage: Dict[str, Dict[str, Any]] = {}
+        self.measured_at: Optional[float] = None
+
+    # ========================================
+    # 턴 시작 시 사용 기록 / 이벤트 상한
+    # ========================================
+
+    async def touch(self, service, app_name: str, user_id: str, session_id: str):
+        """세션 사용 시각 갱신 + 이벤트 수 상한 적용 (ADK 세션 조회/생성 직후 호출)"""
+        name = self._names.get(id(service))
+        if name is None:
+            return
+        key = (name, app_name, user_id, session_id)
+        self._apps.add((name, app_name))
+        self._track(key, time.monotonic())
+        await self._trim_events(service, key)
+
+    @staticmethod
+    def _is_shared(service) -> bool:
+        """세션 저장소 기반 서비스 (여러 워커/인스턴스가 같은 세션을 사용)"""
+        return hasattr(service, 'trim_events') and hasattr(service, 'last_update_time')
+
+    def _track(self, key: SessionKey, used_at: float):
+        self._last_used[key] = used_at
+        self._last_used.move_to_end(key)
+        self._by_user.setdefault(key[2], set()).add(key)
+
+    def _untrack(self, key: SessionKey):
+        self._last_used.pop(key, None)
+        keys = self._by_user.get(key[2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[2]]
+
+    async def _trim_events(self, service, key: SessionKey):
+        """저장된 세션의 이벤트가 max_events를 넘으면 사용자 메시지 경계에서 오래된 턴 삭제"""
+        if self.max_events <= 0:
+            return
+        if self._is_shared(service):
+            cut = await service.store.offload(service.trim_events, *key[1:], self.max_events)
+            if cut:
+                self.trimmed_events += cut
+                print(f"✂️ ADK 세션 이벤트 정리: {key[0]}/{key[3]} - 오래된 이벤트 {cut}개 삭제")
+            return
+        stored = self._stored_session(service, key)
+        if stored is None or len(stored.events) <= self.max_events:
+            return
+        events = stored.events
+        start = len(events) - self.max_events
+        # 잘린 뒤 첫 이벤트가 사용자 메시지가 되도록 (도구 호출/결과 쌍이 갈라지지 않도록)
+        cut = next((i for i in range(start, len(events)) if getattr(events[i], 'author', None) == "user"), None)
+        if not cut:
+            return  # 한 턴이 상한보다 긴 경우는 그대로 둠
+        del events[:cut]
+        self.trimmed_events += cut
+        print(f"✂️ ADK 세션 이벤트 정리: {key[0]}/{key[3]} - 오래된 이벤트 {cut}개 삭제 (남은 {len(events)}개)")
+
+    @staticmethod
+    def _stored_session(service, key: SessionKey):
+        """InMemorySessionService가 보관 중인 원본 세션 (조회 API는 복사본을 반환하므로 직접 접근)"""
+        sessions = getattr(service, 'sessions', None)
+        if not isinstance(sessions, dict):
+            return None
+        _name, app_name, user_id, session_id = key
+        return sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+
+    # ========================================
+    # 삭제 (대화 히스토리와 함께 / 유휴)
+    # ========================================
+
+    def forget_user(self, user_id: str, reason: str = "conversation"):
+        """
+        대화 히스토리에서 제거된 세션의 ADK 세션 삭제 (ConversationStore 제거 리스너)
+
+        이 앱은 user_id와 session_id 모두 앱 세션 ID를 사용하므로 user_id 기준으로 찾습니다.
+        """
+        keys = self._by_user.pop(user_id, None) or set()
+        for key in keys:
+            self._last_used.pop(key, None)
+        # 공유 저장소의 세션은 다른 워커가 만들었을 수 있음 (없는 세션 삭제는 무시됨)
+        for name, app_name in self._apps:
+            if self._is_shared(self.services[name]):
+                keys.add((name, app_name, user_id, user_id))
+        if not keys:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._delete_keys(list(keys), "conversation"))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        print(f"♻️ ADK 세션 {len(keys)}개 삭제 예약: {user_id} (대화 히스토리 {reason})")
+
+    async def _delete_keys(self, keys: List[SessionKey], reason: str):
+        for key in keys:
+            await self._delete(key, reason)
+
+    def add_delete_listener(self, listener: Callable[[str, str, str, str], None]):
+        """ADK 세션을 삭제할 때마다 (서비스 이름, app_name, user_id, session_id)로 호출될 리스너 등록 (세션 핸들 캐시 정리)"""
+        self._delete_listeners.append(listener)
+
+    async def _delete(self, key: SessionKey, reason: str):
+        name, app_name, user_id, session_id = key
+        for listener in self._delete_listeners:
+            listener(*key)
+        try:
+            result = self.services[name].delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            if inspect.isawaitable(result):
+                await result
+            self.deleted[reason] += 1
+        except Exception as e:
+            self.deleted["failed"] += 1
+            print(f"⚠️ ADK 세션 삭제 실패 ({name}/{session_id}): {e}")
+
+    async def sweep(self) -> int:
+        """유휴 세션 삭제 → 추적하지 않던 세션 편입 → 서비스별 사용량 측정"""
+        deadline = time.monotonic() - self.idle_ttl
+        expired = []
+        while self._last_used:
+            key, used_at = next(iter(self._last_used.items()))
+            if used_at > deadline:
+                break
+            self._untrack(key)
+            expired.append(key)
+        deleted = 0
+        for key in expired:
+            if await self._recently_used_elsewhere(key):
+                continue
+            await self._delete(key, "idle")
+            deleted += 1
+        if deleted:
+            print(f"♻️ 유휴 ADK 세션 {deleted}개 삭제")
+        self._adopt_untracked()
+        await self._measure()
+        return deleted
+
+    async def _recently_used_elsewhere(self, key: SessionKey) -> bool:
+        """공유 저장소 세션을 다른 워커가 최근에 사용했으면 다시 추적 (그 시각부터 유휴 시간 계산)"""
+        service = self.services[key[0]]
+        if not self._is_shared(service):
+            return False
+        last_update = await service.store.offload(service.last_update_time, *key[1:])
+        if last_update is None:
+            return True  # 이미 삭제됨
+        idle = time.time() - last_update
+        if idle >= self.idle_ttl:
+            return False
+        self._track(key, time.monotonic() - idle)
+        return True
+
+    def _iter_stored(self) -> Iterator[Tuple[SessionKey, Any]]:
+        for name, service in self.services.items():
+            sessions = getattr(service, 'sessions', None)
+            if not isinstance(sessions, dict):
+                continue
+            for app_name, users in list(sessions.items()):
+                for user_id, user_sessions in list(users.items()):
+                    for session_id, session in list(user_sessions.items()):
+                        yield (name, app_name, user_id, session_id), session
+
+    def _adopt_untracked(self):
+        # 턴 경로 밖에서 만들어진 세션도 지금부터 유휴 시간을 셈
+        now = time.monotonic()
+        for key, _session in self._iter_stored():
+            if key not in self._last_used:
+                self._track(key, now)
+
+    async def _measure(self):
+        usage = {name: {"sessions": 0, "events": 0, "approx_bytes": 0} for name in self.services}
+        for name, app_name in self._apps:
+            service = self.services[name]
+            if hasattr(service, 'usage'):
+                for field, value in (await service.store.offload(service.usage, app_name)).items():
+                    usage[name][field] += value
+        for key, session in self._iter_stored():
+            entry = usage[key[0]]
+            entry["sessions"] += 1
+            entry["events"] += len(session.events)
+            try:
+                entry["approx_bytes"] += len(session.model_dump_json(exclude_none=True))
+            except Exception:
+                pass
+        self.service_usage = usage
+        self.measured_at = time.time()
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"⚠️ ADK 세션 정리 실패: {e}")
+
+    def start(self):
+        """백그라운드 정리 시작 (이벤트 루프 안에서 호출)"""
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def close(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tracked_sessions": len(self._last_used),
+            "idle_ttl_seconds": self.idle_ttl,
+            "max_events": self.max_events,
+            "deleted": dict(self.deleted),
+            "trimmed_events": self.trimmed_events,
+            "services": self.service_usage,  # 마지막 정리 시점 측정값
+            "measured_at": self.measured_at
+        }
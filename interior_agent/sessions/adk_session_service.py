@@ -0,0 +1,258 @@
+"""
+🧩 ADK 세션 서비스 (세션 저장소 기반) - ADK 세션을 SQLite/Redis 세션 저장소에 보관
+
+🎯 목적:
+InMemorySessionService는 워커 프로세스 메모리에 세션을 두므로 다음 턴이 다른 워커/인스턴스로 가면
+이전 대화(도구 호출 포함)가 사라졌습니다. 같은 BaseSessionService 인터페이스로 저장 위치만 바꿉니다.
+
+🔧 저장 구성 (SessionStore 기록/로그):
+- adk_session   [app, user, session] → {"state", "last_update_time"} (세션 상태)
+- adk_events    [app, user, session] → 이벤트 JSON 목록 (append_event마다 한 건 추가)
+- adk_app_state / adk_user_state     → app: / user: 접두사 상태 (세션 간 공유)
+- temp: 상태는 저장하지 않음 (ADK 규칙과 동일)
+- async 메서드의 저장소 I/O는 store.offload()로 스레드에서 실행, 동기 보조 메서드(수명 주기/압축용)는
+  호출하는 쪽이 store.offload()로 감싸서 호출
+"""
+
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+from .session_store import SessionStore
+
+SESSION_NAMESPACE = "adk_session"
+EVENTS_NAMESPACE = "adk_events"
+APP_STATE_NAMESPACE = "adk_app_state"
+USER_STATE_NAMESPACE = "adk_user_state"
+
+
+def _session_key(*parts: str) -> str:
+    """기록 키 - JSON 배열 문자열 (앞부분만 남기면 접두사 검색 키)"""
+    return json.dumps(list(parts), ensure_ascii=False)
+
+
+def _key_prefix(*parts: str) -> str:
+    # '["app", "user"' 까지 → 같은 app/user의 세션 키가 모두 이 문자열로 시작
+    return _session_key(*parts)[:-1] + ", "
+
+
+def _split_state(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """상태 변경분을 app: / user: / 세션 상태로 분리 (temp: 는 버림)"""
+    deltas: Dict[str, Dict[str, Any]] = {"app": {}, "user": {}, "session": {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            deltas["app"][key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            deltas["user"][key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            deltas["session"][key] = value
+    return deltas
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class StoreSessionService(BaseSessionService):
+    """SessionStore(SQLite/Redis)에 세션/이벤트/상태를 저장하는 ADK 세션 서비스"""
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+
+    # ========================================
+    # 상태 기록
+    # ========================================
+
+    def _load(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.store.get_record(namespace, key)
+        return json.loads(raw) if raw is not None else None
+
+    def _update_state(self, namespace: str, key: str, delta: Dict[str, Any]):
+        if delta:
+            state = self._load(namespace, key) or {}
+            state.update(delta)
+            self.store.put_record(namespace, key, _dumps(state))
+
+    def _save_shared_state(self, app_name: str, user_id: str, deltas: Dict[str, Dict[str, Any]]):
+        self._update_state(APP_STATE_NAMESPACE, _session_key(app_name), deltas["app"])
+        self._update_state(USER_STATE_NAMESPACE, _session_key(app_name, user_id), deltas["user"])
+
+    def _build_session(self, app_name: str, user_id: str, session_id: str, meta: Dict[str, Any],
+                       events: List[Event]) -> Session:
+        """저장된 세션 상태 + app:/user: 공유 상태를 합친 Session"""
+        state = dict(meta.get("state") or {})
+        for key, value in (self._load(APP_STATE_NAMESPACE, _session_key(app_name)) or {}).items():
+            state[State.APP_PREFIX + key] = value
+        for key, value in (self._load(USER_STATE_NAMESPACE, _session_key(app_name, user_id)) or {}).items():
+            state[State.USER_PREFIX + key] = value
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=state,
+            events=events,
+            last_update_time=meta.get("last_update_time", 0.0)
+        )
+
+    # ========================================
+    # BaseSessionService (저장소 I/O는 store.offload - 이벤트 루프를 막지 않음)
+    # ========================================
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> Session:
+        session_id = session_id.strip() if session_id else uuid.uuid4().hex
+        return await self.store.offload(self._create_session, app_name, user_id, session_id, state or {})
+
+    def _create_session(self, app_name: str, user_id: str, session_id: str, state: Dict[str, Any]) -> Session:
+        key = _session_key(app_name, user_id, session_id)
+        if self.store.get_record(SESSION_NAMESPACE, key) is not None:
+            raise AlreadyExistsError(f'Session with id {session_id} already exists.')
+        deltas = _split_state(state)
+        self._save_shared_state(app_name, user_id, deltas)
+        meta = {"state": deltas["session"], "last_update_time": time.time()}
+        self.store.put_record(SESSION_NAMESPACE, key, _dumps(meta))
+        return self._build_session(app_name, user_id, session_id, meta, [])
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None
+    ) -> Optional[Session]:
+        session = await self.store.offload(self.stored_session, app_name, user_id, session_id)
+        if session is not None and config:
+            events = session.events
+            if config.num_recent_events is not None:
+                events = events[-config.num_recent_events:] if config.num_recent_events > 0 else []
+            if config.after_timestamp:
+                events = [event for event in events if event.timestamp >= config.after_timestamp]
+            session.events = events
+        return session
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        sessions = await self.store.offload(self._list_sessions, app_name, user_id)
+        return ListSessionsResponse(sessions=sessions)
+
+    def _list_sessions(self, app_name: str, user_id: Optional[str]) -> List[Session]:
+        prefix = _key_prefix(app_name, user_id) if user_id is not None else _key_prefix(app_name)
+        sessions = []
+        for key in self.store.list_record_keys(SESSION_NAMESPACE, prefix):
+            meta = self._load(SESSION_NAMESPACE, key)
+            if meta is None:
+                continue
+            _app_name, session_user_id, session_id = json.loads(key)
+            sessions.append(self._build_session(app_name, session_user_id, session_id, meta, []))
+        sessions.sort(key=lambda s: (s.last_update_time, s.user_id, s.id))
+        return sessions
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.store.offload(self._delete_session, _session_key(app_name, user_id, session_id))
+
+    def _delete_session(self, key: str):
+        self.store.delete_record(SESSION_NAMESPACE, key)
+        self.store.delete_log(EVENTS_NAMESPACE, key)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        return await self.store.offload(self._load, USER_STATE_NAMESPACE, _session_key(app_name, user_id)) or {}
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = _session_key(session.app_name, session.user_id, session.id)
+        meta = await self.store.offload(self._load, SESSION_NAMESPACE, key)
+        if meta is None:
+            raise SessionNotFoundError(f'Session {session.id} not found.')
+
+        # 메모리의 session 객체 갱신 (temp: 상태 적용 / 제거 포함)
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        await self.store.offload(self._persist_event, session.app_name, session.user_id, key, meta, event)
+        return event
+
+    def _persist_event(self, app_name: str, user_id: str, key: str, meta: Dict[str, Any], event: Event):
+        if event.actions and event.actions.state_delta:
+            deltas = _split_state(event.actions.state_delta)
+            self._save_shared_state(app_name, user_id, deltas)
+            meta.setdefault("state", {}).update(deltas["session"])
+        meta["last_update_time"] = event.timestamp
+        self.store.append_log(EVENTS_NAMESPACE, key, event.model_dump_json(exclude_none=True))
+        self.store.put_record(SESSION_NAMESPACE, key, _dumps(meta))
+
+    # ========================================
+    # 수명 주기 관리용 (ADKSessionLifecycle)
+    # ========================================
+
+    def last_update_time(self, app_name: str, user_id: str, session_id: str) -> Optional[float]:
+        """다른 워커의 사용까지 반영된 마지막 갱신 시각 (세션이 없으면 None)"""
+        meta = self._load(SESSION_NAMESPACE, _session_key(app_name, user_id, session_id))
+        return meta.get("last_update_time") if meta is not None else None
+
+    def trim_events(self, app_name: str, user_id: str, session_id: str, max_events: int) -> int:
+        """이벤트가 max_events를 넘으면 사용자 메시지 경계에서 오래된 턴 삭제 → 삭제한 이벤트 수"""
+        key = _session_key(app_name, user_id, session_id)
+        if self.store.log_length(EVENTS_NAMESPACE, key) <= max_events:
+            return 0
+        authors = [json.loads(raw).get("author") for raw in self.store.read_log(EVENTS_NAMESPACE, key)]
+        start = len(authors) - max_events
+        # 잘린 뒤 첫 이벤트가 사용자 메시지가 되도록 (도구 호출/결과 쌍이 갈라지지 않도록)
+        cut = next((i for i in range(start, len(authors)) if authors[i] == "user"), None)
+        if not cut:
+            return 0  # 한 턴이 상한보다 긴 경우는 그대로 둠
+        self.store.drop_log_head(EVENTS_NAMESPACE, key, cut)
+        return cut
+
+    def usage(self, app_name: str) -> Dict[str, int]:
+        """앱의 세션 수 / 이벤트 수 (이벤트 본문은 읽지 않음 - 정리 주기마다 호출)"""
+        keys = self.store.list_record_keys(SESSION_NAMESPACE, _key_prefix(app_name))
+        return {
+            "sessions": len(keys),
+            "events": sum(self.store.log_length(EVENTS_NAMESPACE, key) for key in keys)
+        }
+
+    # ========================================
+    # 대화 요약용 (ConversationCompactor)
+    # ========================================
+
+    def stored_session(self, app_name: str, user_id: str, session_id: str) -> Optional[Session]:
+        """저장된 세션 동기 조회 (get_session과 같은 내용, 설정 없음)"""
+        key = _session_key(app_name, user_id, session_id)
+        meta = self._load(SESSION_NAMESPACE, key)
+        if meta is None:
+            return None
+        events = [Event.model_validate_json(raw) for raw in self.store.read_log(EVENTS_NAMESPACE, key)]
+        return self._build_session(app_name, user_id, session_id, meta, events)
+
+    def event_count(self, app_name: str, user_id: str, session_id: str) -> int:
+        """이벤트 수 (이벤트 본문은 읽지 않음 - 턴마다 압축 필요 여부 확인)"""
+        return self.store.log_length(EVENTS_NAMESPACE, _session_key(app_name, user_id, session_id))
+
+    def compact_events(self, app_name: str, user_id: str, session_id: str, cut: int,
+                       state_delta: Dict[str, Any]) -> bool:
+        """앞쪽 cut개 이벤트 삭제 + 세션 상태 갱신 (요약 저장) → 세션이 없으면 False"""
+        key = _session_key(app_name, user_id, session_id)
+        meta = self._load(SESSION_NAMESPACE, key)
+        if meta is None:
+            return False
+        if cut > 0:
+            self.store.drop_log_head(EVENTS_NAMESPACE, key, cut)
+        meta.setdefault("state", {}).update(state_delta)
+        # 다른 워커의 캐시된 세션 핸들이 요약/삭제를 다시 읽도록 (SessionServiceAdapter)
+        meta["last_update_time"] = time.time()
+        self.store.put_record(SESSION_NAMESPACE, key, _dumps(meta))
+        return True
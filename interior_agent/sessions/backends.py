@@ -0,0 +1,70 @@
+"""
+🔌 세션 저장소 백엔드 선택 - 환경 변수로 대화 히스토리 / ADK 세션 / AS 접수 상태 저장 위치 결정
+
+SESSION_BACKEND:
+- sqlite (기본): 컨테이너 안 SQLite 파일 (WAL) - 같은 컨테이너의 여러 uvicorn 워커가 공유
+- redis: REDIS_URL의 Redis - 여러 Cloud Run 인스턴스가 공유 (redis 패키지 필요, 연결 실패 시 sqlite)
+- memory: 프로세스 메모리 (워커 1개 / 인스턴스 1개에서만 대화 유지, 이전 동작)
+"""
+
+import os
+
+from .session_store import SessionStore
+from .conversation_store import ConversationStore
+from .sqlite_store import SQLiteSessionStore
+from .redis_store import RedisSessionStore
+
+MAX_HISTORY_LENGTH = 10  # 세션당 최대 대화 기록 수
+
+
+def _store_limits() -> dict:
+    return {
+        "max_sessions": int(os.getenv("CONVERSATION_MAX_SESSIONS", "1000")),
+        "max_bytes": int(os.getenv("CONVERSATION_MAX_BYTES", str(16 * 1024 * 1024))),
+        "max_history": MAX_HISTORY_LENGTH,
+        "ttl_seconds": float(os.getenv("CONVERSATION_TTL_SECONDS", "3600")),  # 1시간 비활성 세션 삭제
+        "sweep_interval": float(os.getenv("CONVERSATION_SWEEP_SECONDS", "60"))
+    }
+
+
+def _create_redis_store(limits: dict) -> SessionStore:
+    import redis  # 선택 의존성 (SESSION_BACKEND=redis일 때만 필요)
+    client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+    client.ping()
+    return RedisSessionStore(client, prefix=os.getenv("SESSION_REDIS_PREFIX", "interior:"), **limits)
+
+
+def create_session_store() -> SessionStore:
+    """환경 변수로 세션 저장소 생성"""
+    backend = os.getenv("SESSION_BACKEND", "sqlite").lower()
+    limits = _store_limits()
+    if backend == "memory":
+        return ConversationStore(**limits)
+    if backend == "redis":
+        try:
+            return _create_redis_store(limits)
+        except Exception as e:
+            print(f"⚠️ Redis 세션 저장소 사용 불가 - SQLite로 대체: {e}")
+    elif backend != "sqlite":
+        print(f"⚠️ 알 수 없는 SESSION_BACKEND={backend} - SQLite 사용")
+    return SQLiteSessionStore(os.getenv("SESSION_SQLITE_PATH", "/tmp/interior_sessions.sqlite3"), **limits)
+
+
+def create_adk_session_service(store: SessionStore = None):
+    """
+    ADK Runner용 세션 서비스 - 메모리 백엔드면 InMemorySessionService,
+    그 외에는 같은 세션 저장소를 쓰는 StoreSessionService (워커/인스턴스 간 공유)
+    """
+    store = store or session_store
+    if store.backend == "memory":
+        from google.adk.sessions import InMemorySessionService
+        return InMemorySessionService()
+    from .adk_session_service import StoreSessionService
+    return StoreSessionService(store)
+
+
+# ========================================
+# 🗄️ 공유 세션 저장소 인스턴스 (서버 대화 히스토리 + ADK 세션 + AS 접수 상태)
+# ========================================
+session_store = create_session_store()
+print(f"🗄️ 세션 저장소: {session_store.backend}")
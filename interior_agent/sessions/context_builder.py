@@ -0,0 +1,189 @@
+"""
+📏 컨텍스트 조립 - ADK 세션에 이미 있는 대화는 빼고, 에이전트별 토큰 예산 안에서만 이전 대화 첨부
+
+🎯 목적:
+create_context_message()는 대화 히스토리의 최근 5개를 매 사용자 메시지 앞에 붙였습니다.
+run_async에 넘기는 ADK 세션에도 이전 이벤트가 모두 들어 있으므로 같은 대화가 두 번 들어갔고,
+첨부한 히스토리가 다시 사용자 이벤트로 저장되어 프롬프트가 대화보다 두 배 가까이 빨리 커졌습니다.
+
+🔧 동작 방식:
+- ADK 세션 이벤트의 텍스트를 모아 이미 모델이 보는 메시지를 확인
+  (사용자 이벤트는 첨부 형식에서 "현재 질문"만 추출, 짧은 메시지는 정확히 일치할 때만 중복으로 판단)
+- ADK 세션에 없는 메시지만 (AS 접수 상태 기계 응답, 다른 에이전트로 처리한 턴, 정리된 세션 등)
+  최근 순으로 에이전트별 토큰 예산 안에서 첨부 - 첨부할 것이 없으면 사용자 메시지 그대로
+- 대화 요약 압축(ConversationCompactor)이 세션 상태에 저장한 요약은 ADK 세션에 아직 없을 때만
+  "이전 대화 요약"으로 함께 첨부 (예산에서 먼저 차감)
+- 토큰 수는 로컬 근사치 (ASCII 약 4자/토큰, 한글 등 그 외 약 1.5자/토큰)
+- 턴마다 이전 방식 대비 토큰 수를 로그로 남기고 누적값은 stats()로 /health에 노출
+"""
+
+import math
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+CONTEXT_HEADER = "이전 대화:"
+SUMMARY_HEADER = "이전 대화 요약:"
+QUESTION_MARKER = "현재 질문: "
+CONTEXT_FOOTER = "위 대화 맥락을 참고하여 자연스럽게 답변해주세요."
+MIN_SUBSTRING_MATCH = 20  # 이 길이 이상인 메시지만 세션 텍스트 포함 여부로 중복 판단
+
+
+def estimate_tokens(text: str) -> int:
+    """로컬 토큰 수 근사치 (Gemini 토크나이저 호출 없음)"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+def _role_label(role: str) -> str:
+    return "사용자" if role == "user" else "어시스턴트"
+
+
+def format_context(lines: List[str], new_message: str, summary: Optional[str] = None) -> str:
+    """대화 요약 + 첨부할 이전 대화 + 현재 질문 (첨부할 것이 없으면 질문 그대로)"""
+    if not lines and not summary:
+        return new_message
+    sections = []
+    if summary:
+        sections.append(f"{SUMMARY_HEADER}\n{summary}")
+    if lines:
+        sections.append(f"{CONTEXT_HEADER}\n" + "\n".join(lines))
+    context = "\n\n".join(sections)
+    return f"""{context}
+
+{QUESTION_MARKER}{new_message}
+
+{CONTEXT_FOOTER}"""
+
+
+def event_text(event) -> str:
+    content = getattr(event, 'content', None)
+    parts = getattr(content, 'parts', None) or []
+    return "".join(part.text for part in parts if getattr(part, 'text', None))
+
+
+def user_question(text: str) -> str:
+    """첨부 형식으로 보낸 사용자 이벤트에서 현재 질문만 추출"""
+    if text.startswith((CONTEXT_HEADER, SUMMARY_HEADER)) and QUESTION_MARKER in text:
+        question = text.rsplit(QUESTION_MARKER, 1)[1]
+        if question.endswith(CONTEXT_FOOTER):
+            question = question[:-len(CONTEXT_FOOTER)]
+        return question
+    return text
+
+
+class SessionCoverage:
+    """ADK 세션이 이미 담고 있는 메시지 텍스트"""
+
+    __slots__ = ("exact", "corpus", "tokens")
+
+    def __init__(self, events):
+        self.exact: Set[Tuple[str, str]] = set()  # (role, 정규화 텍스트)
+        corpus = []
+        self.tokens = 0
+        for event in events or ():
+            text = event_text(event)
+            if not text:
+                continue
+            self.tokens += estimate_tokens(text)
+            if getattr(event, 'author', None) == "user":
+                self.exact.add(("user", _normalize(user_question(text))))
+            else:
+                self.exact.add(("assistant", _normalize(text)))
+            corpus.append(_normalize(text))
+        self.corpus = "\n".join(corpus)
+
+    def covers(self, role: str, content: str) -> bool:
+        text = _normalize(content)
+        if (("user" if role == "user" else "assistant"), text) in self.exact:
+            return True
+        return len(text) >= MIN_SUBSTRING_MATCH and text in self.corpus
+
+
+class ContextBuilder:
+    """에이전트별 토큰 예산 + ADK 세션 중복 제거로 사용자 메시지에 붙일 이전 대화 결정"""
+
+    def __init__(self, default_budget: int = 1200, budgets: Optional[Dict[str, int]] = None, recent_messages: int = 5):
+        self.default_budget = default_budget
+        self.budgets = budgets or {}  # 에이전트(app_name) → 토큰 예산
+        self.recent_messages = recent_messages
+        self.totals = {"turns": 0, "tokens_before": 0, "tokens_after": 0, "deduplicated": 0, "over_budget": 0,
+                       "summaries": 0}
+
+    def budget_for(self, agent_name: Optional[str]) -> int:
+        return self.budgets.get(agent_name, self.default_budget)
+
+    def build(self, history: List[Dict[str, Any]], new_message: str, agent_name: Optional[str] = None,
+              session_events=None, summary: Optional[str] = None) -> str:
+        """대화 히스토리 중 ADK 세션에 없는 최근 메시지(+ 대화 요약)를 예산 안에서 붙인 메시지"""
+        recent = history[-self.recent_messages:] if history else []
+        if not recent and not summary:
+            return new_message
+        legacy = format_context([f"{_role_label(msg['role'])}: {msg['content']}" for msg in recent], new_message)
+
+        coverage = SessionCoverage(session_events)
+        if summary and coverage.covers("assistant", summary):
+            summary = None  # 이전 턴에 첨부한 요약이 아직 세션에 남아 있음
+        budget = self.budget_for(agent_name)
+        used = estimate_tokens(format_context(["-"], new_message, summary))
+        selected: List[str] = []
+        deduplicated = over_budget = 0
+        for msg in reversed(recent):
+            if coverage.covers(msg["role"], msg["content"]):
+                deduplicated += 1
+                continue
+            line = f"{_role_label(msg['role'])}: {msg['content']}"
+            cost = estimate_tokens(line) + 1
+            if over_budget or used + cost > budget:
+                over_budget += 1  # 더 오래된 메시지도 함께 제외 (대화 순서 유지)
+                continue
+            selected.append(line)
+            used += cost
+        selected.reverse()
+        message = format_context(selected, new_message, summary)
+
+        before, after = estimate_tokens(legacy), estimate_tokens(message)
+        self.totals["turns"] += 1
+        self.totals["tokens_before"] += before
+        self.totals["tokens_after"] += after
+        self.totals["deduplicated"] += deduplicated
+        self.totals["over_budget"] += over_budget
+        self.totals["summaries"] += 1 if summary else 0
+        print(f"📏 컨텍스트 ({agent_name or '-'}): 메시지 ~{before} → ~{after} 토큰{' (대화 요약 첨부)' if summary else ''} "
+              f"(최근 {len(recent)}개 중 ADK 세션 중복 {deduplicated}개 · 예산 {budget} 초과 {over_budget}개 제외, "
+              f"ADK 세션 이벤트 ~{coverage.tokens} 토큰)")
+        return message
+
+    def stats(self) -> Dict[str, Any]:
+        turns = self.totals["turns"]
+        return {
+            **self.totals,
+            "default_budget": self.default_budget,
+            "budgets": dict(self.budgets),
+            "avg_tokens_before": round(self.totals["tokens_before"] / turns, 1) if turns else 0.0,
+            "avg_tokens_after": round(self.totals["tokens_after"] / turns, 1) if turns else 0.0
+        }
+
+
+def parse_budgets(value: str) -> Dict[str, int]:
+    """CONTEXT_TOKEN_BUDGETS 값 (예: as_root_agent=600,estimate_root_agent=2000) → {에이전트: 예산}"""
+    budgets = {}
+    for item in (value or "").split(","):
+        name, _, budget = item.partition("=")
+        if name.strip() and budget.strip().isdigit():
+            budgets[name.strip()] = int(budget.strip())
+    return budgets
+
+
+def create_context_builder() -> ContextBuilder:
+    """환경변수 설정으로 컨텍스트 조립기 생성"""
+    return ContextBuilder(
+        default_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200")),
+        budgets=parse_budgets(os.getenv("CONTEXT_TOKEN_BUDGETS", "")),
+        recent_messages=int(os.getenv("CONTEXT_RECENT_MESSAGES", "5"))
+    )
@@ -0,0 +1,359 @@
+"""
+🗜️ 대화 요약 압축 - 오래된 턴은 세션에 저장한 요약으로 대체해 프롬프트 크기를 일정하게 유지
+
+🎯 목적:
+견적 상담(estimate-consultation-*)처럼 긴 세션은 수십 턴이 쌓이고, Runner는 매 턴 ADK 세션의
+모든 이벤트를 Gemini에 다시 보냈습니다. 이벤트 수 상한(ADK_SESSION_MAX_EVENTS)은 오래된 턴을
+그냥 버리므로 초반에 받은 평수/예산/주소 같은 정보도 함께 사라졌습니다.
+
+🔧 동작 방식:
+- compact(): 턴 시작 시 (세션 조회 직후) 사용자 턴이 keep_turns + batch_turns를 넘으면
+  최근 keep_turns 턴만 남기고 그 앞의 이벤트를 요약으로 대체 (사용자 메시지 경계에서만 자름)
+  → batch_turns 턴마다 한 번만 압축 (턴마다 요약을 다시 만들지 않음)
+- 요약은 세션 상태 conversation_summary에 저장 - ContextBuilder가 "이전 대화 요약"으로 첨부
+- 기본은 로컬 추출 요약 (LLM 호출 없음): 턴마다 사용자 질문 + 답변의 첫 문장/숫자가 있는 문장
+  이전 요약에 이어 붙이고 max_summary_chars를 넘으면 가장 오래된 턴부터 제외
+- LLM 요약 (선택, CONVERSATION_SUMMARY_LLM_ENABLED=true): 추출 요약을 먼저 저장한 뒤 백그라운드에서
+  Gemini로 다시 요약 → 그 사이 요약이 바뀌지 않았을 때만 교체 (응답 경로에서는 기다리지 않음)
+- InMemorySessionService는 보관 중인 원본 세션을, StoreSessionService는 compact_events를 사용
+  (저장소 기반은 store.offload()로 스레드에서 호출)
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .context_builder import event_text, user_question
+
+SUMMARY_STATE_KEY = "conversation_summary"
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+HAS_NUMBER = re.compile(r"\d")
+
+SUMMARY_PROMPT = """다음은 인테리어 상담 대화의 이전 요약과 그 뒤에 이어진 대화입니다.
+두 내용을 합쳐 이후 상담에 필요한 정보만 남긴 요약을 한국어로 작성하세요.
+고객 정보(주소, 평수, 공간, 예산, 일정, 요청사항)와 안내한 금액/결정 사항은 빠짐없이 유지하고,
+{max_chars}자 이내의 글머리표 목록으로, 설명이나 인사말 없이 요약만 출력하세요.
+
+이전 요약:
+{previous}
+
+이어진 대화:
+{transcript}"""
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def split_turns(events) -> List[List[Any]]:
+    """이벤트 목록 → 사용자 메시지로 시작하는 턴 목록 (첫 사용자 메시지 앞 이벤트는 첫 턴에 포함)"""
+    turns: List[List[Any]] = []
+    for event in events:
+        if getattr(event, 'author', None) == "user" or not turns:
+            turns.append([])
+        turns[-1].append(event)
+    return turns
+
+
+def _turn_texts(turn) -> Tuple[str, str]:
+    """턴 하나의 (사용자 질문, 답변 텍스트) - 첨부 형식 사용자 메시지는 현재 질문만"""
+    question, answers = "", []
+    for event in turn:
+        text = event_text(event)
+        if not text:
+            continue
+        if getattr(event, 'author', None) == "user":
+            question = user_question(text)
+        else:
+            answers.append(text)
+    return question, " ".join(answers)
+
+
+# ========================================
+# 📝 요약기
+# ========================================
+
+class ExtractiveSummarizer:
+    """로컬 추출 요약 - 턴마다 질문 + 답변 핵심 문장 한 줄"""
+
+    def __init__(self, max_chars: int = 1200, question_chars: int = 80, answer_chars: int = 160):
+        self.max_chars = max_chars
+        self.question_chars = question_chars
+        self.answer_chars = answer_chars
+
+    def _answer_digest(self, answer: str) -> str:
+        """답변의 첫 문장 + 숫자(금액/평수/날짜 등)가 있는 문장"""
+        sentences = [s.strip() for s in SENTENCE_SPLIT.split(answer) if s.strip()]
+        if not sentences:
+            return ""
+        picked = [sentences[0]] + [s for s in sentences[1:] if HAS_NUMBER.search(s)]
+        return _clip(" ".join(picked), self.answer_chars)
+
+    def summarize(self, previous: str, events) -> str:
+        lines = previous.splitlines() if previous else []
+        for turn in split_turns(events):
+            question, answer = _turn_texts(turn)
+            if not question and not answer:
+                continue
+            line = f"- 사용자: {_clip(question, self.question_chars)}" if question else "-"
+            digest = self._answer_digest(answer)
+            if digest:
+                line += f" → 답변: {digest}"
+            lines.append(line)
+        # 상한을 넘으면 가장 오래된 턴부터 제외
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > self.max_chars:
+            lines.pop(0)
+        return "\n".join(lines)
+
+
+class LLMSummarizer:
+    """Gemini 요약 - 시간 제한 안에 끝나지 않거나 실패하면 None (추출 요약 유지)"""
+
+    def __init__(self, model: str, timeout: float = 20.0, max_chars: int = 1200):
+        self.model = model
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self._client = None
+        self.calls = 0
+        self.failures = 0
+        self.total_ms = 0.0
+
+    def _get_client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client()
+        return self._client
+
+    @staticmethod
+    def transcript(events) -> str:
+        lines = []
+        for turn in split_turns(events):
+            question, answer = _turn_texts(turn)
+            if question:
+                lines.append(f"사용자: {question}")
+            if answer:
+                lines.append(f"어시스턴트: {answer}")
+        return "\n".join(lines)
+
+    async def summarize(self, previous: str, transcript: str) -> Optional[str]:
+        started = time.monotonic()
+        self.calls += 1
+        try:
+            response = await asyncio.wait_for(
+                self._get_client().aio.models.generate_content(
+                    model=self.model,
+                    contents=SUMMARY_PROMPT.format(
+                        max_chars=self.max_chars, previous=previous or "(없음)", transcript=transcript
+                    )
+                ),
+                timeout=self.timeout
+            )
+            summary = (response.text or "").strip()
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ 대화 LLM 요약 실패 - 추출 요약 유지: {type(e).__name__}: {e}")
+            return None
+        finally:
+            self.total_ms += (time.monotonic() - started) * 1000
+        # 빈 응답이나 상한을 크게 넘는 응답은 버림
+        if not summary or len(summary) > self.max_chars * 1.5:
+            self.failures += 1
+            return None
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "calls": self.calls,
+            "failures": self.failures,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0
+        }
+
+
+# ========================================
+# 🗜️ 압축 단계
+# ========================================
+
+class ConversationCompactor:
+    """ADK 세션의 오래된 턴을 요약으로 대체 (batch_turns 턴마다 한 번)"""
+
+    def __init__(
+        self,
+        keep_turns: int = 6,
+        batch_turns: int = 4,
+        summarizer: Optional[ExtractiveSummarizer] = None,
+        llm: Optional[LLMSummarizer] = None
+    ):
+        self.keep_turns = keep_turns
+        self.batch_turns = max(1, batch_turns)
+        self.summarizer = summarizer or ExtractiveSummarizer()
+        self.llm = llm
+        self._pending: Set[asyncio.Task] = set()
+        self.counters = {"compactions": 0, "compacted_events": 0, "llm_applied": 0, "llm_discarded": 0}
+        self.total_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.keep_turns > 0
+
+    # ========================================
+    # 저장된 세션 접근 (InMemory 원본 / 저장소 기반)
+    # ========================================
+
+    @staticmethod
+    def _is_shared(service) -> bool:
+        return hasattr(service, 'compact_events') and hasattr(service, 'stored_session')
+
+    @staticmethod
+    def _memory_session(service, app_name: str, user_id: str, session_id: str):
+        """InMemorySessionService가 보관 중인 원본 세션 (조회 API는 복사본을 반환하므로 직접 접근)"""
+        sessions = getattr(service, 'sessions', None)
+        if not isinstance(sessions, dict):
+            return None
+        return sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+
+    async def _event_count(self, service, app_name: str, user_id: str, session_id: str) -> int:
+        if self._is_shared(service):
+            return await service.store.offload(service.event_count, app_name, user_id, session_id)
+        stored = self._memory_session(service, app_name, user_id, session_id)
+        return len(stored.events) if stored is not None else 0
+
+    async def _stored(self, service, app_name: str, user_id: str, session_id: str):
+        if self._is_shared(service):
+            return await service.store.offload(service.stored_session, app_name, user_id, session_id)
+        return self._memory_session(service, app_name, user_id, session_id)
+
+    async def _apply(self, service, app_name: str, user_id: str, session_id: str, cut: int, summary: str) -> bool:
+        """앞쪽 cut개 이벤트 삭제 + 요약 저장"""
+        if self._is_shared(service):
+            return await service.store.offload(
+                service.compact_events, app_name, user_id, session_id, cut, {SUMMARY_STATE_KEY: summary}
+            )
+        stored = self._memory_session(service, app_name, user_id, session_id)
+        if stored is None:
+            return False
+        del stored.events[:cut]
+        stored.state[SUMMARY_STATE_KEY] = summary
+        return True
+
+    # ========================================
+    # 턴 시작 시 압축
+    # ========================================
+
+    async def compact(self, service, app_name: str, user_id: str, session_id: str, handle=None) -> int:
+        """
+        사용자 턴이 keep_turns + batch_turns를 넘으면 오래된 턴을 요약으로 대체 → 삭제한 이벤트 수
+
+        handle: 세션 서비스 어댑터가 캐시한 세션 핸들 - 삭제한 이벤트와 요약을 같이 반영
+        """
+        if not self.enabled:
+            return 0
+        threshold = self.keep_turns + self.batch_turns
+        # 한 턴은 보통 2개 이상 이벤트(질문 + 답변) - 이벤트 본문을 읽기 전에 이벤트 수로 먼저 확인
+        if await self._event_count(service, app_name, user_id, session_id) <= threshold * 2:
+            return 0
+        started = time.monotonic()
+        stored = await self._stored(service, app_name, user_id, session_id)
+        if stored is None:
+            return 0
+        events = list(stored.events)
+        user_indexes = [i for i, event in enumerate(events) if getattr(event, 'author', None) == "user"]
+        if len(user_indexes) <= threshold:
+            return 0
+        cut = user_indexes[len(user_indexes) - self.keep_turns]
+        old_events = events[:cut]
+        previous = (stored.state or {}).get(SUMMARY_STATE_KEY) or ""
+        summary = self.summarizer.summarize(previous, old_events)
+        if not await self._apply(service, app_name, user_id, session_id, cut, summary):
+            return 0
+
+        if handle is not None:
+            self._mirror(handle, old_events, summary)
+        self.counters["compactions"] += 1
+        self.counters["compacted_events"] += cut
+        self.total_ms += (time.monotonic() - started) * 1000
+        print(f"🗜️ 대화 요약 압축: {app_name}/{session_id} - 이벤트 {cut}개 → 요약 {len(summary)}자 "
+              f"(최근 {self.keep_turns}턴 유지)")
+
+        if self.llm is not None:
+            self._schedule_refine(service, app_name, user_id, session_id, previous, old_events, summary, handle)
+        return cut
+
+    @staticmethod
+    def _mirror(handle, old_events, summary: str):
+        """캐시된 세션 핸들에도 삭제/요약 반영"""
+        removed = {getattr(event, 'id', None) for event in old_events}
+        removed.discard(None)
+        handle.events[:] = [event for event in handle.events if getattr(event, 'id', None) not in removed]
+        handle.state[SUMMARY_STATE_KEY] = summary
+
+    # ========================================
+    # 백그라운드 LLM 요약 (선택)
+    # ========================================
+
+    def _schedule_refine(self, service, app_name: str, user_id: str, session_id: str,
+                         previous: str, old_events, extractive: str, handle):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # 이벤트 루프 밖에서 호출된 경우 추출 요약만 사용
+        task = loop.create_task(self._refine(
+            service, app_name, user_id, session_id, previous, LLMSummarizer.transcript(old_events), extractive, handle
+        ))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _refine(self, service, app_name: str, user_id: str, session_id: str,
+                      previous: str, transcript: str, extractive: str, handle):
+        refined = await self.llm.summarize(previous, transcript)
+        if refined is None:
+            return
+        stored = await self._stored(service, app_name, user_id, session_id)
+        # 그 사이 다시 압축했거나 세션이 삭제됐으면 버림
+        if stored is None or (stored.state or {}).get(SUMMARY_STATE_KEY) != extractive:
+            self.counters["llm_discarded"] += 1
+            return
+        if not await self._apply(service, app_name, user_id, session_id, 0, refined):
+            return
+        if handle is not None and handle.state.get(SUMMARY_STATE_KEY) == extractive:
+            handle.state[SUMMARY_STATE_KEY] = refined
+        self.counters["llm_applied"] += 1
+        print(f"🗜️ 대화 LLM 요약 적용: {app_name}/{session_id} - {len(extractive)}자 → {len(refined)}자")
+
+    async def close(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        compactions = self.counters["compactions"]
+        return {
+            "enabled": self.enabled,
+            "keep_turns": self.keep_turns,
+            "batch_turns": self.batch_turns,
+            "max_summary_chars": self.summarizer.max_chars,
+            **self.counters,
+            "avg_ms": round(self.total_ms / compactions, 1) if compactions else 0.0,
+            "pending_llm": len(self._pending),
+            "llm": self.llm.stats() if self.llm is not None else None
+        }
+
+
+def create_conversation_compactor() -> ConversationCompactor:
+    """환경변수 설정으로 대화 요약 압축 단계 생성"""
+    max_chars = int(os.getenv("CONVERSATION_SUMMARY_MAX_CHARS", "1200"))
+    llm = None
+    if os.getenv("CONVERSATION_SUMMARY_LLM_ENABLED", "false").lower() == "true":
+        llm = LLMSummarizer(
+            model=os.getenv("CONVERSATION_SUMMARY_MODEL", "gemini-2.5-flash-lite-preview-06-17"),
+            timeout=float(os.getenv("CONVERSATION_SUMMARY_TIMEOUT", "20")),
+            max_chars=max_chars
+        )
+    return ConversationCompactor(
+        keep_turns=int(os.getenv("CONVERSATION_SUMMARY_KEEP_TURNS", "6")),
+        batch_turns=int(os.getenv("CONVERSATION_SUMMARY_BATCH_TURNS", "4")),
+        summarizer=ExtractiveSummarizer(max_chars=max_chars),
+        llm=llm
+    )
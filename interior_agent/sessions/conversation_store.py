@@ -0,0 +1,175 @@
+"""
+💬 애플리케이션 대화 히스토리 저장소 (메모리) - 최근 활동 순 LRU + 용량 상한 + 백그라운드 TTL 정리
+
+🎯 목적:
+simple_api_server의 conversation_storage(dict)는 /chat 요청마다 cleanup_old_sessions()가
+전체 세션을 훑어 1시간 지난 세션을 찾았고(요청당 O(세션 수)), 세션 수 상한도 없었습니다.
+
+🔧 동작 방식:
+- OrderedDict를 최근 활동 순으로 유지 (조회/추가 시 move_to_end - O(1))
+- 세션 수 / 전체 바이트 상한 초과 시 가장 오래 활동이 없던 세션부터 제거 (LRU)
+- 1시간 TTL은 asyncio 백그라운드 태스크가 주기적으로 앞쪽(가장 오래된)부터 만료분만 제거
+- 제거 횟수 / 현재 메모리 사용량은 stats()로 /health에 노출
+- 세션이 제거될 때마다 제거 리스너 호출 (ADK 세션도 함께 정리 - adk_session_lifecycle)
+
+프로세스 메모리에 있으므로 워커 1개 / 인스턴스 1개에서만 대화가 이어집니다 (SESSION_BACKEND=memory).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .session_store import SessionStore, message_size
+
+
+class ConversationSession:
+    """세션 하나의 대화 기록"""
+
+    __slots__ = ("messages", "size", "last_active")
+
+    def __init__(self):
+        self.messages: List[Dict[str, Any]] = []
+        self.size = 0
+        self.last_active = time.monotonic()
+
+
+class ConversationStore(SessionStore):
+    """세션별 대화 히스토리 (메모리) - 세션 수/바이트 상한 LRU + TTL 백그라운드 정리"""
+
+    backend = "memory"
+
+    def __init__(self, **limits):
+        super().__init__(**limits)
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()  # 앞쪽이 가장 오래된 세션
+        self._bytes = 0
+        self._records: Dict[str, Dict[str, str]] = {}
+        self._logs: Dict[str, Dict[str, List[str]]] = {}
+
+    # ========================================
+    # 조회 / 추가
+    # ========================================
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def ensure(self, session_id: str) -> bool:
+        session = self._sessions.get(session_id)
+        created = session is None
+        if created:
+            session = self._sessions[session_id] = ConversationSession()
+        self._touch(session_id, session)
+        if created:
+            self._evict()
+        return created
+
+    def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        session = self._sessions.get(session_id)
+        return session.messages if session is not None else None
+
+    def append(self, session_id: str, role: str, content: str):
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = ConversationSession()
+        message = {"role": role, "content": content, "timestamp": time.time()}
+        session.messages.append(message)
+        added = message_size(message)
+        session.size += added
+        self._bytes += added
+
+        # 최대 길이 초과 시 오래된 기록 삭제
+        while len(session.messages) > self.max_history:
+            removed = message_size(session.messages.pop(0))
+            session.size -= removed
+            self._bytes -= removed
+        self._touch(session_id, session)
+        self._evict()
+
+    def delete(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._bytes -= session.size
+        self._notify_removed(session_id, "deleted")
+        return True
+
+    def clear(self) -> int:
+        session_ids = list(self._sessions)
+        self._sessions.clear()
+        self._bytes = 0
+        for session_id in session_ids:
+            self._notify_removed(session_id, "cleared")
+        return len(session_ids)
+
+    def items(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        for session_id, session in list(self._sessions.items()):
+            yield session_id, session.messages
+
+    def _touch(self, session_id: str, session: ConversationSession):
+        session.last_active = time.monotonic()
+        self._sessions.move_to_end(session_id)
+
+    def _evict(self):
+        # 방금 활동한 세션(맨 뒤)은 남김
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+            reason = "sessions" if len(self._sessions) > self.max_sessions else "bytes"
+            session_id, session = self._sessions.popitem(last=False)
+            self._bytes -= session.size
+            self.evictions[reason] += 1
+            print(f"🗑️ 대화 히스토리 LRU 제거 ({reason} 상한): {session_id}")
+            self._notify_removed(session_id, reason)
+
+    def sweep(self) -> int:
+        """TTL이 지난 세션 제거 - 활동 순으로 정렬되어 있으므로 앞쪽 만료분만 확인"""
+        deadline = time.monotonic() - self.ttl_seconds
+        removed = 0
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_active > deadline:
+                break
+            del self._sessions[session_id]
+            self._bytes -= session.size
+            removed += 1
+            print(f"🗑️ 오래된 세션 삭제: {session_id}")
+            self._notify_removed(session_id, "expired")
+        self.evictions["expired"] += removed
+        self.last_sweep_at = time.time()
+        return removed
+
+    def usage(self) -> Dict[str, Any]:
+        return {"sessions": len(self._sessions), "bytes": self._bytes}
+
+    # ========================================
+    # 기록 / 로그
+    # ========================================
+
+    def get_record(self, namespace: str, key: str) -> Optional[str]:
+        return self._records.get(namespace, {}).get(key)
+
+    def put_record(self, namespace: str, key: str, value: str):
+        self._records.setdefault(namespace, {})[key] = value
+
+    def delete_record(self, namespace: str, key: str):
+        self._records.get(namespace, {}).pop(key, None)
+
+    def list_record_keys(self, namespace: str, prefix: str = "") -> List[str]:
+        return [key for key in self._records.get(namespace, {}) if key.startswith(prefix)]
+
+    def append_log(self, namespace: str, key: str, value: str):
+        self._logs.setdefault(namespace, {}).setdefault(key, []).append(value)
+
+    def read_log(self, namespace: str, key: str) -> List[str]:
+        return list(self._logs.get(namespace, {}).get(key, ()))
+
+    def log_length(self, namespace: str, key: str) -> int:
+        return len(self._logs.get(namespace, {}).get(key, ()))
+
+    def drop_log_head(self, namespace: str, key: str, count: int):
+        entries = self._logs.get(namespace, {}).get(key)
+        if entries is not None:
+            del entries[:count]
+
+    def delete_log(self, namespace: str, key: str):
+        self._logs.get(namespace, {}).pop(key, None)
@@ -0,0 +1,179 @@
+"""
+🧱 Redis 세션 저장소 - 여러 Cloud Run 인스턴스가 같은 대화/ADK 세션/AS 접수 상태를 공유
+
+🔧 키 구성 (prefix 기본값 "interior:"):
+- conv:{세션 ID}        리스트 - 메시지 JSON (RPUSH + LTRIM으로 max_history개 유지, TTL 백업 EXPIRE)
+- conv_active           정렬 집합 - 세션 ID → 마지막 활동 시각 (LRU 상한 / TTL 정리 순서)
+- conv_size / conv_bytes 해시 / 카운터 - 세션별 바이트와 전체 바이트 (바이트 상한)
+- rec:{네임스페이스}     해시 - 키 → 문자열 (ADK 세션 메타/상태, AS 접수 상태)
+- log:{네임스페이스}:{키} 리스트 - 순서 있는 문자열 (ADK 세션 이벤트)
+
+클라이언트는 redis-py 호환 동기 클라이언트(decode_responses=True)를 주입받습니다.
+파이프라인/Lua 없이 기본 명령만 사용하므로 로컬 대체 구현으로도 검증할 수 있습니다.
+삭제/만료는 ZREM이 성공한 워커 하나만 제거 리스너를 호출합니다.
+"""
+
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .session_store import SessionStore, message_size
+
+
+class RedisSessionStore(SessionStore):
+    """Redis 세션 저장소 - 인스턴스 간 대화/ADK 세션 공유"""
+
+    backend = "redis"
+    blocking = True
+
+    def __init__(self, client, prefix: str = "interior:", **limits):
+        super().__init__(**limits)
+        self.client = client
+        self.prefix = prefix
+        self._active_key = f"{prefix}conv_active"
+        self._size_key = f"{prefix}conv_size"
+        self._bytes_key = f"{prefix}conv_bytes"
+
+    def _conv_key(self, session_id: str) -> str:
+        return f"{self.prefix}conv:{session_id}"
+
+    def _record_key(self, namespace: str) -> str:
+        return f"{self.prefix}rec:{namespace}"
+
+    def _log_key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}log:{namespace}:{key}"
+
+    # ========================================
+    # 대화 히스토리
+    # ========================================
+
+    def __len__(self) -> int:
+        return int(self.client.zcard(self._active_key))
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.client.zscore(self._active_key, session_id) is not None
+
+    def ensure(self, session_id: str) -> bool:
+        created = self.client.zadd(self._active_key, {session_id: time.time()}) == 1
+        if created:
+            self._evict(session_id)
+        return created
+
+    def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        if session_id not in self:
+            return None
+        return [json.loads(raw) for raw in self.client.lrange(self._conv_key(session_id), 0, -1)]
+
+    def append(self, session_id: str, role: str, content: str):
+        message = {"role": role, "content": content, "timestamp": time.time()}
+        conv_key = self._conv_key(session_id)
+        self.client.rpush(conv_key, json.dumps(message, ensure_ascii=False))
+        # 최대 길이 초과 시 오래된 기록 삭제
+        self.client.ltrim(conv_key, -self.max_history, -1)
+        if self.ttl_seconds > 0:
+            self.client.expire(conv_key, int(self.ttl_seconds + self.sweep_interval))
+        size = sum(message_size(json.loads(raw)) for raw in self.client.lrange(conv_key, 0, -1))
+        previous = int(self.client.hget(self._size_key, session_id) or 0)
+        self.client.hset(self._size_key, session_id, size)
+        self.client.incrby(self._bytes_key, size - previous)
+        self.client.zadd(self._active_key, {session_id: message["timestamp"]})
+        self._evict(session_id)
+
+    def _remove(self, session_id: str) -> bool:
+        """세션 하나 삭제 - ZREM에 성공한 쪽만 True (여러 워커가 동시에 지워도 한 번만 알림)"""
+        if not self.client.zrem(self._active_key, session_id):
+            return False
+        self.client.delete(self._conv_key(session_id))
+        size = int(self.client.hget(self._size_key, session_id) or 0)
+        self.client.hdel(self._size_key, session_id)
+        if size:
+            self.client.incrby(self._bytes_key, -size)
+        return True
+
+    def delete(self, session_id: str) -> bool:
+        deleted = self._remove(session_id)
+        if deleted:
+            self._notify_removed(session_id, "deleted")
+        return deleted
+
+    def clear(self) -> int:
+        removed = 0
+        for session_id in self.client.zrange(self._active_key, 0, -1):
+            if self._remove(session_id):
+                removed += 1
+                self._notify_removed(session_id, "cleared")
+        return removed
+
+    def items(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        for session_id in self.client.zrange(self._active_key, 0, -1):
+            messages = self.get(session_id)
+            if messages is not None:
+                yield session_id, messages
+
+    def _total_bytes(self) -> int:
+        return int(self.client.get(self._bytes_key) or 0)
+
+    def _evict(self, keep: str):
+        # 방금 활동한 세션은 남기고 가장 오래된 세션부터 제거
+        while True:
+            count = len(self)
+            if count <= 1 or (count <= self.max_sessions and self._total_bytes() <= self.max_bytes):
+                return
+            reason = "sessions" if count > self.max_sessions else "bytes"
+            oldest = [session_id for session_id in self.client.zrange(self._active_key, 0, 1) if session_id != keep]
+            if not oldest:
+                return
+            if self._remove(oldest[0]):
+                self.evictions[reason] += 1
+                print(f"🗑️ 대화 히스토리 LRU 제거 ({reason} 상한): {oldest[0]}")
+                self._notify_removed(oldest[0], reason)
+
+    def sweep(self) -> int:
+        deadline = time.time() - self.ttl_seconds
+        removed = 0
+        for session_id in self.client.zrangebyscore(self._active_key, "-inf", deadline):
+            # 조회 후 다른 워커가 갱신했을 수 있으므로 시각 조건을 다시 확인
+            score = self.client.zscore(self._active_key, session_id)
+            if score is None or float(score) > deadline:
+                continue
+            if self._remove(session_id):
+                removed += 1
+                print(f"🗑️ 오래된 세션 삭제: {session_id}")
+                self._notify_removed(session_id, "expired")
+        self.evictions["expired"] += removed
+        self.last_sweep_at = time.time()
+        return removed
+
+    def usage(self) -> Dict[str, Any]:
+        return {"sessions": len(self), "bytes": self._total_bytes()}
+
+    # ========================================
+    # 기록 / 로그
+    # ========================================
+
+    def get_record(self, namespace: str, key: str) -> Optional[str]:
+        return self.client.hget(self._record_key(namespace), key)
+
+    def put_record(self, namespace: str, key: str, value: str):
+        self.client.hset(self._record_key(namespace), key, value)
+
+    def delete_record(self, namespace: str, key: str):
+        self.client.hdel(self._record_key(namespace), key)
+
+    def list_record_keys(self, namespace: str, prefix: str = "") -> List[str]:
+        return [key for key in self.client.hkeys(self._record_key(namespace)) if key.startswith(prefix)]
+
+    def append_log(self, namespace: str, key: str, value: str):
+        self.client.rpush(self._log_key(namespace, key), value)
+
+    def read_log(self, namespace: str, key: str) -> List[str]:
+        return list(self.client.lrange(self._log_key(namespace, key), 0, -1))
+
+    def log_length(self, namespace: str, key: str) -> int:
+        return int(self.client.llen(self._log_key(namespace, key)))
+
+    def drop_log_head(self, namespace: str, key: str, count: int):
+        self.client.ltrim(self._log_key(namespace, key), count, -1)
+
+    def delete_log(self, namespace: str, key: str):
+        self.client.delete(self._log_key(namespace, key))
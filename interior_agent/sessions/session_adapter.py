@@ -0,0 +1,131 @@
+"""
+🔌 ADK 세션 서비스 어댑터 - 동기/비동기 호출 방식은 시작 시 한 번만 확인, 세션 핸들은 캐시
+
+🎯 목적:
+resolve_adk_session은 턴마다 get_session을 동기로 호출해 보고(비동기 서비스면 코루틴만 만들어지고
+"never awaited" 경고), create_session도 동기로 시도한 뒤, 예외가 나면 같은 과정을 await로 반복했습니다.
+턴당 최대 4번 호출 + 예외 2번이었습니다.
+
+🔧 동작 방식:
+- 생성 시 get_session / create_session이 코루틴 함수인지 한 번 확인 (is_async)
+- get_or_create(app_name, session_id): (app_name, session_id)별 세션 핸들 캐시 (OrderedDict LRU)
+  → 두 번째 턴부터는 dict 조회 한 번
+- 캐시에 없을 때만 조회 → 없으면 생성 (다른 워커가 먼저 만들었으면 다시 조회)
+- 저장소 기반 서비스(StoreSessionService, 워커 간 공유)는 캐시 적중 때마다 저장된 last_update_time만 읽어
+  핸들보다 새로우면(다른 워커가 처리한 턴, 요약 압축) 다시 조회, 세션이 삭제됐으면 새로 생성
+- observe() / observe_message(): 턴 중 Runner 이벤트와 보낸 사용자 메시지를 핸들에도 추가
+  (Runner 이벤트의 timestamp로 핸들의 last_update_time도 갱신 → 이 워커가 저장한 이벤트로는 다시 조회하지 않음)
+  (마지막 응답 에이전트, 컨텍스트 조립 시 ADK 세션 중복 확인에 사용)
+- forget(): 세션이 삭제되면 캐시에서 제거 (대화 히스토리 제거 / ADK 세션 삭제 리스너)
+"""
+
+import inspect
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+
+class SessionServiceAdapter:
+    """ADK 세션 서비스 하나의 호출 방식 확인 + 세션 핸들 캐시"""
+
+    def __init__(self, service, max_handles: int = 4096, max_events: int = 200):
+        self.service = service
+        self.max_handles = max_handles
+        self.max_events = max_events  # 핸들에 유지할 최근 이벤트 수
+        # 🔍 호출 방식 확인 (시작 시 한 번)
+        self.is_async = (
+            inspect.iscoroutinefunction(service.get_session)
+            and inspect.iscoroutinefunction(service.create_session)
+        )
+        # 🔄 워커 간 공유 저장소면 캐시 적중 시 저장된 갱신 시각 확인
+        self.revalidate = hasattr(service, 'store') and hasattr(service, 'last_update_time')
+        self._handles: "OrderedDict[tuple, Any]" = OrderedDict()  # 앞쪽이 가장 오래 사용하지 않은 핸들
+        self._apps: Set[str] = set()
+        self.counters = {"hits": 0, "fetched": 0, "created": 0, "forgotten": 0, "stale": 0}
+
+    async def _call(self, method: str, **kwargs):
+        result = getattr(self.service, method)(**kwargs)
+        return await result if self.is_async else result
+
+    async def get_or_create(self, app_name: str, session_id: str, user_id: Optional[str] = None):
+        """
+        세션 핸들 조회 - 캐시 → 저장된 세션 조회 → 새로 생성
+
+        이 앱은 user_id와 session_id 모두 앱 세션 ID를 사용합니다 (user_id 생략 시 session_id).
+        """
+        key = (app_name, session_id)
+        user_id = user_id or session_id
+        handle = self._handles.get(key)
+        if handle is not None and await self._is_current(handle, app_name, user_id, session_id):
+            self._handles.move_to_end(key)
+            self.counters["hits"] += 1
+            return handle
+        if handle is not None:
+            del self._handles[key]
+            self.counters["stale"] += 1
+
+        handle = await self._call("get_session", app_name=app_name, user_id=user_id, session_id=session_id)
+        if handle is not None:
+            self.counters["fetched"] += 1
+            print(f"✅ 기존 ADK 세션 재사용: {app_name}/{session_id}")
+        else:
+            try:
+                handle = await self._call("create_session", app_name=app_name, user_id=user_id, session_id=session_id)
+                self.counters["created"] += 1
+                print(f"✅ 새 ADK 세션 생성: {app_name}/{session_id}")
+            except Exception:
+                # 다른 워커가 먼저 만든 경우 (AlreadyExistsError) - 다시 조회
+                handle = await self._call("get_session", app_name=app_name, user_id=user_id, session_id=session_id)
+                if handle is None:
+                    raise
+                self.counters["fetched"] += 1
+
+        self._apps.add(app_name)
+        self._handles[key] = handle
+        while len(self._handles) > self.max_handles:
+            self._handles.popitem(last=False)
+        return handle
+
+    async def _is_current(self, handle, app_name: str, user_id: str, session_id: str) -> bool:
+        """캐시된 핸들이 저장된 세션과 같은지 (다른 워커의 턴 / 압축 / 삭제 확인 - 세션 메타 한 건만 읽음)"""
+        if not self.revalidate:
+            return True
+        stored = await self.service.store.offload(self.service.last_update_time, app_name, user_id, session_id)
+        return stored is not None and stored <= handle.last_update_time
+
+    def observe(self, app_name: str, session_id: str, event):
+        """Runner가 만든 이벤트를 캐시된 핸들에도 추가 (부분 응답 제외, 최근 max_events개 유지)"""
+        if getattr(event, 'partial', False):
+            return
+        handle = self._handles.get((app_name, session_id))
+        if handle is None:
+            return
+        self._append(handle, event)
+        # Runner가 저장한 이벤트 → 저장된 last_update_time과 같은 값
+        handle.last_update_time = max(handle.last_update_time, getattr(event, 'timestamp', 0.0))
+
+    def _append(self, handle, event):
+        handle.events.append(event)
+        if len(handle.events) > self.max_events:
+            del handle.events[:len(handle.events) - self.max_events]
+
+    def observe_message(self, app_name: str, session_id: str, content):
+        """이번 턴에 보낸 사용자 메시지도 핸들에 추가 (Runner는 사용자 메시지 이벤트를 내보내지 않음)"""
+        handle = self._handles.get((app_name, session_id))
+        if handle is None:
+            return
+        from google.adk.events.event import Event
+        # 저장되는 사용자 이벤트는 Runner가 따로 만들므로 last_update_time은 갱신하지 않음
+        self._append(handle, Event(author="user", invocation_id="", content=content))
+
+    def forget(self, session_id: str, app_name: Optional[str] = None):
+        """세션 핸들 캐시 제거 (app_name 생략 시 모든 앱)"""
+        for name in ([app_name] if app_name is not None else list(self._apps)):
+            if self._handles.pop((name, session_id), None) is not None:
+                self.counters["forgotten"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "async" if self.is_async else "sync",
+            "cached_handles": len(self._handles),
+            **self.counters
+        }
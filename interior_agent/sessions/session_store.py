@@ -0,0 +1,211 @@
+"""
+🗄️ 세션 저장소 인터페이스 - 대화 히스토리 + ADK 세션/AS 접수 상태 기록
+
+🎯 목적:
+conversation_storage와 ADK InMemorySessionService가 모두 프로세스 메모리에 있어
+컨테이너당 uvicorn 워커를 하나만 쓸 수 있었고, Cloud Run이 다음 턴을 다른 인스턴스로
+보내면 AS 접수 대화가 끊겼습니다. 같은 인터페이스로 저장 위치만 바꿀 수 있게 합니다.
+
+🔧 구성:
+- 대화 히스토리: ensure / get / append / delete / clear / items / sweep (세션 수·바이트 상한, TTL)
+- 기록(record): 네임스페이스별 키 → 문자열 (ADK 세션 메타/상태, AS 접수 상태)
+- 로그(log): 네임스페이스별 키 → 순서 있는 문자열 목록 (ADK 세션 이벤트)
+- 구현: ConversationStore(메모리) / SQLiteSessionStore(WAL, 기본) / RedisSessionStore(클라이언트 주입)
+- 제거 리스너 + 백그라운드 TTL 정리 루프는 공통, 저장 메서드는 추상 메서드 (빠뜨린 백엔드는 생성 시 TypeError)
+- offload(): 디스크/네트워크 I/O 백엔드(blocking=True)는 호출을 스레드에서 실행 (이벤트 루프를 막지 않음)
+  스레드에서 세션이 제거되면 제거 리스너는 이벤트 루프 스레드에서 호출
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+MESSAGE_OVERHEAD_BYTES = 120  # 메시지 dict(role/timestamp/키) 자체의 대략적인 크기
+
+
+def message_size(message: Dict[str, Any]) -> int:
+    """메시지 한 건의 대략적인 메모리 사용량 (본문 UTF-8 바이트 + 고정 오버헤드)"""
+    return len(str(message.get("content", "")).encode("utf-8")) + MESSAGE_OVERHEAD_BYTES
+
+
+def _running_in(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+class SessionStore(ABC):
+    """세션 저장소 공통 부분 - 제거 리스너, 백그라운드 TTL 정리 (저장 방식은 하위 클래스가 모두 구현)"""
+
+    backend = "base"
+    blocking = False  # True면 호출마다 디스크/네트워크 I/O (offload()가 스레드에서 실행)
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024,
+        max_history: int = 10,
+        ttl_seconds: float = 3600.0,
+        sweep_interval: float = 60.0
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.max_history = max_history  # 세션당 최대 대화 기록 수
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self.evictions = {"sessions": 0, "bytes": 0, "expired": 0}
+        self.last_sweep_at: Optional[float] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self._removal_listeners: List[Callable[[str, str], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # 제거 리스너를 호출할 이벤트 루프
+
+    # ========================================
+    # 대화 히스토리 (하위 클래스 필수 구현)
+    # ========================================
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def __contains__(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def ensure(self, session_id: str) -> bool:
+        """세션이 없으면 만들고 활동 시각 갱신 (새로 만들었으면 True)"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        """세션의 대화 기록 (없으면 None, 활동 시각은 바꾸지 않음)"""
+
+    @abstractmethod
+    def append(self, session_id: str, role: str, content: str):
+        """대화 기록 추가 - 세션당 max_history개만 유지, 상한 초과 시 LRU 제거"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def clear(self) -> int:
+        ...
+
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        ...
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """TTL이 지난 세션 제거 → 제거한 세션 수"""
+
+    @abstractmethod
+    def usage(self) -> Dict[str, Any]:
+        """현재 세션 수 / 바이트"""
+
+    # ========================================
+    # 기록 / 로그 (하위 클래스 필수 구현)
+    # ========================================
+
+    @abstractmethod
+    def get_record(self, namespace: str, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def put_record(self, namespace: str, key: str, value: str):
+        ...
+
+    @abstractmethod
+    def delete_record(self, namespace: str, key: str):
+        ...
+
+    @abstractmethod
+    def list_record_keys(self, namespace: str, prefix: str = "") -> List[str]:
+        ...
+
+    @abstractmethod
+    def append_log(self, namespace: str, key: str, value: str):
+        ...
+
+    @abstractmethod
+    def read_log(self, namespace: str, key: str) -> List[str]:
+        ...
+
+    @abstractmethod
+    def log_length(self, namespace: str, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def drop_log_head(self, namespace: str, key: str, count: int):
+        """로그 앞쪽(오래된) count개 삭제"""
+
+    @abstractmethod
+    def delete_log(self, namespace: str, key: str):
+        ...
+
+    # ========================================
+    # 제거 리스너 / 백그라운드 정리 (공통)
+    # ========================================
+
+    def add_removal_listener(self, listener: Callable[[str, str], None]):
+        """세션이 제거될 때마다 (세션 ID, 사유)로 호출될 리스너 등록 - 사유: sessions | bytes | expired | deleted | cleared"""
+        self._removal_listeners.append(listener)
+
+    def _notify_removed(self, session_id: str, reason: str):
+        loop = self._loop
+        if loop is not None and not loop.is_closed() and not _running_in(loop):
+            # offload()로 스레드에서 제거된 경우 - 리스너(태스크 생성 등)는 이벤트 루프 스레드에서 실행
+            loop.call_soon_threadsafe(self._dispatch_removed, session_id, reason)
+            return
+        self._dispatch_removed(session_id, reason)
+
+    def _dispatch_removed(self, session_id: str, reason: str):
+        for listener in self._removal_listeners:
+            try:
+                listener(session_id, reason)
+            except Exception as e:
+                print(f"⚠️ 세션 제거 리스너 오류 ({session_id}): {e}")
+
+    async def offload(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """저장소 호출 - blocking 백엔드는 스레드에서 실행, 메모리 백엔드는 그대로 호출"""
+        if not self.blocking:
+            return fn(*args, **kwargs)
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.offload(self.sweep)
+            except Exception as e:
+                print(f"⚠️ 대화 히스토리 정리 실패: {e}")
+
+    def start(self):
+        """백그라운드 TTL 정리 시작 (이벤트 루프 안에서 호출)"""
+        self._loop = asyncio.get_running_loop()
+        if self._sweeper is None and self.ttl_seconds > 0:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def close(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            **self.usage(),
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "evictions": dict(self.evictions),
+            "ttl_seconds": self.ttl_seconds,
+            "sweeper_running": self._sweeper is not None and not self._sweeper.done(),
+            "last_sweep_at": self.last_sweep_at
+        }
@@ -0,0 +1,257 @@
+"""
+🗄️ SQLite 세션 저장소 (WAL) - 같은 파일을 여러 uvicorn 워커가 함께 사용
+
+🔧 동작 방식:
+- WAL 모드 + busy_timeout: 읽기는 쓰기를 막지 않고, 쓰기는 워커끼리 순서대로
+- conversations: 세션별 대화 기록(JSON) + 바이트 + 마지막 활동 시각(벽시계, 프로세스 간 공유) - last_active 색인
+- 읽고-고치고-쓰는 작업(append)은 BEGIN IMMEDIATE 트랜잭션 (다른 워커의 같은 세션 쓰기와 섞이지 않음)
+- 세션 수/바이트 상한과 TTL은 last_active 색인 순으로 가장 오래된 세션부터 제거
+- 세션 수/전체 바이트는 conversation_totals 한 행에 유지 (트리거 - 같은 트랜잭션에서 갱신)
+  → 턴마다 상한 확인이 테이블 전체 집계 없이 O(1)
+- records / logs: ADK 세션(StoreSessionService)과 AS 접수 상태 보관
+
+파일은 컨테이너 안에 있으므로 여러 인스턴스가 공유하려면 RedisSessionStore를 사용합니다.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .session_store import SessionStore, message_size
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    session_id TEXT PRIMARY KEY,
+    messages TEXT NOT NULL DEFAULT '[]',
+    size INTEGER NOT NULL DEFAULT 0,
+    last_active REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversations_last_active ON conversations(last_active);
+CREATE TABLE IF NOT EXISTS conversation_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    sessions INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO conversation_totals (id, sessions, bytes)
+    SELECT 1, COUNT(*), COALESCE(SUM(size), 0) FROM conversations;
+CREATE TRIGGER IF NOT EXISTS conversations_totals_insert AFTER INSERT ON conversations BEGIN
+    UPDATE conversation_totals SET sessions = sessions + 1, bytes = bytes + NEW.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS conversations_totals_delete AFTER DELETE ON conversations BEGIN
+    UPDATE conversation_totals SET sessions = sessions - 1, bytes = bytes - OLD.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS conversations_totals_update AFTER UPDATE OF size ON conversations BEGIN
+    UPDATE conversation_totals SET bytes = bytes + NEW.size - OLD.size WHERE id = 1;
+END;
+CREATE TABLE IF NOT EXISTS records (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS logs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS logs_key ON logs(namespace, key, seq);
+"""
+
+PREFIX_UPPER_BOUND = chr(0x10FFFF)  # 접두사 범위 검색 상한 (key >= prefix AND key < prefix + 상한)
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite(WAL) 세션 저장소 - 같은 컨테이너의 여러 워커가 대화/ADK 세션 공유"""
+
+    backend = "sqlite"
+    blocking = True
+
+    def __init__(self, db_path: str, busy_timeout: float = 5.0, **limits):
+        super().__init__(**limits)
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # isolation_level=None: 자동 커밋, 필요한 곳만 명시적 트랜잭션
+        self._db = sqlite3.connect(db_path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            # 스키마 + 집계 행 초기화를 한 트랜잭션으로 (동시에 시작한 워커가 집계를 두 번 만들지 않도록)
+            self._db.executescript(f"BEGIN IMMEDIATE;\n{SCHEMA}\nCOMMIT;")
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (다른 워커와 읽고-고치고-쓰기 충돌 방지)"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._db.execute(sql, params)
+
+    # ========================================
+    # 대화 히스토리
+    # ========================================
+
+    def _totals(self) -> Tuple[int, int]:
+        """(세션 수, 전체 바이트) - 트리거가 유지하는 집계 행"""
+        return tuple(self._execute("SELECT sessions, bytes FROM conversation_totals WHERE id = 1").fetchone())
+
+    def __len__(self) -> int:
+        return self._totals()[0]
+
+    def __contains__(self, session_id: str) -> bool:
+        return self._execute("SELECT 1 FROM conversations WHERE session_id = ?", (session_id,)).fetchone() is not None
+
+    def ensure(self, session_id: str) -> bool:
+        now = time.time()
+        with self._transaction() as db:
+            created = db.execute(
+                "INSERT OR IGNORE INTO conversations (session_id, last_active) VALUES (?, ?)", (session_id, now)
+            ).rowcount == 1
+            if not created:
+                db.execute("UPDATE conversations SET last_active = ? WHERE session_id = ?", (now, session_id))
+        if created:
+            self._evict(session_id)
+        return created
+
+    def get(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        row = self._execute("SELECT messages FROM conversations WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def append(self, session_id: str, role: str, content: str):
+        message = {"role": role, "content": content, "timestamp": time.time()}
+        with self._transaction() as db:
+            row = db.execute("SELECT messages FROM conversations WHERE session_id = ?", (session_id,)).fetchone()
+            messages = json.loads(row[0]) if row is not None else []
+            messages.append(message)
+            # 최대 길이 초과 시 오래된 기록 삭제
+            messages = messages[-self.max_history:]
+            size = sum(message_size(item) for item in messages)
+            db.execute(
+                "INSERT INTO conversations (session_id, messages, size, last_active) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET messages = excluded.messages, size = excluded.size, "
+                "last_active = excluded.last_active",
+                (session_id, json.dumps(messages, ensure_ascii=False), size, message["timestamp"])
+            )
+        self._evict(session_id)
+
+    def delete(self, session_id: str) -> bool:
+        deleted = self._execute("DELETE FROM conversations WHERE session_id = ?", (session_id,)).rowcount > 0
+        if deleted:
+            self._notify_removed(session_id, "deleted")
+        return deleted
+
+    def clear(self) -> int:
+        with self._transaction() as db:
+            session_ids = [row[0] for row in db.execute("SELECT session_id FROM conversations")]
+            db.execute("DELETE FROM conversations")
+        for session_id in session_ids:
+            self._notify_removed(session_id, "cleared")
+        return len(session_ids)
+
+    def items(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        rows = self._execute("SELECT session_id, messages FROM conversations ORDER BY last_active").fetchall()
+        for session_id, messages in rows:
+            yield session_id, json.loads(messages)
+
+    def _evict(self, keep: str):
+        # 방금 활동한 세션은 남기고 가장 오래된 세션부터 제거
+        while True:
+            count, total = self._totals()
+            if count <= 1 or (count <= self.max_sessions and total <= self.max_bytes):
+                return
+            reason = "sessions" if count > self.max_sessions else "bytes"
+            row = self._execute(
+                "SELECT session_id FROM conversations WHERE session_id != ? ORDER BY last_active LIMIT 1", (keep,)
+            ).fetchone()
+            if row is None:
+                return
+            if self._execute("DELETE FROM conversations WHERE session_id = ?", (row[0],)).rowcount:
+                self.evictions[reason] += 1
+                print(f"🗑️ 대화 히스토리 LRU 제거 ({reason} 상한): {row[0]}")
+                self._notify_removed(row[0], reason)
+
+    def sweep(self) -> int:
+        deadline = time.time() - self.ttl_seconds
+        expired = [row[0] for row in self._execute(
+            "SELECT session_id FROM conversations WHERE last_active <= ? ORDER BY last_active", (deadline,)
+        )]
+        removed = 0
+        for session_id in expired:
+            # 조회 후 다른 워커가 갱신했을 수 있으므로 시각 조건을 다시 확인
+            if self._execute(
+                "DELETE FROM conversations WHERE session_id = ? AND last_active <= ?", (session_id, deadline)
+            ).rowcount:
+                removed += 1
+                print(f"🗑️ 오래된 세션 삭제: {session_id}")
+                self._notify_removed(session_id, "expired")
+        self.evictions["expired"] += removed
+        self.last_sweep_at = time.time()
+        return removed
+
+    def usage(self) -> Dict[str, Any]:
+        count, total = self._totals()
+        return {"sessions": count, "bytes": total, "db_path": self.db_path}
+
+    # ========================================
+    # 기록 / 로그
+    # ========================================
+
+    def get_record(self, namespace: str, key: str) -> Optional[str]:
+        row = self._execute("SELECT value FROM records WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+        return row[0] if row is not None else None
+
+    def put_record(self, namespace: str, key: str, value: str):
+        self._execute(
+            "INSERT INTO records (namespace, key, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value",
+            (namespace, key, value)
+        )
+
+    def delete_record(self, namespace: str, key: str):
+        self._execute("DELETE FROM records WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def list_record_keys(self, namespace: str, prefix: str = "") -> List[str]:
+        rows = self._execute(
+            "SELECT key FROM records WHERE namespace = ? AND key >= ? AND key < ?",
+            (namespace, prefix, prefix + PREFIX_UPPER_BOUND)
+        )
+        return [row[0] for row in rows]
+
+    def append_log(self, namespace: str, key: str, value: str):
+        self._execute("INSERT INTO logs (namespace, key, value) VALUES (?, ?, ?)", (namespace, key, value))
+
+    def read_log(self, namespace: str, key: str) -> List[str]:
+        rows = self._execute("SELECT value FROM logs WHERE namespace = ? AND key = ? ORDER BY seq", (namespace, key))
+        return [row[0] for row in rows]
+
+    def log_length(self, namespace: str, key: str) -> int:
+        return self._execute("SELECT COUNT(*) FROM logs WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()[0]
+
+    def drop_log_head(self, namespace: str, key: str, count: int):
+        self._execute(
+            "DELETE FROM logs WHERE seq IN (SELECT seq FROM logs WHERE namespace = ? AND key = ? ORDER BY seq LIMIT ?)",
+            (namespace, key, count)
+        )
+
+    def delete_log(self, namespace: str, key: str):
+        self._execute("DELETE FROM logs WHERE namespace = ? AND key = ?", (namespace, key))
+
+    async def close(self):
+        await super().close()
+        with self._lock:
+            self._db.close()
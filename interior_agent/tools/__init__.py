@@ -3,12 +3,41 @@
 
 ADK 표준 구조에 따른 도구들:
 - mcp_client: Firebase/Email MCP 서버와의 통신 클라이언트
+- mcp_session_pool: ADK 세션별 MCP 세션 풀 (LRU/TTL)
+- sse_parser: 증분 SSE/JSON-RPC 응답 파서
+- resilience: 재시도/백오프/서킷 브레이커
+- tool_cache: Firestore 조회 결과 TTL/LRU 캐시
+- singleflight: 동일한 진행 중 조회 호출 합치기
+- mcp_lifecycle: 서버 시작 시 사전 연결 / keepalive / 종료 정리
+- search_index: Firestore 컬렉션 로컬 n-gram 역색인 (smart_search)
+- korean_text: 한글 검색 키 정규화 (자모 분해 / 초성 / 숫자 정규화 / 제한 편집 거리)
+- firestore_mirror: 자주 조회하는 컬렉션의 로컬 SQLite/FTS5 미러 (선택, FIRESTORE_MIRROR_ENABLED)
 """
 
 from .mcp_client import firebase_client, email_client, MCPClient
+from .mcp_session_pool import MCPSessionPool
+from .sse_parser import SSEParser
+from .resilience import RetryPolicy, CircuitBreaker, is_idempotent_tool
+from .tool_cache import ToolResultCache
+from .singleflight import SingleFlight
+from .mcp_lifecycle import MCPLifecycle
+from .search_index import FirestoreSearchIndex, firebase_search_index
+from .firestore_mirror import FirestoreMirror, firestore_mirror
 
 __all__ = [
     'firebase_client',
     'email_client', 
-    'MCPClient'
+    'MCPClient',
+    'MCPSessionPool',
+    'SSEParser',
+    'RetryPolicy',
+    'CircuitBreaker',
+    'is_idempotent_tool',
+    'ToolResultCache',
+    'SingleFlight',
+    'MCPLifecycle',
+    'FirestoreSearchIndex',
+    'firebase_search_index',
+    'FirestoreMirror',
+    'firestore_mirror'
 ] 
\ No newline at end of file
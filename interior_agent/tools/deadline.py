@@ -0,0 +1,72 @@
+"""
+⏱️ 요청 단위 시간 예산(deadline) 전파
+
+🎯 목적:
+/chat 한 턴이 여러 도구 호출을 연쇄로 실행하면 호출마다 고정된 15초/20초 타임아웃이
+누적되어 전체 지연이 한없이 늘어날 수 있었습니다.
+
+🔧 동작 방식:
+- /chat에서 deadline_scope(초)로 요청 전체 예산을 설정 (ContextVar)
+- ADK Runner → 도구 함수 → MCPClient까지 같은 컨텍스트로 전파
+- MCPClient는 budget_timeout()으로 남은 예산과 기본 타임아웃 중 작은 값을 사용
+- 예산이 소진되면 DeadlineExceeded (재시도 없이 즉시 종료)
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Optional
+
+# 요청 마감 시각 (time.monotonic() 기준 절대값, 없으면 None)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """요청 시간 예산 소진"""
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """현재 컨텍스트에 시간 예산 설정 (이미 더 짧은 예산이 있으면 그대로 유지)"""
+    if seconds is None:
+        yield
+        return
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        new_deadline = min(current, new_deadline)
+    token = _deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """남은 예산(초), 예산이 없으면 None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_exceeded() -> bool:
+    remaining = remaining_time()
+    return remaining is not None and remaining <= 0
+
+
+def budget_timeout(default: float) -> float:
+    """기본 타임아웃과 남은 예산 중 작은 값 (예산 소진 시 DeadlineExceeded)"""
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    if remaining <= 0:
+        raise DeadlineExceeded("요청 시간 예산을 모두 사용했습니다")
+    return min(default, remaining)
+
+
+def detached_context() -> Context:
+    """시간 예산이 없는 컨텍스트 - 요청보다 오래 실행될 백그라운드 태스크용 (create_task(context=...))"""
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
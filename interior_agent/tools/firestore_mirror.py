@@ -0,0 +1,451 @@
+"""
+🪞 자주 조회하는 Firestore 컬렉션의 로컬 SQLite 미러 (선택 기능)
+
+🎯 목적:
+사무실 조회의 대부분이 addressesJson / estimateVersionsV3로 가는데,
+Cloud Run에서 원격 Firebase MCP 도구 호출 1회에 200~800ms가 걸립니다.
+
+🔧 동작 방식:
+- FIRESTORE_MIRROR_ENABLED=true일 때만 생성 (기본 비활성)
+- 컨테이너 안 SQLite 파일에 문서 저장, 텍스트는 FTS5(trigram) 테이블로 색인
+- 서버 시작 시 firestore_query_collection_group 페이지를 끝까지 읽어 전체 적재
+- 주기적 갱신: 다시 페이지를 읽어 내용이 바뀐 문서만 다시 쓰고, 사라진 문서는 삭제
+  (MCP 서버에 변경 피드/수정 시각 계약이 없어 읽기는 전체, 쓰기만 증분)
+- 변경 비교는 문서 내용 해시로 (갱신 중 컬렉션 전체 본문을 메모리에 올리지 않음)
+- MCPClient 쓰기 리스너로 firestore_add/update/delete_document 결과를 즉시 반영 (write-through)
+- 읽기 도구는 is_fresh()로 허용 지연(max_staleness)을 확인한 뒤에만 미러에서 응답
+  결과를 알 수 없는 쓰기가 있었던 컬렉션은 다음 갱신까지 미러를 쓰지 않음
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .deadline import detached_context
+from .korean_text import normalize_text
+from .mcp_client import firebase_client
+from .search_index import collection_id, firebase_search_index, flatten_fields
+
+DEFAULT_COLLECTIONS = ("addressesJson", "estimateVersionsV3")
+MIRROR_PAGE_TOKEN_PREFIX = "mirror:"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    rowid INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    hash TEXT,
+    synced_at REAL NOT NULL,
+    UNIQUE (collection, id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(body, tokenize = 'trigram');
+"""
+
+
+def search_body(doc: Dict[str, Any]) -> str:
+    """FTS 색인용 본문 - 문서 ID와 필드 값을 search_index와 같은 방식으로 정규화"""
+    parts = [normalize_text(doc.get("id", ""))]
+    parts.extend(normalize_text(value) for value in flatten_fields(doc.get("data", {})).values())
+    return " ".join(part for part in parts if part)
+
+
+def encode_doc(doc: Dict[str, Any]) -> str:
+    return json.dumps(doc, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def content_hash(encoded: str) -> str:
+    """변경 비교용 문서 내용 해시"""
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class FirestoreMirror:
+    """
+    컬렉션 그룹 단위 SQLite 미러 - 전체 적재 / 주기적 갱신 / write-through
+
+    갱신(기존 해시 조회, 페이지 인코딩/쓰기, 삭제)은 asyncio.to_thread로 스레드에서 실행해 이벤트 루프를 막지 않고,
+    write-through와 조회는 문서 한 건/한 페이지 단위라 이벤트 루프에서 실행합니다.
+    연결 하나를 함께 쓰므로 모든 SQLite 작업은 _lock으로 직렬화합니다.
+    """
+
+    def __init__(
+        self,
+        client,
+        collections: Tuple[str, ...] = DEFAULT_COLLECTIONS,
+        db_path: str = ":memory:",
+        page_size: int = 100,
+        refresh_interval: float = 300,
+        max_staleness: float = 900
+    ):
+        self.client = client
+        self.collections = tuple(collection_id(name) for name in collections)
+        self.db_path = db_path
+        self.page_size = page_size
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        if "hash" not in {row[1] for row in self._db.execute("PRAGMA table_info(documents)")}:
+            # 해시 열이 없던 미러 파일 - 기존 행은 다음 갱신에서 한 번 다시 씀
+            self._db.execute("ALTER TABLE documents ADD COLUMN hash TEXT")
+        self._lock = threading.RLock()  # 갱신 스레드 / 이벤트 루프의 SQLite 작업 직렬화
+        self._synced_at: Dict[str, float] = {}  # 컬렉션 → 마지막으로 끝까지 읽기 시작한 시각 (monotonic)
+        self._dirty_at: Dict[str, float] = {}  # 결과를 알 수 없는 쓰기 시각 - 이후에 시작한 갱신이 끝나야 다시 최신
+        self._written_at: Dict[Tuple[str, str], float] = {}  # write-through 시각 (갱신 중 덮어쓰기 방지)
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._pending_refreshes: Dict[str, asyncio.Task] = {}
+        self.loads = 0
+        self.refreshes = 0
+        self.refresh_ms_total = 0.0
+        self.changed_documents = 0
+        self.deleted_documents = 0
+        self.refresh_failures = 0
+        self.reads = 0
+        self.remote_fallbacks = 0
+        self.write_through = 0
+        client.add_write_listener(self.on_write)
+
+    def serves(self, collection: str) -> bool:
+        return collection_id(collection) in self.collections
+
+    def is_fresh(self, collection: str, max_staleness: Optional[float] = None) -> bool:
+        """미러로 응답해도 되는지 (미러 대상 + 적재 완료 + 허용 지연 이내 + 미확인 쓰기 없음)"""
+        name = collection_id(collection)
+        synced_at = self._synced_at.get(name)
+        if synced_at is None or self._is_dirty(name):
+            return False
+        bound = self.max_staleness if max_staleness is None else max_staleness
+        return time.monotonic() - synced_at <= bound
+
+    def _is_dirty(self, name: str) -> bool:
+        dirty_at = self._dirty_at.get(name)
+        return dirty_at is not None and dirty_at >= self._synced_at.get(name, 0.0)
+
+    def age_seconds(self, collection: str) -> Optional[float]:
+        synced_at = self._synced_at.get(collection_id(collection))
+        return None if synced_at is None else time.monotonic() - synced_at
+
+    # ========================================
+    # 📥 적재 / 갱신
+    # ========================================
+
+    async def start(self):
+        """전체 적재 후 주기적 갱신 시작 (서버 시작을 막지 않도록 백그라운드 태스크로 실행)"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop(), context=detached_context())
+
+    async def _refresh_loop(self):
+        while True:
+            for name in self.collections:
+                try:
+                    await self.refresh(name)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.refresh_failures += 1
+                    print(f"⚠️ Firestore 미러 갱신 실패: {name} ({e})")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self, name: str):
+        """컬렉션을 끝까지 읽어 바뀐 문서만 다시 쓰고, 사라진 문서는 삭제"""
+        lock = self._refresh_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            started = time.monotonic()
+            first_load = name not in self._synced_at
+            existing = await asyncio.to_thread(self._stored_hashes, name)
+            seen: Set[str] = set()
+            changed = 0
+            page_token = None
+            while True:
+                documents, page_token = await self._fetch_page(name, page_token)
+                changed += await asyncio.to_thread(self._apply_page, name, documents, existing, seen, started)
+                if not page_token or len(documents) < self.page_size:
+                    break
+
+            deleted = await asyncio.to_thread(self._delete_missing, name, existing.keys() - seen, started)
+            self._written_at = {key: at for key, at in self._written_at.items() if at >= started}
+
+            self._synced_at[name] = started
+            elapsed_ms = (time.monotonic() - started) * 1000
+            self.changed_documents += changed
+            self.deleted_documents += deleted
+            if first_load:
+                self.loads += 1
+            else:
+                self.refreshes += 1
+                self.refresh_ms_total += elapsed_ms
+            print(f"🪞 Firestore 미러 {'적재' if first_load else '갱신'}: {name} "
+                  f"(문서 {len(seen)}개, 변경 {changed}개, 삭제 {deleted}개, {elapsed_ms:.0f}ms)")
+
+    async def _fetch_page(self, name: str, page_token: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        params = {"collectionId": name, "limit": self.page_size}
+        if page_token:
+            params["pageToken"] = page_token
+        result = await self.client.call_tool("firestore_query_collection_group", params)
+        payload = result.get("result") if isinstance(result, dict) else None
+        if not isinstance(payload, dict):
+            raise RuntimeError(f"페이지 조회 실패: {result}")
+        return payload.get("documents") or [], payload.get("nextPageToken")
+
+    def _schedule_refresh(self, name: str):
+        """결과를 알 수 없는 쓰기 이후 주기를 기다리지 않고 한 번 더 갱신"""
+        task = self._pending_refreshes.get(name)
+        if task is not None and not task.done():
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self.refresh(name), context=detached_context())
+        except RuntimeError:
+            return  # 이벤트 루프 밖 - 다음 주기적 갱신에서 반영
+        self._pending_refreshes[name] = task
+        task.add_done_callback(lambda t: self._on_refresh_done(name, t))
+
+    def _on_refresh_done(self, name: str, task: asyncio.Task):
+        if self._pending_refreshes.get(name) is task:
+            del self._pending_refreshes[name]
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_failures += 1
+            print(f"⚠️ Firestore 미러 갱신 실패: {name} ({task.exception()})")
+
+    # ========================================
+    # 💾 SQLite 쓰기
+    # ========================================
+
+    def _stored_hashes(self, name: str) -> Dict[str, Optional[str]]:
+        """컬렉션의 문서 ID → 내용 해시 (갱신 스레드)"""
+        with self._lock:
+            return dict(self._db.execute("SELECT id, hash FROM documents WHERE collection = ?", (name,)))
+
+    def _apply_page(self, name: str, documents: List[Dict[str, Any]], existing: Dict[str, Optional[str]],
+                    seen: Set[str], started: float) -> int:
+        """페이지 한 건 반영 - 해시가 바뀐 문서만 다시 씀 → 쓴 문서 수 (갱신 스레드)"""
+        changed = 0
+        with self._lock, self._db:
+            for doc in documents:
+                doc_id = str(doc.get("id", ""))
+                if not doc_id:
+                    continue
+                seen.add(doc_id)
+                # 페이지를 받는 동안 write-through된 문서는 읽은 내용이 더 오래되었을 수 있음
+                if self._written_at.get((name, doc_id), 0.0) >= started:
+                    continue
+                encoded = encode_doc(doc)
+                if existing.get(doc_id) != content_hash(encoded):
+                    self._upsert(name, doc_id, doc, encoded)
+                    changed += 1
+        return changed
+
+    def _delete_missing(self, name: str, doc_ids: Set[str], started: float) -> int:
+        """갱신 중 보이지 않은 문서 삭제 (그 사이 write-through된 문서 제외) → 삭제한 수 (갱신 스레드)"""
+        deleted = 0
+        with self._lock, self._db:
+            for doc_id in doc_ids:
+                if self._written_at.get((name, doc_id), 0.0) < started:
+                    self._delete(name, doc_id)
+                    deleted += 1
+        return deleted
+
+    def _upsert(self, name: str, doc_id: str, doc: Dict[str, Any], encoded: Optional[str] = None):
+        encoded = encoded or encode_doc(doc)
+        digest = content_hash(encoded)
+        row = self._db.execute(
+            "SELECT rowid FROM documents WHERE collection = ? AND id = ?", (name, doc_id)
+        ).fetchone()
+        if row is None:
+            cursor = self._db.execute(
+                "INSERT INTO documents (collection, id, doc, hash, synced_at) VALUES (?, ?, ?, ?, ?)",
+                (name, doc_id, encoded, digest, time.time())
+            )
+            rowid = cursor.lastrowid
+        else:
+            rowid = row[0]
+            self._db.execute("UPDATE documents SET doc = ?, hash = ?, synced_at = ? WHERE rowid = ?",
+                             (encoded, digest, time.time(), rowid))
+            self._db.execute("DELETE FROM documents_fts WHERE rowid = ?", (rowid,))
+        self._db.execute("INSERT INTO documents_fts (rowid, body) VALUES (?, ?)", (rowid, search_body(doc)))
+
+    def _delete(self, name: str, doc_id: str):
+        row = self._db.execute(
+            "SELECT rowid FROM documents WHERE collection = ? AND id = ?", (name, doc_id)
+        ).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+            self._db.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+
+    def on_write(self, tool_name: str, arguments: Dict[str, Any], result: Dict[str, Any]):
+        """MCPClient 쓰기 리스너 - 성공한 쓰기는 미러에 바로 반영, 결과를 알 수 없으면 다음 갱신까지 미러 사용 중지"""
+        collection = (arguments or {}).get("collection")
+        if not collection or not self.serves(collection):
+            return
+        name = collection_id(collection)
+
+        payload = result.get("result") if isinstance(result, dict) else None
+        if not isinstance(payload, dict) or "error" in result:
+            self._mark_dirty(name)
+            return
+
+        doc_id = arguments.get("id")
+        if tool_name == "firestore_add_document":
+            doc_id = payload.get("id") or (payload.get("document") or {}).get("id")
+        if not doc_id:
+            self._mark_dirty(name)
+            return
+        doc_id = str(doc_id)
+
+        with self._lock, self._db:
+            if tool_name == "firestore_delete_document":
+                self._delete(name, doc_id)
+            elif tool_name == "firestore_update_document":
+                doc = self.get_document(name, doc_id, count=False)
+                if doc is None:
+                    self._mark_dirty(name)
+                    return
+                merged = dict(doc.get("data") or {})
+                merged.update(arguments.get("data") or {})
+                self._upsert(name, doc_id, {**doc, "data": merged})
+            elif tool_name == "firestore_add_document":
+                self._upsert(name, doc_id, {"id": doc_id, "data": arguments.get("data") or {}})
+            else:
+                return
+        self._written_at[(name, doc_id)] = time.monotonic()
+        self.write_through += 1
+
+    def _mark_dirty(self, name: str):
+        self._dirty_at[name] = time.monotonic()
+        self._schedule_refresh(name)
+
+    # ========================================
+    # 📤 읽기
+    # ========================================
+
+    def get_document(self, collection: str, document_id: str, count: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT doc FROM documents WHERE collection = ? AND id = ?", (collection_id(collection), str(document_id))
+            ).fetchone()
+        if count:
+            self.reads += 1
+        return json.loads(row[0]) if row is not None else None
+
+    def list_documents(
+        self,
+        collection: str,
+        limit: int = 20,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """문서 ID 순 목록 + 다음 페이지 토큰 ("mirror:<offset>")"""
+        offset = int(page_token[len(MIRROR_PAGE_TOKEN_PREFIX):]) if page_token else 0
+        limit = max(1, limit or 20)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT doc FROM documents WHERE collection = ? ORDER BY id LIMIT ? OFFSET ?",
+                (collection_id(collection), limit + 1, offset)
+            ).fetchall()
+        self.reads += 1
+        next_token = f"{MIRROR_PAGE_TOKEN_PREFIX}{offset + limit}" if len(rows) > limit else None
+        return [json.loads(row[0]) for row in rows[:limit]], next_token
+
+    def iter_pages(self, collection: str, page_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """컬렉션 전체를 페이지 단위로 (검색 색인 생성용)"""
+        with self._lock:
+            cursor = self._db.execute("SELECT doc FROM documents WHERE collection = ? ORDER BY rowid", (collection_id(collection),))
+        self.reads += 1
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(page_size)
+            if not rows:
+                return
+            yield [json.loads(row[0]) for row in rows]
+
+    def match_documents(self, collection: str, normalized_query: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        FTS5 trigram 부분 문자열 검색 - 정규화된 질의를 포함하는 문서 (순위 매기기 전 후보)
+
+        trigram 토크나이저는 3글자 미만 질의를 색인으로 찾을 수 없어 LIKE 스캔으로 대신합니다.
+        """
+        name = collection_id(collection)
+        if len(normalized_query) >= 3:
+            phrase = '"' + normalized_query.replace('"', '""') + '"'
+            sql = ("SELECT d.doc FROM documents_fts f JOIN documents d ON d.rowid = f.rowid "
+                   "WHERE documents_fts MATCH ? AND d.collection = ? LIMIT ?")
+            args = (phrase, name, limit)
+        else:
+            escaped = normalized_query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            sql = ("SELECT d.doc FROM documents_fts f JOIN documents d ON d.rowid = f.rowid "
+                   "WHERE f.body LIKE ? ESCAPE '\\' AND d.collection = ? LIMIT ?")
+            args = (f"%{escaped}%", name, limit)
+        self.reads += 1
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    # ========================================
+    # 🔌 종료 / 통계
+    # ========================================
+
+    async def close(self):
+        tasks = [task for task in [self._refresh_task, *self._pending_refreshes.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_task = None
+        with self._lock:
+            self._db.close()
+        print("🪞 Firestore 미러 종료")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT collection, COUNT(*) FROM documents GROUP BY collection"))
+        collections = {}
+        for name in self.collections:
+            age = self.age_seconds(name)
+            collections[name] = {
+                "documents": counts.get(name, 0),
+                "age_seconds": round(age, 1) if age is not None else None,
+                "fresh": self.is_fresh(name),
+                "dirty": self._is_dirty(name)
+            }
+        return {
+            "db_path": self.db_path,
+            "collections": collections,
+            "refresh_interval_seconds": self.refresh_interval,
+            "max_staleness_seconds": self.max_staleness,
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "avg_refresh_ms": round(self.refresh_ms_total / self.refreshes, 1) if self.refreshes else 0.0,
+            "changed_documents": self.changed_documents,
+            "deleted_documents": self.deleted_documents,
+            "refresh_failures": self.refresh_failures,
+            "reads": self.reads,
+            "remote_fallbacks": self.remote_fallbacks,
+            "write_through": self.write_through
+        }
+
+
+def create_firestore_mirror(client) -> Optional[FirestoreMirror]:
+    """환경 변수로 미러 생성 (FIRESTORE_MIRROR_ENABLED=true가 아니면 None)"""
+    if os.getenv("FIRESTORE_MIRROR_ENABLED", "false").lower() != "true":
+        return None
+    collections = os.getenv("FIRESTORE_MIRROR_COLLECTIONS", ",".join(DEFAULT_COLLECTIONS))
+    return FirestoreMirror(
+        client,
+        collections=tuple(name.strip() for name in collections.split(",") if name.strip()),
+        db_path=os.getenv("FIRESTORE_MIRROR_PATH", "/tmp/firestore_mirror.sqlite3"),
+        refresh_interval=float(os.getenv("FIRESTORE_MIRROR_REFRESH_SECONDS", "300")),
+        max_staleness=float(os.getenv("FIRESTORE_MIRROR_MAX_STALENESS_SECONDS", "900"))
+    )
+
+
+# ========================================
+# 🌐 Firebase MCP 미러 인스턴스 (비활성 시 None)
+# ========================================
+firestore_mirror = create_firestore_mirror(firebase_client)
+if firestore_mirror is not None:
+    firebase_search_index.use_mirror(firestore_mirror)
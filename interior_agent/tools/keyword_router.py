@@ -0,0 +1,167 @@
+"""
+🚦 키워드 사전 라우터 - 라우팅 LLM 호출 없이 하위 에이전트로 바로 전달
+
+🎯 목적:
+root_agent(LlmAgent)는 "조회", "이메일", "AS 요청" 같은 키워드를 보고 하위 에이전트로
+넘기는 일만 하는데, 그 판단에 사용자 턴마다 Gemini 왕복이 한 번 더 들어갔습니다.
+
+🔧 동작 방식:
+- agent.py의 키워드 목록(root_agent instruction에 들어가는 것과 같은 목록)으로
+  Aho-Corasick 자동자를 한 번 만들어 메시지를 한 번만 훑어 모든 키워드를 찾음
+- 정규화: NFKC + 소문자 + 토큰별 문장부호 제거, 띄어쓰기는 공백 하나로 ("A/S  요청" → "as 요청")
+  공백이 들어간 키워드는 붙여 쓴 형태("as요청")도 함께 등록
+- 영문 키워드는 단어 경계에서만 일치 ("test"는 "latest"에 일치하지 않음)
+- 일치한 하위 에이전트가 정확히 하나면 바로 전달, 없거나 여럿이면 기존 LLM 라우터 사용
+- 라우팅 결정 수, LLM 라우팅에 걸린 시간, 바로 전달로 아낀 시간(추정) 집계
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .korean_text import normalize_text
+
+
+def normalize_for_routing(text: str) -> str:
+    """라우팅용 정규화 - 토큰별 normalize_text, 토큰 사이는 공백 하나"""
+    return " ".join(token for token in (normalize_text(part) for part in str(text).split()) if token)
+
+
+def is_ascii_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class AhoCorasick:
+    """여러 패턴을 한 번의 선형 스캔으로 찾는 Aho-Corasick 자동자"""
+
+    def __init__(self, patterns: Dict[str, Any]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, Any]]] = [[]]
+        for pattern, payload in patterns.items():
+            if pattern:
+                self._insert(pattern, payload)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, payload: Any):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((pattern, payload))
+
+    def _build_failure_links(self):
+        # 너비 우선으로 실패 링크 계산, 실패 상태의 출력도 합쳐 둠 (접미사 키워드)
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int, str, Any]]:
+        """(시작, 끝, 패턴, 값) - 겹치는 일치 포함"""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern, payload in self._output[state]:
+                yield i + 1 - len(pattern), i + 1, pattern, payload
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+
+class RouteDecision:
+    """키워드 라우팅 결과"""
+
+    __slots__ = ("target", "reason", "matches")
+
+    def __init__(self, target: Optional[str], reason: str, matches: Dict[str, List[str]]):
+        self.target = target  # 바로 전달할 하위 에이전트 이름 (None이면 LLM 라우터)
+        self.reason = reason  # keyword | ambiguous | no_match | sticky
+        self.matches = matches  # 하위 에이전트 → 일치한 키워드
+
+    def __repr__(self) -> str:
+        return f"RouteDecision(target={self.target!r}, reason={self.reason!r}, matches={self.matches})"
+
+
+class KeywordRouter:
+    """하위 에이전트별 키워드 목록 → 결정적 라우팅 + 통계"""
+
+    def __init__(self, routes: Dict[str, Iterable[str]], sticky_agents: Iterable[str] = ()):
+        self.routes = {target: tuple(keywords) for target, keywords in routes.items()}
+        self.sticky_agents = frozenset(sticky_agents)  # 여러 턴 절차를 진행하는 에이전트 (중간에 가로채지 않음)
+        patterns: Dict[str, str] = {}
+        for target, keywords in self.routes.items():
+            for keyword in keywords:
+                normalized = normalize_for_routing(keyword)
+                for variant in {normalized, normalized.replace(" ", "")}:
+                    if patterns.setdefault(variant, target) != target:
+                        raise ValueError(f"키워드 '{keyword}'가 {patterns[variant]}와 {target}에 중복 등록되었습니다")
+        self._matcher = AhoCorasick(patterns)
+        self.decisions: Dict[str, int] = {}
+        self.direct_dispatches = 0
+        self.llm_routed_turns = 0
+        self.llm_routing_ms_total = 0.0
+
+    def route(self, message: str, last_agent: Optional[str] = None) -> RouteDecision:
+        """
+        메시지 라우팅 결정
+
+        Args:
+            last_agent: 세션에서 마지막으로 응답한 하위 에이전트 (sticky_agents면 가로채지 않음)
+        """
+        if last_agent in self.sticky_agents:
+            return self._record(RouteDecision(None, "sticky", {}))
+
+        text = normalize_for_routing(message)
+        matches: Dict[str, List[str]] = {}
+        for start, end, pattern, target in self._matcher.find_all(text):
+            # 영문 키워드는 단어 중간에서 일치하지 않도록
+            if is_ascii_word_char(pattern[0]) and start > 0 and is_ascii_word_char(text[start - 1]):
+                continue
+            if is_ascii_word_char(pattern[-1]) and end < len(text) and is_ascii_word_char(text[end]):
+                continue
+            found = matches.setdefault(target, [])
+            if pattern not in found:
+                found.append(pattern)
+
+        if len(matches) == 1:
+            return self._record(RouteDecision(next(iter(matches)), "keyword", matches))
+        return self._record(RouteDecision(None, "ambiguous" if matches else "no_match", matches))
+
+    def _record(self, decision: RouteDecision) -> RouteDecision:
+        key = decision.target or decision.reason
+        self.decisions[key] = self.decisions.get(key, 0) + 1
+        return decision
+
+    def record_direct_dispatch(self):
+        self.direct_dispatches += 1
+
+    def record_llm_routing(self, elapsed_ms: float):
+        """LLM 라우터가 하위 에이전트에 넘기기까지 걸린 시간 (바로 전달 시 아낀 시간 추정용)"""
+        self.llm_routed_turns += 1
+        self.llm_routing_ms_total += elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        average = self.llm_routing_ms_total / self.llm_routed_turns if self.llm_routed_turns else 0.0
+        return {
+            "decisions": dict(self.decisions),
+            "direct_dispatches": self.direct_dispatches,
+            "llm_routed_turns": self.llm_routed_turns,
+            "avg_llm_routing_ms": round(average, 1),
+            "estimated_saved_ms": round(average * self.direct_dispatches, 1),
+            "automaton_states": len(self._matcher)
+        }
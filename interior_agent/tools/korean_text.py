@@ -0,0 +1,141 @@
+"""
+🇰🇷 한글 검색 키 정규화 - 자모 분해 / 초성 추출 / 공백·문장부호 접기 / 숫자 정규화 / 제한 편집 거리
+
+🎯 목적:
+직원들은 "월배아이파크"를 오타("월베아이파크"), 띄어쓰기 차이("월배 아이파크"),
+초성 약어("ㅇㅂㅇㅇㅍㅋ")로 검색합니다. 단순 lower() 부분 문자열 비교로는 찾을 수 없습니다.
+
+🔧 구성:
+- normalize_text: NFKC + 숫자 정규화(모든 문자 체계의 10진 숫자 → 0-9) + 소문자 + 공백/문장부호 제거
+- decompose_jamo: 완성형 음절 → 호환 자모 (겹모음/겹받침도 낱자로 분해, 오타 1개 = 편집 1회)
+- choseong: 음절의 초성만 추출 (숫자/영문은 그대로)
+- fuzzy_substring_distance: 패턴과 텍스트 부분 문자열 사이 최소 편집 거리 (Ukkonen 컷오프, 상한 초과 시 조기 중단)
+
+문서 쪽 키는 search_index.CollectionIndex가 문서를 색인할 때 한 번만 계산해 보관합니다.
+"""
+
+import unicodedata
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+JUNGSEONG_COUNT = 21
+JONGSEONG_COUNT = 28
+
+CHOSEONG_LIST = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG_LIST = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG_LIST = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+                  "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# 겹모음/겹받침 → 키보드로 입력하는 낱자 순서
+COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+CHOSEONG_SET = frozenset(CHOSEONG_LIST)
+
+# NFKC는 호환 자모("ㅇ", U+3147)를 첫가끝 자모(U+110B)로 바꾸므로 다시 호환 자모로 되돌림
+CONJOINING_TO_COMPATIBILITY = str.maketrans({
+    **{0x1100 + i: ch for i, ch in enumerate(CHOSEONG_LIST)},
+    **{0x1161 + i: ch for i, ch in enumerate(JUNGSEONG_LIST)},
+    **{0x11A8 + i: ch for i, ch in enumerate(JONGSEONG_LIST[1:])},
+})
+
+
+def normalize_digits(text: str) -> str:
+    """모든 문자 체계의 10진 숫자를 ASCII 숫자로 (NFKC가 바꾸지 않는 숫자 포함)"""
+    return "".join(str(unicodedata.decimal(ch)) if not ch.isascii() and ch.isdecimal() else ch for ch in text)
+
+
+def normalize_text(text) -> str:
+    """검색용 정규화 - NFKC, 숫자 정규화, 소문자, 글자/숫자 외 문자(공백·문장부호) 제거"""
+    text = unicodedata.normalize("NFKC", str(text)).translate(CONJOINING_TO_COMPATIBILITY)
+    text = normalize_digits(text).lower()
+    return "".join(ch for ch in text if ch.isalnum())
+
+
+def is_hangul_syllable(ch: str) -> bool:
+    return HANGUL_BASE <= ord(ch) <= HANGUL_LAST
+
+
+def _syllable_jamo(code: int) -> str:
+    index = code - HANGUL_BASE
+    cho = CHOSEONG_LIST[index // (JUNGSEONG_COUNT * JONGSEONG_COUNT)]
+    jung = JUNGSEONG_LIST[(index // JONGSEONG_COUNT) % JUNGSEONG_COUNT]
+    jong = JONGSEONG_LIST[index % JONGSEONG_COUNT]
+    return cho + COMPOUND_JAMO.get(jung, jung) + COMPOUND_JAMO.get(jong, jong)
+
+
+# str.translate용 변환표 (음절 11,172개를 미리 계산 - 문서 색인 시 글자마다 나눗셈하지 않도록)
+JAMO_TABLE = {code: _syllable_jamo(code) for code in range(HANGUL_BASE, HANGUL_LAST + 1)}
+JAMO_TABLE.update({ord(ch): parts for ch, parts in COMPOUND_JAMO.items()})
+CHOSEONG_TABLE = {
+    code: CHOSEONG_LIST[(code - HANGUL_BASE) // (JUNGSEONG_COUNT * JONGSEONG_COUNT)]
+    for code in range(HANGUL_BASE, HANGUL_LAST + 1)
+}
+
+
+def decompose_jamo(text: str) -> str:
+    """완성형 음절을 호환 자모로 분해 ("월배" → "ㅇㅜㅓㄹㅂㅐ"), 나머지 문자는 그대로"""
+    return text.translate(JAMO_TABLE)
+
+
+def choseong(text: str) -> str:
+    """음절의 초성만 추출 ("월배아이파크101" → "ㅇㅂㅇㅇㅍㅋ101")"""
+    return text.translate(CHOSEONG_TABLE)
+
+
+def is_choseong_query(normalized: str) -> bool:
+    """초성 약어 질의인지 (자음 낱자 1개 이상 + 완성형 음절/모음 없음)"""
+    has_consonant = False
+    for ch in normalized:
+        if ch in CHOSEONG_SET:
+            has_consonant = True
+        elif is_hangul_syllable(ch) or "ㅏ" <= ch <= "ㅣ":
+            return False
+    return has_consonant
+
+
+def max_typo_distance(jamo_length: int) -> int:
+    """질의 자모 길이별 허용 편집 거리 (짧은 질의는 오타 허용 안 함)"""
+    if jamo_length < 6:
+        return 0
+    if jamo_length < 12:
+        return 1
+    return 2
+
+
+def fuzzy_substring_distance(pattern: str, text: str, max_distance: int) -> int:
+    """
+    pattern과 text의 어떤 부분 문자열 사이 최소 편집 거리 (Sellers 알고리즘)
+
+    Ukkonen 컷오프로 값이 max_distance 이하인 행까지만 계산합니다.
+    max_distance를 넘으면 max_distance + 1을 반환합니다.
+    """
+    m = len(pattern)
+    limit = max_distance + 1
+    column = list(range(m + 1))  # column[i] = 패턴 앞 i글자와 텍스트 현재 위치에서 끝나는 부분 문자열의 거리
+    last = min(max_distance, m)  # 값이 max_distance 이하인 마지막 행
+    best = m if last == m else limit  # 빈 부분 문자열과의 거리
+    for ch in text:
+        diagonal = 0
+        rows = min(last + 1, m)
+        for i in range(1, rows + 1):
+            above = column[i]
+            cost = 0 if pattern[i - 1] == ch else 1
+            value = diagonal + cost
+            if above + 1 < value:
+                value = above + 1
+            if column[i - 1] + 1 < value:
+                value = column[i - 1] + 1
+            column[i] = value
+            diagonal = above
+        last = rows
+        while last > 0 and column[last] > max_distance:
+            last -= 1
+        if last == m and column[m] < best:
+            best = column[m]
+            if best == 0:
+                return 0
+    return best if best <= max_distance else limit
@@ -9,7 +9,7 @@ Google ADK의 표준 MCPToolset을 사용할 수 없습니다.
 🔧 주요 특징:
 - ADK 표준 MCPToolset 대신 직접 HTTP 클라이언트 구현
 - JSON-RPC 2.0 프로토콜 수동 처리
-- SSE 형식 응답 파싱 지원
+- SSE 형식 응답 증분(스트리밍) 파싱 지원
 - 세션 관리 및 재사용 최적화
 - Firebase MCP 서버 특성에 맞춘 헤더 및 파라미터 처리
 
@@ -20,162 +20,622 @@ ADK 표준을 따르지 않는 것이 아니라, Firebase MCP의 제약사항으
 🎯 ADK 표준 구조에서의 역할:
 - 인프라 계층: MCP 서버와의 통신 담당
 - 도구 지원: Firebase/Email 에이전트들이 공통으로 사용
-- 세션 관리: ADK 세션과 MCP 세션 동기화
+- 세션 관리: ADK 세션별 MCP 세션 풀 (LRU/TTL, 연결 공유)
 """
 
 import aiohttp
+import asyncio
+import itertools
 import json
+import time
 import uuid
-from typing import Dict, Any
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional
+
+from .mcp_session_pool import MCPSessionPool, MCPSessionEntry
+from .sse_parser import iter_jsonrpc_messages
+from .resilience import RetryPolicy, CircuitBreaker, get_circuit_breaker, is_idempotent_tool, TRANSIENT_HTTP_STATUSES
+from .tool_cache import ToolResultCache, WRITE_TOOLS, make_tool_key
+from .singleflight import SingleFlight
+from .deadline import DeadlineExceeded, budget_timeout, deadline_exceeded, remaining_time
+
+# 배치(JSON 배열) 요청 자체를 받지 않는 서버의 응답 - 이후 개별 동시 호출만 사용
+BATCH_REJECTED_STATUSES = {400, 404, 405, 501}
+
+def create_tuned_connector(
+    limit: int = 100,
+    limit_per_host: int = 50,
+    keepalive_timeout: float = 75,
+    ttl_dns_cache: int = 300
+) -> aiohttp.TCPConnector:
+    """keepalive / DNS 캐시 / 연결 수 제한을 튜닝한 TCPConnector"""
+    return aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=ttl_dns_cache
+    )
 
 class MCPClient:
-    """미니멀한 MCP HTTP 클라이언트 - HTTP Direct with Session"""
+    """미니멀한 MCP HTTP 클라이언트 - HTTP Direct with Session Pool"""
     
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 256,
+        pool_ttl: float = 1800,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cache: Optional[ToolResultCache] = None,
+        singleflight: bool = True
+    ):
         self.url = url
-        self.initialized = False
-        self.session_id = None
-        self._session = None  # 🔧 세션 재사용을 위한 변수 추가
-        self.current_adk_session = None  # 🆕 현재 ADK 세션 추적
-    
-    async def initialize(self, session):
-        """MCP 서버 초기화 - Stream 응답 처리"""
-        if self.initialized:
-            return True
-            
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
-        init_payload = {
-            "jsonrpc": "2.0",
-            "id": 0,
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "interior-agent", "version": "1.0.0"}
-            }
+        self._session = None  # 🔧 모든 ADK 세션이 공유하는 aiohttp 세션 (TCPConnector 1개)
+        self._shared_connector = None  # 🆕 여러 클라이언트가 함께 쓰는 튜닝된 커넥터 (use_connector)
+        # 🆕 ADK 세션별 MCP 세션 풀 (세션 전환 시 연결을 끊지 않음)
+        self._pool = MCPSessionPool(
+            max_size=pool_size,
+            ttl_seconds=pool_ttl,
+            on_evict=self._on_pool_evict
+        )
+        self._background_tasks = set()
+        # 🆕 JSON-RPC 요청 ID 할당기 (initialize는 1 고정, 도구 호출은 2부터)
+        self._request_ids = itertools.count(2)
+        # 🆕 응답 대기 중인 요청 ID → Future (응답 상관관계 매칭)
+        self._pending: Dict[int, asyncio.Future] = {}
+        # 서버가 JSON-RPC 배치 배열을 거부하면 이후에는 동시 개별 호출로 대체
+        self.batch_supported = True
+        # 🛡️ 복원력 계층 (재시도 정책 + 엔드포인트별 서킷 브레이커)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._breaker = circuit_breaker or get_circuit_breaker(url)
+        # 🗃️ 조회 결과 캐시 (None이면 비활성)
+        self.cache = cache
+        # 🛬 동일 조회 호출 합치기 (조회 도구에만 적용)
+        self._singleflight = SingleFlight() if singleflight else None
+        # ✍️ 쓰기 도구 호출 결과를 받는 리스너 (예: 검색 색인 갱신)
+        self._write_listeners: List[Callable[[str, Dict[str, Any], Dict[str, Any]], None]] = []
+        self.resilience_counters = {
+            "calls": 0,
+            "retries": 0,
+            "recovered": 0,
+            "transient_failures": 0,
+            "fast_failures": 0
         }
-        
+    
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """공유 aiohttp 세션 반환 (없거나 닫혔으면 새로 생성)"""
+        if self._session is None or self._session.closed:
+            if self._shared_connector is not None and not self._shared_connector.closed:
+                self._session = aiohttp.ClientSession(connector=self._shared_connector, connector_owner=False)
+            else:
+                self._session = aiohttp.ClientSession(connector=create_tuned_connector())
+        return self._session
+    
+    def use_connector(self, connector: aiohttp.TCPConnector):
+        """공유 커넥터 사용 설정 (다음 세션 생성부터 적용, 커넥터 종료는 소유자가 담당)"""
+        self._shared_connector = connector
+    
+    async def warmup(self) -> float:
+        """DNS/TLS 연결과 initialize를 미리 수행 - 소요 시간(초) 반환"""
+        started = time.perf_counter()
+        ok = await self.initialize()
+        elapsed = time.perf_counter() - started
+        print(f"{'🔥' if ok else '⚠️'} MCP 사전 연결 {'완료' if ok else '실패'}: {self.url} ({elapsed * 1000:.0f}ms)")
+        if not ok:
+            raise ConnectionError(f"MCP initialize 실패: {self.url}")
+        return elapsed
+    
+    async def ping(self, adk_session_id: str = None) -> bool:
+        """MCP ping - 연결 유지(keepalive) 및 서버 상태 확인"""
+        entry = self._pool.acquire(adk_session_id)
+        session = self._get_http_session()
         try:
-            async with session.post(self.url, json=init_payload, headers=headers, timeout=15) as response:
-                if response.status == 200:
-                    # Stream 응답 처리
-                    response_text = await response.text()
-                    print(f"🔥 MCP 초기화 응답: {response_text[:100]}...")
-                    self.initialized = True
-                    return True
-                else:
-                    print(f"❌ MCP 초기화 실패: {response.status}")
-                    return False
+            await self._ensure_initialized(session, entry)
+            payload = {"jsonrpc": "2.0", "id": next(self._request_ids), "method": "ping"}
+            async with session.post(self.url, json=payload, headers=self._build_headers(entry), timeout=10) as response:
+                await response.read()
+                if response.status == 404:
+                    self._pool.discard(entry.key)  # 서버 세션 만료 - 다음 호출에서 재초기화
+                return response.status == 200
         except Exception as e:
-            print(f"❌ MCP 초기화 오류: {e}")
+            print(f"⚠️ MCP ping 실패: {self.url} - {e}")
             return False
     
+    async def initialize(self, adk_session_id: str = None) -> bool:
+        """MCP 서버 초기화 - 지정한 ADK 세션의 풀 엔트리를 미리 준비"""
+        entry = self._pool.acquire(adk_session_id)
+        return await self._ensure_initialized(self._get_http_session(), entry)
+    
+    async def _ensure_initialized(self, session, entry: MCPSessionEntry) -> bool:
+        """엔트리가 초기화되지 않았으면 initialize 수행 (동시 호출 시 1회만)"""
+        if entry.initialized:
+            return True
+        async with entry.init_lock:
+            if entry.initialized:
+                return True
+            print(f"🔧 MCP 초기화 시작 (ADK 세션: {entry.key})...")
+            return await self._initialize(session, entry)
+    
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any], adk_session_id: str = None) -> Dict[str, Any]:
-        """JSON-RPC 2.0 도구 호출 - ADK 세션 연동 방식 (수정됨)"""
+        """
+        JSON-RPC 2.0 도구 호출 - 결과가 도착하는 즉시 반환 (스트림 끝까지 기다리지 않음)
         
-        # 🔧 ADK 세션이 바뀌면 MCP 세션도 새로 시작
-        if adk_session_id and adk_session_id != self.current_adk_session:
-            print(f"🔄 ADK 세션 변경 감지: {self.current_adk_session} → {adk_session_id}")
-            await self._reset_mcp_session()
-            self.current_adk_session = adk_session_id
+        🗃️ 캐시 계층 (cache가 설정된 경우):
+        - 조회 도구는 TTL 캐시에서 먼저 응답
+        - 쓰기 도구 호출 후 해당 컬렉션 캐시 무효화
         
-        # 🔧 세션 재사용 또는 새로 생성
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+        🛬 Singleflight (기본 활성):
+        - 같은 조회 호출이 진행 중이면 새로 보내지 않고 그 결과를 공유
+        """
+        cache = self.cache
+        if cache is not None and cache.is_cacheable(tool_name):
+            cached = cache.get(tool_name, arguments)
+            if cached is not None:
+                print(f"⚡ 캐시 적중: {tool_name}")
+                return cached
+        
+        # ⏱️ 요청 시간 예산이 이미 소진되었으면 서버에 보내지 않음
+        if deadline_exceeded():
+            print(f"⏱️ 시간 예산 소진 - 호출 생략: {tool_name}")
+            return self._event_to_result(self._deadline_error_event())
+        
+        # 🛬 조회 도구는 동일한 진행 중 호출과 합치기
+        if self._singleflight is not None and is_idempotent_tool(tool_name):
+            try:
+                return await self._singleflight.do(
+                    make_tool_key(tool_name, arguments),
+                    lambda: self._fetch_and_cache(tool_name, arguments, adk_session_id)
+                )
+            except DeadlineExceeded:
+                # 공유 호출은 계속 진행 (완료되면 캐시에 반영) - 이 요청만 예산 초과로 종료
+                return self._event_to_result(self._deadline_error_event())
+        return await self._fetch_and_cache(tool_name, arguments, adk_session_id)
+    
+    async def _fetch_and_cache(self, tool_name: str, arguments: Dict[str, Any], adk_session_id: str = None) -> Dict[str, Any]:
+        result = await self._call_with_retry(tool_name, arguments, adk_session_id)
+        self._update_cache(tool_name, arguments, result)
+        return result
+    
+    def _update_cache(self, tool_name: str, arguments: Dict[str, Any], result: Dict[str, Any]):
+        if tool_name in WRITE_TOOLS:
+            self._notify_write_listeners(tool_name, arguments, result)
+        cache = self.cache
+        if cache is None:
+            return
+        if tool_name in WRITE_TOOLS:
+            # 실패한 쓰기도 일부 반영되었을 수 있으므로 항상 무효화
+            cache.invalidate_for_write(tool_name, arguments)
+        elif cache.is_cacheable(tool_name):
+            cache.put(tool_name, arguments, result)
+    
+    def add_write_listener(self, listener: Callable[[str, Dict[str, Any], Dict[str, Any]], None]):
+        """쓰기 도구(add/update/delete) 호출이 끝날 때마다 (도구 이름, 인자, 결과)로 호출될 리스너 등록"""
+        self._write_listeners.append(listener)
+    
+    def _notify_write_listeners(self, tool_name: str, arguments: Dict[str, Any], result: Dict[str, Any]):
+        for listener in self._write_listeners:
+            try:
+                listener(tool_name, arguments, result)
+            except Exception as e:
+                print(f"⚠️ 쓰기 리스너 오류 ({tool_name}): {e}")
+    
+    async def _call_with_retry(self, tool_name: str, arguments: Dict[str, Any], adk_session_id: str = None) -> Dict[str, Any]:
+        """
+        🛡️ 복원력 계층:
+        - 서킷이 열려 있으면 서버에 요청하지 않고 즉시 오류 반환
+        - 조회성 도구는 일시적 장애 시 지터 백오프로 재시도
+        - 쓰기/전송 도구는 재시도하지 않음 (단, 서버가 세션 만료로 처리하지 않은 경우는 1회 재시도)
+        """
+        if not self._breaker.allow_request():
+            return self._circuit_open_error()
+        # half-open 시험 호출이 결과 기록 전에 취소되면 (시간 예산 취소, 연결 종료) 시험 슬롯을 반환해야 함
+        trial = self._breaker.holds_trial()
+        
+        self.resilience_counters["calls"] += 1
+        max_attempts = self.retry_policy.attempts_for(tool_name)
+        attempt = 0
+        session_retry_used = False
         
         try:
-            # 1. 초기화 (필요한 경우) - 같은 세션 사용
-            if not self.initialized:
-                print(f"🔧 MCP 초기화 시작 (ADK 세션: {adk_session_id})...")
-                await self._initialize(self._session)
-            
-            # 2. 도구 호출 - 같은 세션 사용
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "text/event-stream, application/json"
-            }
-            
-            # 🔧 세션 ID를 여러 방법으로 전송 (개선된 버전)
-            if self.session_id:
-                session_str = str(self.session_id)
-                headers["mcp-session-id"] = session_str
-                headers["x-session-id"] = session_str
-                headers["session-id"] = session_str
-            
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "tools/call",
-                "params": {"name": tool_name, "arguments": arguments}
-            }
+            while True:
+                final = await self._call_tool_once(tool_name, arguments, adk_session_id)
+                
+                if final.get("deadline_exceeded"):
+                    return self._event_to_result(final)
+                
+                if not final.get("transient"):
+                    self._breaker.record_success()
+                    trial = False
+                    if attempt > 0:
+                        self.resilience_counters["recovered"] += 1
+                    return self._event_to_result(final)
+                
+                self._breaker.record_failure()
+                trial = False
+                self.resilience_counters["transient_failures"] += 1
+                attempt += 1
+                
+                # 세션 만료(404)는 서버가 요청을 처리하지 않은 것이므로 쓰기 도구도 1회 재시도 허용
+                can_retry = attempt < max_attempts or (final.get("session_expired") and not session_retry_used)
+                if final.get("session_expired"):
+                    session_retry_used = True
+                if not can_retry or not self._breaker.allow_request():
+                    return self._event_to_result(final)
+                trial = self._breaker.holds_trial()
+                
+                delay = 0.0 if final.get("session_expired") else self.retry_policy.backoff(attempt - 1)
+                remaining = remaining_time()
+                if remaining is not None and remaining <= delay:
+                    print(f"⏱️ 남은 시간 예산 부족 - 재시도 중단: {tool_name}")
+                    return self._event_to_result(final)
+                self.resilience_counters["retries"] += 1
+                print(f"🔁 MCP 재시도 {attempt}/{max_attempts - 1}: {tool_name} ({delay:.2f}초 후)")
+                await asyncio.sleep(delay)
+        finally:
+            if trial:
+                # 성공/실패를 기록하지 못한 시험 호출 (시간 예산 초과, 취소)
+                self._breaker.release_trial()
+    
+    async def _call_tool_once(self, tool_name: str, arguments: Dict[str, Any], adk_session_id: str = None) -> Dict[str, Any]:
+        """단일 시도 - 최종 이벤트(result/error/raw)만 반환"""
+        async with aclosing(self._stream_once(tool_name, arguments, adk_session_id, progress=False)) as events:
+            async for item in events:
+                if item["type"] != "notification":
+                    return item
+        return {"type": "raw", "raw_response": ""}
+    
+    @staticmethod
+    def _event_to_result(item: Dict[str, Any]) -> Dict[str, Any]:
+        if item["type"] == "result":
+            return item["result"]
+        if item["type"] == "error":
+            if item.get("deadline_exceeded"):
+                return {"error": item["error"], "deadline_exceeded": True}
+            return {"error": item["error"]}
+        return {"raw_response": item["raw_response"]}
+    
+    @staticmethod
+    def _deadline_error_event() -> Dict[str, Any]:
+        return {"type": "error", "error": "요청 처리 시간 예산을 초과했습니다.", "deadline_exceeded": True}
+    
+    def _circuit_open_error(self) -> Dict[str, Any]:
+        self.resilience_counters["fast_failures"] += 1
+        retry_after = self._breaker.retry_after()
+        print(f"⛔ 서킷 open - 즉시 실패: {self.url} ({retry_after:.1f}초 후 재시도 가능)")
+        return {"error": f"MCP 서버 일시 장애로 요청을 보류했습니다. {retry_after:.0f}초 후 다시 시도해주세요.", "circuit_open": True}
+    
+    async def call_tool_stream(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        adk_session_id: str = None,
+        progress: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        비동기 이터레이터 모드 도구 호출
+        
+        진행 알림을 보내는 서버를 위해 메시지를 도착 순서대로 전달합니다.
+        - {"type": "notification", "method": ..., "params": ...}: 진행 알림 (0개 이상)
+        - {"type": "result", "result": ...} / {"type": "error", "error": ...}: 최종 응답 (마지막)
+        - {"type": "raw", "raw_response": ...}: JSON-RPC 응답을 찾지 못한 경우
+        
+        스트림 모드는 이미 전달한 알림을 되돌릴 수 없으므로 재시도하지 않고 서킷 브레이커만 적용합니다.
+        """
+        if not self._breaker.allow_request():
+            yield {"type": "error", "error": self._circuit_open_error()["error"]}
+            return
+        trial = self._breaker.holds_trial()
+        
+        try:
+            async with aclosing(self._stream_once(tool_name, arguments, adk_session_id, progress)) as events:
+                async for item in events:
+                    if item["type"] != "notification" and not item.get("deadline_exceeded"):
+                        if item.get("transient"):
+                            self._breaker.record_failure()
+                        else:
+                            self._breaker.record_success()
+                        trial = False
+                    yield item
+        finally:
+            if trial:
+                # 최종 응답 전에 시간 예산 초과 / 취소 / 소비자가 스트림을 닫은 경우
+                self._breaker.release_trial()
+    
+    async def _stream_once(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        adk_session_id: str = None,
+        progress: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """단일 HTTP 요청으로 도구 호출 - 일시적 장애 오류에는 transient 플래그 표시"""
+        
+        # 🔧 ADK 세션별 MCP 세션 상태 조회 (전환 시에도 연결 유지)
+        entry = self._pool.acquire(adk_session_id)
+        session = self._get_http_session()
+        request_id = None
+        
+        try:
+            # 1. 초기화 (필요한 경우) - 엔트리별 1회
+            await self._ensure_initialized(session, entry)
             
-            # 페이로드에도 세션 ID 추가 (다양한 방법 시도)
-            if self.session_id:
-                session_str = str(self.session_id)
-                payload["params"]["sessionId"] = session_str
-                payload["params"]["session_id"] = session_str
+            # 2. 도구 호출 - 공유 연결 사용
+            headers = self._build_headers(entry)
+            payload = self._build_tool_payload(entry, tool_name, arguments, progress)
+            request_id = payload["id"]
+            future = self._register_pending(request_id)
             
-            print(f"🔥 MCP 도구 호출: {tool_name} (세션 재사용)")
-            print(f"🔑 사용 중인 세션 ID: {self.session_id}")
+            print(f"🔥 MCP 도구 호출: {tool_name} (요청 ID: {request_id}, 풀 엔트리: {entry.key})")
+            print(f"🔑 사용 중인 세션 ID: {entry.session_id}")
             
-            async with self._session.post(self.url, json=payload, headers=headers, timeout=20) as response:
+            async with session.post(self.url, json=payload, headers=headers, timeout=budget_timeout(20)) as response:
                 print(f"📡 응답 상태: {response.status}")
                 print(f"📋 Content-Type: {response.content_type}")
                 
-                if response.status == 200:
-                    response_text = await response.text()
-                    print(f"📝 응답 내용: {response_text[:300]}...")
-                    
-                    # SSE 형식 파싱
-                    if 'event:' in response_text or 'data:' in response_text:
-                        lines = response_text.strip().split('\n')
-                        for line in lines:
-                            if line.startswith('data: '):
-                                try:
-                                    json_data = json.loads(line[6:])
-                                    if "result" in json_data:
-                                        print(f"✅ 결과 파싱 성공!")
-                                        return json_data["result"]
-                                    elif "error" in json_data:
-                                        print(f"❌ MCP 오류: {json_data['error']}")
-                                        return {"error": json_data["error"]}
-                                    return json_data
-                                except Exception as parse_error:
-                                    print(f"JSON 파싱 오류: {parse_error}")
-                                    continue
-                    else:
-                        # 일반 JSON 응답
-                        try:
-                            json_result = json.loads(response_text)
-                            if "result" in json_result:
-                                return json_result["result"]
-                            elif "error" in json_result:
-                                print(f"❌ MCP 오류: {json_result['error']}")
-                                return {"error": json_result["error"]}
-                            return json_result
-                        except:
-                            pass
-                    
-                    return {"raw_response": response_text}
-                else:
+                if response.status != 200:
                     error_text = await response.text()
                     print(f"❌ HTTP 오류: {response.status} - {error_text}")
-                    return {"error": f"HTTP {response.status}: {error_text[:100]}"}
+                    error_event = {
+                        "type": "error",
+                        "error": f"HTTP {response.status}: {error_text[:100]}",
+                        "transient": response.status in TRANSIENT_HTTP_STATUSES
+                    }
+                    if response.status == 404:
+                        # MCP 세션 만료 - 다음 시도에서 다시 initialize
+                        self._pool.discard(entry.key)
+                        error_event["transient"] = True
+                        error_event["session_expired"] = True
+                    yield error_event
+                    return
+                
+                # 📡 청크 단위 증분 파싱 - 일치하는 응답이 오면 즉시 종료
+                raw_parts = []
+                async for message in iter_jsonrpc_messages(response, raw_parts):
+                    if "method" in message and "id" not in message:
+                        print(f"📨 MCP 알림 수신: {message['method']}")
+                        yield {"type": "notification", "method": message["method"], "params": message.get("params", {})}
+                        continue
+                    if message.get("id") not in (request_id, None):
+                        self._dispatch(message)  # 다른 요청에 대한 응답은 대기 중인 호출에 전달
+                        continue
+                    yield self._to_final_event(message)
+                    return
+                
+                # 다른 스트림으로 응답이 전달된 경우
+                if future.done():
+                    yield self._to_final_event(future.result())
+                    return
+                
+                print(f"⚠️ JSON-RPC 응답 없음: {''.join(raw_parts)[:300]}")
+                yield {"type": "raw", "raw_response": "\n".join(raw_parts)}
                 
         except Exception as e:
+            if isinstance(e, DeadlineExceeded) or deadline_exceeded():
+                # ⏱️ 요청 시간 예산 소진 - 서버 장애가 아니므로 재시도/서킷 집계 제외
+                print(f"⏱️ MCP 호출 시간 예산 초과: {tool_name}")
+                yield self._deadline_error_event()
+                return
             print(f"❌ MCP 연결 오류: {e}")
-            # 세션 오류 시 재생성
-            if self._session and not self._session.closed:
-                await self._session.close()
-            self._session = None
-            self.initialized = False
-            return {"error": f"Connection error: {str(e)}"}
-    
-    async def _initialize(self, session):
+            # 🔧 해당 ADK 세션의 MCP 상태만 폐기 (다른 세션과 공유 연결은 유지)
+            self._pool.discard(entry.key)
+            yield {"type": "error", "error": f"Connection error: {str(e)}", "transient": True}
+        finally:
+            if request_id is not None:
+                self._pending.pop(request_id, None)
+    
+    async def call_tools_batch(
+        self,
+        calls: List[Dict[str, Any]],
+        adk_session_id: str = None,
+        mode: str = "batch"
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 도구를 한 번에 호출 - 결과는 calls 순서대로 반환
+        
+        Args:
+            calls: [{"name": "firestore_get_document", "arguments": {...}}, ...]
+            mode: "batch" - JSON-RPC 배치 배열로 HTTP 왕복 1회
+                  "concurrent" - 같은 MCP 세션에서 개별 요청을 동시에 전송
+        
+        서버가 배치 배열을 지원하지 않으면 자동으로 concurrent 모드로 대체합니다.
+        """
+        if not calls:
+            return []
+        
+        # 🗃️ 캐시 적중분은 바로 채우고 나머지만 서버로 전송
+        if self.cache is not None:
+            results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+            pending = []
+            for index, call in enumerate(calls):
+                cached = None
+                if self.cache.is_cacheable(call["name"]):
+                    cached = self.cache.get(call["name"], call.get("arguments", {}))
+                if cached is not None:
+                    results[index] = cached
+                else:
+                    pending.append(index)
+            if len(pending) < len(calls):
+                print(f"⚡ 배치 캐시 적중: {len(calls) - len(pending)}/{len(calls)}건")
+            fetched = await self._call_tools_uncached([calls[i] for i in pending], adk_session_id, mode) if pending else []
+            for index, result in zip(pending, fetched):
+                results[index] = result
+            return results
+        
+        return await self._call_tools_uncached(calls, adk_session_id, mode)
+    
+    async def _call_tools_uncached(self, calls: List[Dict[str, Any]], adk_session_id: str, mode: str) -> List[Dict[str, Any]]:
+        """캐시를 거치지 않는 배치/동시 호출 (결과는 캐시에 반영)"""
+        if mode == "concurrent" or not self.batch_supported or len(calls) == 1:
+            return await self._call_tools_concurrently(calls, adk_session_id)
+        
+        if not self._breaker.allow_request():
+            return [self._circuit_open_error() for _ in calls]
+        trial = self._breaker.holds_trial()
+        
+        entry = self._pool.acquire(adk_session_id)
+        session = self._get_http_session()
+        payloads = []
+        
+        try:
+            fresh_session = not entry.initialized
+            await self._ensure_initialized(session, entry)
+            headers = self._build_headers(entry)
+            payloads = [
+                self._build_tool_payload(entry, call["name"], call.get("arguments", {}), progress=False)
+                for call in calls
+            ]
+            futures = [self._register_pending(payload["id"]) for payload in payloads]
+            print(f"📦 MCP 배치 호출: {len(payloads)}건 (풀 엔트리: {entry.key})")
+            
+            rejected = None
+            async with session.post(self.url, json=payloads, headers=headers, timeout=budget_timeout(20)) as response:
+                if not 200 <= response.status < 300:
+                    rejected = (response.status, await response.text())
+                else:
+                    # 서버가 배치 요청을 받았으므로 엔드포인트는 살아 있음
+                    self._breaker.record_success()
+                    trial = False
+                    async for message in iter_jsonrpc_messages(response):
+                        self._dispatch(message)
+                        if all(future.done() for future in futures):
+                            break
+            
+            if rejected is not None:
+                status, error_text = rejected
+                if status in TRANSIENT_HTTP_STATUSES:
+                    # 일시적 서버 오류(5xx 등) - 배치 지원 여부와 무관, 서킷 브레이커 실패로 기록
+                    self._breaker.record_failure()
+                    print(f"⚠️ 배치 호출 일시 오류 ({status}) - 이번 호출만 개별 동시 호출로 대체")
+                else:
+                    if trial:
+                        # 엔드포인트 상태는 판단할 수 없음 - 개별 호출이 시험 호출을 하도록 슬롯 반환
+                        self._breaker.release_trial()
+                    if status == 404 and not fresh_session:
+                        # 기존 MCP 세션 만료 - 개별 호출에서 다시 initialize (새 세션에서도 404면 배치 미지원)
+                        self._pool.discard(entry.key)
+                        print(f"⚠️ 배치 호출 중 MCP 세션 만료 - 개별 동시 호출로 대체")
+                    elif status in BATCH_REJECTED_STATUSES:
+                        print(f"⚠️ 배치 호출 거부 ({status}) - 이후 개별 동시 호출 사용: {error_text[:100]}")
+                        self.batch_supported = False
+                    else:
+                        print(f"⚠️ 배치 호출 실패 ({status}) - 이번 호출만 개별 동시 호출로 대체: {error_text[:100]}")
+                trial = False
+                return await self._call_tools_concurrently(calls, adk_session_id)
+            
+            results = []
+            missing = []
+            for index, future in enumerate(futures):
+                if future.done():
+                    results.append(self._to_call_result(future.result()))
+                else:
+                    results.append(None)
+                    missing.append(index)
+            
+            if missing:
+                # 배치 응답이 비었거나 일부만 온 경우: 누락분만 개별 호출
+                if len(missing) == len(calls):
+                    print(f"⚠️ 배치 응답 없음 - 개별 동시 호출로 대체")
+                    self.batch_supported = False
+                retried = await self._call_tools_concurrently([calls[i] for i in missing], adk_session_id)
+                for index, result in zip(missing, retried):
+                    results[index] = result
+            
+            for call, result in zip(calls, results):
+                self._update_cache(call["name"], call.get("arguments", {}), result)
+            return results
+            
+        except Exception as e:
+            if isinstance(e, DeadlineExceeded) or deadline_exceeded():
+                print(f"⏱️ MCP 배치 호출 시간 예산 초과")
+                return [{"error": self._deadline_error_event()["error"], "deadline_exceeded": True} for _ in calls]
+            print(f"❌ MCP 배치 호출 오류: {e}")
+            self._breaker.record_failure()
+            trial = False
+            self._pool.discard(entry.key)
+            return [{"error": f"Connection error: {str(e)}"} for _ in calls]
+        finally:
+            if trial:
+                # 시간 예산 초과 / 취소 - 성공/실패로 판단할 수 없으므로 시험 슬롯만 반환
+                self._breaker.release_trial()
+            for payload in payloads:
+                self._pending.pop(payload["id"], None)
+    
+    async def _call_tools_concurrently(self, calls: List[Dict[str, Any]], adk_session_id: str = None) -> List[Dict[str, Any]]:
+        """같은 MCP 세션에서 개별 요청을 동시에 전송 (요청 ID로 응답 구분)"""
+        return list(await asyncio.gather(*[
+            self._fetch_and_cache(call["name"], call.get("arguments", {}), adk_session_id)
+            for call in calls
+        ]))
+    
+    def _build_tool_payload(
+        self,
+        entry: MCPSessionEntry,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        progress: bool = False
+    ) -> Dict[str, Any]:
+        """고유 요청 ID를 가진 tools/call 페이로드 생성"""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": next(self._request_ids),
+            "method": "tools/call",
+            "params": {"name": tool_name, "arguments": arguments}
+        }
+        if progress:
+            # 진행 알림 요청 (MCP progressToken)
+            payload["params"]["_meta"] = {"progressToken": f"{tool_name}-{payload['id']}"}
+        
+        # 페이로드에도 세션 ID 추가 (다양한 방법 시도)
+        if entry.session_id:
+            session_str = str(entry.session_id)
+            payload["params"]["sessionId"] = session_str
+            payload["params"]["session_id"] = session_str
+        return payload
+    
+    def _register_pending(self, request_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        return future
+    
+    def _dispatch(self, message: Dict[str, Any]) -> bool:
+        """응답 메시지를 요청 ID로 대기 중인 Future에 전달"""
+        future = self._pending.get(message.get("id"))
+        if future is None or future.done():
+            return False
+        future.set_result(message)
+        return True
+    
+    @staticmethod
+    def _to_final_event(message: Dict[str, Any]) -> Dict[str, Any]:
+        if "result" in message:
+            print(f"✅ 결과 파싱 성공!")
+            return {"type": "result", "result": message["result"]}
+        if "error" in message:
+            print(f"❌ MCP 오류: {message['error']}")
+            return {"type": "error", "error": message["error"]}
+        return {"type": "result", "result": message}
+    
+    @classmethod
+    def _to_call_result(cls, message: Dict[str, Any]) -> Dict[str, Any]:
+        event = cls._to_final_event(message)
+        if event["type"] == "error":
+            return {"error": event["error"]}
+        return event["result"]
+    
+    def _build_headers(self, entry: MCPSessionEntry) -> Dict[str, str]:
+        """도구 호출 공통 헤더 (세션 ID를 여러 방법으로 전송)"""
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream, application/json"
+        }
+        if entry.session_id:
+            session_str = str(entry.session_id)
+            headers["mcp-session-id"] = session_str
+            headers["x-session-id"] = session_str
+            headers["session-id"] = session_str
+        return headers
+    
+    async def _initialize(self, session, entry: MCPSessionEntry):
         """MCP 초기화 및 세션 ID 추출 (개선된 버전)"""
         headers = {
             "Content-Type": "application/json",
@@ -194,81 +654,94 @@ class MCPClient:
         }
         
         try:
-            async with session.post(self.url, json=init_payload, headers=headers, timeout=15) as response:
+            async with session.post(self.url, json=init_payload, headers=headers, timeout=budget_timeout(15)) as response:
                 if response.status == 200:
-                    response_text = await response.text()
-                    print(f"🔍 초기화 응답: {response_text[:200]}...")
-                    
                     # 🔧 세션 ID 없이도 작동하도록 수정
                     # Firebase MCP가 세션 ID를 제공하지 않는 경우 임시 ID 생성
-                    import time
-                    import uuid
+                    # 여러 방법으로 세션 ID 시도 (풀 엔트리끼리 겹치지 않도록 uuid 추가)
+                    entry.session_id = f"agent_session_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+                    print(f"🔧 임시 세션 ID 생성: {entry.session_id}")
                     
-                    # 여러 방법으로 세션 ID 시도
-                    self.session_id = f"agent_session_{int(time.time())}"
-                    print(f"🔧 임시 세션 ID 생성: {self.session_id}")
-                    
-                    # SSE 응답에서 실제 세션 정보 찾기 (있다면 사용)
-                    if 'data:' in response_text:
-                        lines = response_text.strip().split('\n')
-                        for line in lines:
-                            if line.startswith('data: '):
-                                try:
-                                    import json
-                                    data = json.loads(line[6:])
-                                    # 실제 세션 ID가 있다면 사용
-                                    if "result" in data:
-                                        result = data["result"]
-                                        for field in ["sessionId", "session_id", "id"]:
-                                            if field in result and result[field] != 1:  # ID 1은 제외
-                                                self.session_id = str(result[field])
-                                                print(f"✅ 실제 세션 ID 발견: {self.session_id}")
-                                                break
-                                except Exception as parse_error:
-                                    print(f"⚠️ 응답 파싱 오류: {parse_error}")
+                    # 응답에서 실제 세션 정보 찾기 (있다면 사용)
+                    async with aclosing(iter_jsonrpc_messages(response)) as messages:
+                        async for data in messages:
+                            print(f"🔍 초기화 응답: {str(data)[:200]}...")
+                            # 실제 세션 ID가 있다면 사용
+                            if isinstance(data.get("result"), dict):
+                                result = data["result"]
+                                for field in ["sessionId", "session_id", "id"]:
+                                    if field in result and result[field] != 1:  # ID 1은 제외
+                                        entry.session_id = str(result[field])
+                                        print(f"✅ 실제 세션 ID 발견: {entry.session_id}")
+                                        break
+                                break
                     
                     # 응답 헤더에서 세션 ID 확인
                     for header_name in ['mcp-session-id', 'x-session-id', 'session-id']:
                         if header_name in response.headers:
-                            self.session_id = response.headers[header_name]
-                            print(f"✅ 헤더에서 세션 ID 획득: {self.session_id}")
+                            entry.session_id = response.headers[header_name]
+                            print(f"✅ 헤더에서 세션 ID 획득: {entry.session_id}")
                             break
                     
-                    self.initialized = True
-                    print(f"🎯 최종 사용할 세션 ID: {self.session_id}")
+                    entry.initialized = True
+                    print(f"🎯 최종 사용할 세션 ID: {entry.session_id}")
                     return True
         except Exception as e:
             print(f"❌ MCP 초기화 오류: {e}")
         
         return False
     
-    async def _reset_mcp_session(self):
-        """MCP 세션 재설정 (ADK 세션 변경 시 호출)"""
-        print(f"🔄 MCP 세션 재설정: {self.url}")
-        
-        # 기존 세션 정리
-        if self._session and not self._session.closed:
-            await self._session.close()
-        
-        # 상태 초기화
-        self._session = None
-        self.initialized = False
-        self.session_id = None
-        
-        print(f"✅ MCP 세션 재설정 완료")
+    def _on_pool_evict(self, entry: MCPSessionEntry):
+        """풀에서 밀려난 MCP 세션을 서버에서도 정리 (best-effort)"""
+        session_id = entry.session_id
+        entry.reset()
+        if not session_id or self._session is None or self._session.closed:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._terminate_remote_session(session_id))
+        except RuntimeError:
+            return  # 이벤트 루프 밖에서는 서버 정리 생략
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _terminate_remote_session(self, session_id: str):
+        """MCP Streamable HTTP 세션 종료 요청 (DELETE)"""
+        try:
+            async with self._session.delete(self.url, headers={"mcp-session-id": session_id}, timeout=5):
+                pass
+        except Exception as e:
+            print(f"⚠️ MCP 세션 종료 요청 실패 (무시): {e}")
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """MCP 세션 풀 통계 (hit/miss/eviction)"""
+        return self._pool.stats()
+    
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """조회 결과 캐시 통계 (캐시 비활성 시 None)"""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def singleflight_stats(self) -> Optional[Dict[str, Any]]:
+        """진행 중 호출 합치기 통계 (비활성 시 None)"""
+        return self._singleflight.stats() if self._singleflight is not None else None
+    
+    def resilience_stats(self) -> Dict[str, Any]:
+        """재시도 카운터 및 서킷 브레이커 상태"""
+        return {**self.resilience_counters, "circuit": self._breaker.stats()}
     
     async def close(self):
         """세션 정리"""
+        self._pool.clear()
         if self._session and not self._session.closed:
             await self._session.close()
             print(f"🔧 MCP 클라이언트 세션 정리됨: {self.url}")
         self._session = None
-        self.initialized = False
-        self.current_adk_session = None
 
 # ========================================
 # 🌐 MCP 클라이언트 인스턴스 생성
 # ========================================
 # Firebase와 Email MCP 클라이언트
-firebase_client = MCPClient("https://firebase-mcp-638331849453.asia-northeast3.run.app/mcp")
+firebase_client = MCPClient(
+    "https://firebase-mcp-638331849453.asia-northeast3.run.app/mcp",
+    cache=ToolResultCache(max_entries=512, ttl_seconds=60)  # 🗃️ Firestore 조회 결과 캐시
+)
 email_client = MCPClient("https://estimate-email-mcp-638331849453.asia-northeast3.run.app/mcp") 
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+♨️ MCP 연결 수명 주기 관리 - 서버 시작 시 사전 연결 / 주기적 keepalive / 종료 정리
+
+🎯 목적:
+aiohttp 세션이 첫 call_tool 안에서 지연 생성되어, Cloud Run 콜드 스타트 이후
+첫 채팅 요청이 firebase_client와 email_client 모두의 DNS/TLS/initialize 지연을 떠안았습니다.
+
+🔧 동작:
+- startup(): 튜닝된 TCPConnector 1개를 모든 클라이언트가 공유하도록 설정 후 동시에 사전 연결
+- keepalive: 주기적으로 MCP ping을 보내 유휴 연결과 서버 세션 유지
+- shutdown(): keepalive 중지, 클라이언트 세션과 공유 커넥터 정리
+- stats(): 사전 연결 소요 시간 / ping 결과 (/health 노출용)
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from .mcp_client import MCPClient, create_tuned_connector
+
+
+class MCPLifecycle:
+    """여러 MCPClient의 공유 커넥터, 사전 연결, keepalive 관리"""
+
+    def __init__(self, clients: Dict[str, MCPClient], keepalive_interval: float = 240.0):
+        self.clients = clients
+        self.keepalive_interval = keepalive_interval
+        self._connector = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self.warmup_started_at: Optional[float] = None
+        self.warmup_total_seconds: Optional[float] = None
+        self.warmup_results: Dict[str, Dict[str, Any]] = {}
+        self.ping_results: Dict[str, Dict[str, Any]] = {}
+
+    async def startup(self):
+        """공유 커넥터 설정 후 모든 클라이언트 동시 사전 연결"""
+        self._connector = create_tuned_connector()
+        for client in self.clients.values():
+            client.use_connector(self._connector)
+
+        self.warmup_started_at = time.time()
+        started = time.perf_counter()
+        names = list(self.clients)
+        outcomes = await asyncio.gather(
+            *[self.clients[name].warmup() for name in names],
+            return_exceptions=True
+        )
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, BaseException):
+                self.warmup_results[name] = {"ok": False, "error": str(outcome)}
+            else:
+                self.warmup_results[name] = {"ok": True, "duration_ms": round(outcome * 1000, 1)}
+        self.warmup_total_seconds = time.perf_counter() - started
+        print(f"♨️ MCP 사전 연결 완료: {self.warmup_total_seconds * 1000:.0f}ms {self.warmup_results}")
+
+        if self.keepalive_interval > 0:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def _keepalive_loop(self):
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            names = list(self.clients)
+            outcomes = await asyncio.gather(
+                *[self.clients[name].ping() for name in names],
+                return_exceptions=True
+            )
+            for name, ok in zip(names, outcomes):
+                self.ping_results[name] = {"ok": ok is True, "at": time.time()}
+
+    async def shutdown(self):
+        """keepalive 중지 및 모든 연결 정리"""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+            self._keepalive_task = None
+
+        await asyncio.gather(*[client.close() for client in self.clients.values()], return_exceptions=True)
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+        print("🔌 MCP 연결 정리 완료")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "warmup_started_at": self.warmup_started_at,
+            "warmup_duration_ms": round(self.warmup_total_seconds * 1000, 1) if self.warmup_total_seconds is not None else None,
+            "warmup": self.warmup_results,
+            "keepalive_interval_seconds": self.keepalive_interval,
+            "last_ping": self.ping_results
+        }
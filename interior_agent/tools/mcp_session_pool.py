@@ -0,0 +1,128 @@
+"""
+🗂️ MCP 세션 풀 - ADK 세션별 MCP 세션 상태 관리
+
+🎯 목적:
+기존에는 ADK 세션이 바뀔 때마다 MCPClient가 aiohttp 세션을 닫고
+initialize를 다시 수행했습니다. 동시 사용자가 많으면 요청이 섞일 때마다
+TCP/TLS 핸드셰이크와 initialize 왕복이 반복되는 문제가 있었습니다.
+
+🔧 구조:
+- ADK 세션 ID → MCPSessionEntry (mcp-session-id, 초기화 여부)
+- LRU 순서 유지 (OrderedDict) + TTL 만료
+- HTTP 연결(TCPConnector)은 MCPClient가 하나만 보유하고 모든 엔트리가 공유
+- hit/miss/eviction 카운터 제공
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+
+# ADK 세션 ID 없이 호출된 경우 사용하는 공용 키
+DEFAULT_POOL_KEY = "__default__"
+
+
+class MCPSessionEntry:
+    """ADK 세션 하나에 대응하는 MCP 세션 상태"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.session_id: Optional[str] = None
+        self.initialized = False
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        # 같은 ADK 세션의 동시 호출이 initialize를 중복 실행하지 않도록 보호
+        self.init_lock = asyncio.Lock()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    def reset(self):
+        """MCP 프로토콜 상태만 초기화 (HTTP 연결은 유지)"""
+        self.session_id = None
+        self.initialized = False
+
+
+class MCPSessionPool:
+    """LRU/TTL 기반 MCP 세션 풀"""
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl_seconds: float = 1800,
+        on_evict: Optional[Callable[[MCPSessionEntry], None]] = None
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, MCPSessionEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def acquire(self, key: Optional[str]) -> MCPSessionEntry:
+        """ADK 세션 키에 해당하는 엔트리 반환 (없으면 생성)"""
+        key = key or DEFAULT_POOL_KEY
+        now = time.monotonic()
+        self._expire(now)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            entry = MCPSessionEntry(key)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.evictions += 1
+                self._notify_evict(evicted)
+
+        entry.last_used = now
+        return entry
+
+    def discard(self, key: Optional[str]):
+        """오류 발생 시 해당 ADK 세션의 MCP 상태만 폐기"""
+        entry = self._entries.pop(key or DEFAULT_POOL_KEY, None)
+        if entry is not None:
+            entry.reset()
+
+    def clear(self):
+        for entry in self._entries.values():
+            entry.reset()
+        self._entries.clear()
+
+    def _expire(self, now: float):
+        # OrderedDict는 마지막 사용 순서로 정렬되어 있으므로 앞쪽만 확인하면 됨
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.last_used <= self.ttl_seconds:
+                break
+            del self._entries[key]
+            self.expirations += 1
+            self._notify_evict(entry)
+
+    def _notify_evict(self, entry: MCPSessionEntry):
+        if self.on_evict is not None:
+            try:
+                self.on_evict(entry)
+            except Exception as e:
+                print(f"⚠️ MCP 세션 풀 eviction 콜백 오류: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
@@ -0,0 +1,143 @@
+"""
+🛡️ MCP 도구 호출 복원력 계층 - 재시도 / 지수 백오프 / 서킷 브레이커
+
+🎯 목적:
+Cloud Run 콜드 스타트 같은 일시적 장애가 곧바로 AS 접수 실패나
+견적 이메일 실패로 이어지지 않도록 보호합니다.
+
+🔧 정책:
+- 조회성(get/list/query) 도구: 지터가 포함된 지수 백오프로 재시도
+- 쓰기/전송(add, update, delete, send_estimate_email) 도구: 자동 재시도 없음 (중복 실행 방지)
+- 엔드포인트별 서킷 브레이커: 서버가 죽어 있는 동안은 즉시 실패 (지연 누적 방지)
+"""
+
+import random
+import time
+from typing import Any, Dict
+
+# 재시도해도 안전한(멱등) 도구 이름 접두사
+IDEMPOTENT_TOOL_PREFIXES = (
+    "firestore_get_",
+    "firestore_list_",
+    "firestore_query_",
+    "get_",
+    "list_",
+)
+IDEMPOTENT_TOOLS = {"test_connection"}
+
+# 일시적 장애로 간주하는 HTTP 상태 코드
+TRANSIENT_HTTP_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def is_idempotent_tool(tool_name: str) -> bool:
+    """조회 전용 도구인지 판단 (쓰기/전송 도구는 False)"""
+    return tool_name in IDEMPOTENT_TOOLS or tool_name.startswith(IDEMPOTENT_TOOL_PREFIXES)
+
+
+class RetryPolicy:
+    """지터가 포함된 지수 백오프 재시도 정책"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.3, max_delay: float = 4.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def attempts_for(self, tool_name: str) -> int:
+        return self.max_attempts if is_idempotent_tool(tool_name) else 1
+
+    def backoff(self, attempt: int) -> float:
+        """attempt번째 실패 후 대기 시간 (full jitter)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    엔드포인트별 서킷 브레이커
+
+    - closed: 정상, 연속 실패가 failure_threshold에 도달하면 open
+    - open: recovery_timeout 동안 모든 호출 즉시 실패
+    - half_open: 시험 호출 1건만 허용, 성공하면 closed / 실패하면 다시 open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self.open_count = 0
+        self.rejected_calls = 0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                self.rejected_calls += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+            print(f"🟡 서킷 브레이커 half-open: {self.name}")
+        # half_open: 시험 호출 1건만 통과
+        if self._trial_in_flight:
+            self.rejected_calls += 1
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            print(f"🟢 서킷 브레이커 closed (복구): {self.name}")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.open_count += 1
+                print(f"🔴 서킷 브레이커 open: {self.name} (연속 실패 {self.consecutive_failures}회)")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """성공/실패로 판단할 수 없는 결과(예: 시간 예산 초과, 호출 취소) - half-open 시험 슬롯만 반환"""
+        self._trial_in_flight = False
+
+    def holds_trial(self) -> bool:
+        """방금 allow_request()를 통과한 호출이 half-open 시험 호출인지 (결과 기록 전 취소 시 슬롯 반환용)"""
+        return self.state == self.HALF_OPEN and self._trial_in_flight
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_count": self.open_count,
+            "rejected_calls": self.rejected_calls,
+            "retry_after_seconds": round(self.retry_after(), 2)
+        }
+
+
+# 엔드포인트(URL)별 서킷 브레이커 레지스트리
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    breaker = _breakers.get(url)
+    if breaker is None:
+        breaker = CircuitBreaker(url)
+        _breakers[url] = breaker
+    return breaker
@@ -0,0 +1,769 @@
+"""
+🔎 Firestore 컬렉션 로컬 역색인 (문자 n-gram, 한글 대응)
+
+🎯 목적:
+smart_search는 호출마다 firestore_query_collection_group으로 최대 50개 문서를 가져와
+모든 필드를 str(...).lower()로 바꾼 뒤 선형 부분 문자열 검색을 했습니다.
+50개를 넘는 문서는 조용히 누락되었고, 큰 문서는 검색할 때마다 다시 문자열로 변환되었습니다.
+
+🔧 동작 방식:
+- 컬렉션을 페이지 단위로 끝까지 읽어 색인 생성 (첫 검색 시, 이후 만료/무효화 시 재생성)
+- 정규화: NFKC + 숫자 정규화 + 소문자 + 공백/문장부호 제거 ("강남구 역삼동" == "강남구역삼동")
+- 필드별 검색 키(정규화 텍스트 / 초성 / 자모)는 문서 색인 시 한 번만 계산 (korean_text)
+  → 초성 약어 질의("ㅇㅂㅇㅇㅍㅋ"), 자모 단위 제한 편집 거리 오타 검색("월베아이파크")
+- 한글은 음절 단위 문자 n-gram(2/3-gram)으로 색인 - 형태소 분석 없이 조사/띄어쓰기 차이에 강함
+- 검색: 질의 n-gram 포스팅 교집합 → 정규화된 필드 원문으로 부분 문자열 검증 (오탐 제거)
+- 순위: 문서 ID > 필드 가중치(name/phone/process/description), 완전 일치 > 접두 > 부분 일치,
+  크기 k의 최소 힙으로 상위 k개만 유지 (전체 정렬 없음), 점수 근거(explanation) 제공
+- 색인이 없을 때(콜드 스타트/무효화)는 페이지를 비동기 제너레이터로 읽으며 바로 검색
+  (다음 페이지 미리 요청, 확신도 높은 결과가 k개 모이면 조기 종료, 스캔 문서 수/시간 상한),
+  전체 색인은 백그라운드에서 마저 생성
+- MCPClient 쓰기 리스너로 add/update/delete 결과를 색인에 즉시 반영
+- 로컬 미러(firestore_mirror)가 최신이면 페이지를 미러에서 읽고, 색인이 없을 때는 미러 FTS 후보만 순위 매김
+"""
+
+import asyncio
+import heapq
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from .deadline import detached_context, remaining_time
+from .korean_text import (
+    choseong, decompose_jamo, fuzzy_substring_distance, is_choseong_query, is_hangul_syllable, max_typo_distance,
+    normalize_text
+)
+from .mcp_client import firebase_client
+
+# 색인에 사용하는 문자 n-gram 길이
+NGRAM_SIZES = (2, 3)
+# 이보다 짧은 질의는 색인 대신 정규화된 본문 전체 스캔
+MIN_QUERY_LENGTH = 2
+# 문서 ID를 필드처럼 색인할 때 사용하는 이름
+ID_FIELD = "__id__"
+
+# 🏅 순위 가중치
+# 문서 ID 가중치는 어떤 필드 점수(최대 가중치 × 완전 일치 × 포함 비율 보너스 + 추가 필드 보너스)보다 크게 설정
+ID_WEIGHT = 20.0
+DEFAULT_FIELD_WEIGHTS = {
+    "name": 3.0,
+    "phone": 2.5,
+    "process": 2.0,
+    "description": 1.5,
+}
+DEFAULT_FIELD_WEIGHT = 1.0
+# 초성/오타 일치는 실제 글자 일치보다 낮게 (오타는 편집 거리만큼 추가로 나눔)
+MATCH_MULTIPLIERS = {"exact": 2.0, "prefix": 1.5, "substring": 1.0, "choseong": 0.9, "fuzzy": 0.8}
+EXTRA_FIELD_BONUS = 0.2  # 추가로 일치한 필드 1개당
+MAX_EXTRA_FIELD_BONUS = 1.0
+DEFAULT_TOP_K = 5
+
+# 📄 색인 없이 페이지를 읽으며 검색할 때의 조기 종료 조건
+# 확신도 높은 결과: 아무 필드 완전 일치(1.0 × 2.0 × 2) 또는 가중치 필드의 접두/부분 일치 이상
+HIGH_CONFIDENCE_SCORE = 4.0
+STREAM_MAX_DOCUMENTS = 2000
+STREAM_MAX_SECONDS = 3.0
+
+# 🔤 오타 검색 후보 수 상한 (공유 n-gram이 많은 문서부터 편집 거리 확인)
+FUZZY_MAX_CANDIDATES = 100
+
+# 🪞 색인이 없을 때 미러 FTS에서 가져올 후보 수 상한 (넘으면 페이지 검색으로 대체)
+MIRROR_CANDIDATE_LIMIT = 1000
+
+
+def char_ngrams(text: str, size: int) -> Set[str]:
+    if len(text) < size:
+        return set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def flatten_fields(data: Any, prefix: str = "") -> Dict[str, str]:
+    """
+    문서 데이터를 "필드 경로 → 문자열"로 평탄화
+
+    중첩 dict/list는 a.b / a[0] 경로로 펼치고, JSON 문자열로 저장된 값도 풀어서 색인합니다.
+    """
+    fields: Dict[str, str] = {}
+    if isinstance(data, str) and data[:1] in ("{", "["):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError:
+            pass
+    if isinstance(data, dict):
+        for key, value in data.items():
+            fields.update(flatten_fields(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            fields.update(flatten_fields(value, f"{prefix}[{i}]"))
+    elif data is not None and data != "":
+        fields[prefix or "value"] = str(data)
+    return fields
+
+
+def field_key(path: str) -> str:
+    """필드 경로의 마지막 이름 (items[0].name → name) - 가중치 조회용"""
+    return path.rsplit(".", 1)[-1].split("[", 1)[0]
+
+
+class SearchHit:
+    """순위가 매겨진 검색 결과 하나 (문서 + 점수 + 점수 근거)"""
+
+    __slots__ = ("doc", "score", "matches")
+
+    def __init__(self, doc: Dict[str, Any], score: float, matches: List[Tuple[float, str, str, float, int]]):
+        self.doc = doc
+        self.score = score
+        self.matches = matches  # [(필드 점수, 필드 경로, 일치 유형, 가중치, 편집 거리)] 점수 높은 순
+
+    @property
+    def is_id_match(self) -> bool:
+        return bool(self.matches) and self.matches[0][1] == ID_FIELD
+
+    def explanation(self) -> Dict[str, Any]:
+        matches = []
+        for score, path, kind, weight, distance in self.matches:
+            match = {"field": path, "match": kind, "weight": weight, "score": round(score, 3)}
+            if kind == "fuzzy":
+                match["distance"] = distance
+            matches.append(match)
+        return {"score": round(self.score, 3), "matches": matches}
+
+    def __repr__(self) -> str:
+        return f"SearchHit(id={self.doc.get('id')!r}, score={self.score:.3f})"
+
+
+class TopK:
+    """크기 k의 최소 힙 - 전체 정렬 없이 점수 상위 k개 유지 (같은 점수면 먼저 색인된 문서 우선)"""
+
+    def __init__(self, k: Optional[int]):
+        self.k = k
+        self._heap: List[Tuple[float, int, str, list]] = []
+        self.total = 0
+
+    def offer(self, score: float, order: int, doc_id: str, matches: list):
+        self.total += 1
+        entry = (score, -order, doc_id, matches)
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranked(self) -> List[Tuple[float, str, list]]:
+        """(점수, doc_id, 점수 근거) 점수 높은 순"""
+        return [(score, doc_id, matches) for score, _, doc_id, matches in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+class PreparedQuery:
+    """질의 쪽 검색 키 (질의마다 한 번 계산)"""
+
+    __slots__ = ("text", "normalized", "jamo", "is_choseong", "max_distance", "bigrams")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.normalized = normalize_text(text)
+        self.jamo = decompose_jamo(self.normalized)
+        self.is_choseong = is_choseong_query(self.normalized)
+        # 오타 허용은 한글이 포함된 질의만 (ID/전화번호 같은 숫자·영문 질의는 정확 일치만)
+        has_hangul = any(is_hangul_syllable(ch) for ch in self.normalized)
+        self.max_distance = max_typo_distance(len(self.jamo)) if has_hangul else 0
+        self.bigrams = char_ngrams(self.normalized, 2)
+
+
+class SearchResults:
+    """검색 결과 묶음 - 순위 결과 + 전체 일치 수 + 탐색 범위"""
+
+    __slots__ = ("hits", "total_matches", "complete", "scanned_documents", "stop_reason")
+
+    def __init__(self, hits: List[SearchHit], total_matches: int, complete: bool = True,
+                 scanned_documents: Optional[int] = None, stop_reason: str = "index"):
+        self.hits = hits
+        self.total_matches = total_matches
+        self.complete = complete  # False면 컬렉션 일부만 확인한 결과
+        self.scanned_documents = scanned_documents
+        self.stop_reason = stop_reason  # index | exhausted | confident | document_cap | time_cap
+
+    def coverage(self) -> Dict[str, Any]:
+        return {
+            "complete": self.complete,
+            "scanned_documents": self.scanned_documents,
+            "stop_reason": self.stop_reason
+        }
+
+
+def collection_id(collection: str) -> str:
+    """컬렉션 경로(a/b/c)의 컬렉션 그룹 ID(c)"""
+    return str(collection).strip("/").rsplit("/", 1)[-1]
+
+
+class SearchIndexError(Exception):
+    """색인 생성 실패 - MCP 오류 결과를 그대로 보관"""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(str(result.get("error") or result)[:200])
+        self.result = result
+
+
+class CollectionIndex:
+    """한 컬렉션의 문서 + 필드별 검색 키(정규화/초성/자모) + n-gram 포스팅 리스트"""
+
+    def __init__(self, name: str, ngram_sizes: Tuple[int, ...] = NGRAM_SIZES):
+        self.name = name
+        self.ngram_sizes = ngram_sizes
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self._fields: Dict[str, Dict[str, str]] = {}  # doc_id → {필드 경로: 정규화 텍스트}
+        self._choseong: Dict[str, Dict[str, str]] = {}  # doc_id → {필드 경로: 초성 키}
+        self._jamo: Dict[str, Dict[str, str]] = {}  # doc_id → {필드 경로: 자모 키}
+        self._postings: Dict[str, Set[str]] = {}
+        self._order: Dict[str, int] = {}  # 색인 순서 (결과 정렬용)
+        self._next_order = 0
+        self.built_at = time.monotonic()
+        self.stale = False
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, doc: Dict[str, Any]):
+        doc_id = str(doc.get("id", ""))
+        if not doc_id:
+            return
+        if doc_id in self.documents:
+            self.remove(doc_id)
+
+        fields = {ID_FIELD: normalize_text(doc_id)}
+        for path, value in flatten_fields(doc.get("data", {})).items():
+            normalized = normalize_text(value)
+            if normalized:
+                fields[path] = normalized
+
+        for gram in self._grams_for(fields):
+            self._postings.setdefault(gram, set()).add(doc_id)
+
+        self.documents[doc_id] = doc
+        self._order[doc_id] = self._next_order
+        self._next_order += 1
+        self._fields[doc_id] = fields
+        self._choseong[doc_id] = {path: choseong(text) for path, text in fields.items()}
+        self._jamo[doc_id] = {path: decompose_jamo(text) for path, text in fields.items()}
+
+    def _grams_for(self, fields: Dict[str, str]) -> Set[str]:
+        grams: Set[str] = set()
+        for normalized in fields.values():
+            for size in self.ngram_sizes:
+                grams |= char_ngrams(normalized, size)
+        return grams
+
+    def remove(self, doc_id: str):
+        if doc_id not in self.documents:
+            return
+        # 문서별 n-gram 집합을 따로 보관하지 않고 정규화 텍스트에서 다시 계산 (메모리 절약)
+        for gram in self._grams_for(self._fields[doc_id]):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+        self._fields.pop(doc_id, None)
+        self._choseong.pop(doc_id, None)
+        self._jamo.pop(doc_id, None)
+        self._order.pop(doc_id, None)
+        del self.documents[doc_id]
+
+    def update(self, doc_id: str, data: Dict[str, Any]) -> bool:
+        """부분 수정 반영 (최상위 필드 병합), 색인에 없는 문서면 False"""
+        doc = self.documents.get(doc_id)
+        if doc is None:
+            return False
+        merged = dict(doc.get("data") or {})
+        merged.update(data or {})
+        self.add({**doc, "data": merged})
+        return True
+
+    def candidates(self, normalized_query: str) -> Set[str]:
+        """질의 n-gram 포스팅 교집합 (검증 전 후보)"""
+        size = max(s for s in self.ngram_sizes if s <= len(normalized_query))
+        grams = sorted(char_ngrams(normalized_query, size), key=lambda g: len(self._postings.get(g, ())))
+        if not grams:
+            return set()
+        result = set(self._postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not result:
+                break
+            result &= self._postings.get(gram, set())
+        return result
+
+    def fuzzy_candidates(self, prepared: PreparedQuery) -> List[str]:
+        """
+        오타 검색 후보 - 질의 2-gram을 충분히 공유하는 문서 (공유 수 많은 순, 최대 FUZZY_MAX_CANDIDATES개)
+
+        편집 1회는 음절 2-gram을 최대 2개 깨뜨리므로 (2-gram 수 - 2 × 허용 거리)개 이상 공유해야 함
+        """
+        if not prepared.bigrams:
+            return []
+        shared: Dict[str, int] = {}
+        for gram in prepared.bigrams:
+            for doc_id in self._postings.get(gram, ()):
+                shared[doc_id] = shared.get(doc_id, 0) + 1
+        threshold = max(1, len(prepared.bigrams) - 2 * prepared.max_distance)
+        ranked = sorted(
+            (doc_id for doc_id, count in shared.items() if count >= threshold),
+            key=lambda doc_id: (-shared[doc_id], self._order[doc_id])
+        )
+        return ranked[:FUZZY_MAX_CANDIDATES]
+
+    def search(
+        self,
+        query: str,
+        k: Optional[int] = DEFAULT_TOP_K,
+        field_weights: Optional[Dict[str, float]] = None
+    ) -> Tuple[List[SearchHit], int]:
+        """
+        관련도 상위 k개 검색
+
+        - 초성 질의: 필드별 초성 키 부분 문자열 검색
+        - 일반 질의: n-gram 후보 → 부분 문자열 검증, 일치 문서가 없으면 자모 편집 거리 오타 검색
+
+        Args:
+            k: 반환할 최대 개수 (None이면 전체)
+            field_weights: 필드 이름별 가중치 (기본 DEFAULT_FIELD_WEIGHTS)
+
+        Returns:
+            (점수 높은 순 SearchHit 목록, 전체 일치 문서 수)
+        """
+        prepared = PreparedQuery(query)
+        normalized = prepared.normalized
+        if not normalized:
+            return [], 0
+        if prepared.is_choseong or len(normalized) < MIN_QUERY_LENGTH or len(normalized) < min(self.ngram_sizes):
+            candidate_ids = self.documents.keys()
+        else:
+            candidate_ids = self.candidates(normalized)
+
+        weights = DEFAULT_FIELD_WEIGHTS if field_weights is None else field_weights
+        top = TopK(k)
+        for doc_id in candidate_ids:
+            scored = self.score_document(doc_id, prepared, weights)
+            if scored is not None:
+                top.offer(scored[0], self._order[doc_id], doc_id, scored[1])
+
+        # 🔤 정확히 일치하는 문서가 없을 때만 오타 허용 검색 (일반 검색 경로 비용은 그대로)
+        if prepared.max_distance and not top.total:
+            for doc_id in self.fuzzy_candidates(prepared):
+                scored = self.score_document(doc_id, prepared, weights, fuzzy=True)
+                if scored is not None:
+                    top.offer(scored[0], self._order[doc_id], doc_id, scored[1])
+        return [SearchHit(self.documents[doc_id], score, matches) for score, doc_id, matches in top.ranked()], top.total
+
+    def score_document(
+        self,
+        doc_id: str,
+        prepared: PreparedQuery,
+        weights: Dict[str, float],
+        fuzzy: bool = False
+    ) -> Optional[Tuple[float, List[Tuple[float, str, str, float, int]]]]:
+        """
+        문서 점수 = 가장 좋은 필드 점수 + 추가 일치 필드 보너스
+
+        필드 점수 = 필드 가중치 × 일치 유형 배수 × (1 + 질의 길이 / 필드 길이)
+        (짧은 필드에서 일치할수록 = 질의가 필드 내용을 많이 덮을수록 높음)
+        fuzzy=True이면 글자 일치가 없을 때 자모 편집 거리 일치도 확인 (배수를 1 + 거리로 나눔)
+        """
+        query = prepared.normalized
+        query_length = len(query)
+        matches = []
+        if prepared.is_choseong:
+            for path, key in self._choseong[doc_id].items():
+                if query in key:
+                    weight = self._weight(path, weights)
+                    matches.append((weight * MATCH_MULTIPLIERS["choseong"] * (1 + query_length / len(key)), path, "choseong", weight, 0))
+        else:
+            for path, text in self._fields[doc_id].items():
+                if query not in text:
+                    continue
+                kind = "exact" if text == query else "prefix" if text.startswith(query) else "substring"
+                weight = self._weight(path, weights)
+                matches.append((weight * MATCH_MULTIPLIERS[kind] * (1 + query_length / len(text)), path, kind, weight, 0))
+            if not matches and fuzzy and prepared.max_distance:
+                matches = self._fuzzy_matches(doc_id, prepared, weights)
+        if not matches:
+            return None
+        if len(matches) == 1:
+            return matches[0][0], matches
+        matches.sort(reverse=True)
+        bonus = min(EXTRA_FIELD_BONUS * (len(matches) - 1), MAX_EXTRA_FIELD_BONUS)
+        return matches[0][0] + bonus, matches[:3]
+
+    def _fuzzy_matches(self, doc_id: str, prepared: PreparedQuery, weights: Dict[str, float]) -> List[Tuple[float, str, str, float, int]]:
+        max_distance = prepared.max_distance
+        min_length = len(prepared.jamo) - max_distance
+        min_shared = max(1, len(prepared.bigrams) - 2 * max_distance)
+        fields = self._fields[doc_id]
+        matches = []
+        for path, jamo in self._jamo[doc_id].items():
+            # 너무 짧거나 질의 2-gram을 충분히 공유하지 않는 필드는 편집 거리 계산 생략
+            if len(jamo) < min_length:
+                continue
+            if prepared.bigrams:
+                text = fields[path]
+                if sum(1 for gram in prepared.bigrams if gram in text) < min_shared:
+                    continue
+            distance = fuzzy_substring_distance(prepared.jamo, jamo, max_distance)
+            if distance > max_distance:
+                continue
+            weight = self._weight(path, weights)
+            coverage = min(1.0, len(prepared.normalized) / len(fields[path]))
+            score = weight * MATCH_MULTIPLIERS["fuzzy"] / (1 + distance) * (1 + coverage)
+            matches.append((score, path, "fuzzy", weight, distance))
+        return matches
+
+    @staticmethod
+    def _weight(path: str, weights: Dict[str, float]) -> float:
+        return ID_WEIGHT if path == ID_FIELD else weights.get(field_key(path), DEFAULT_FIELD_WEIGHT)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self.documents),
+            "ngrams": len(self._postings),
+            "age_seconds": round(time.monotonic() - self.built_at, 1),
+            "stale": self.stale
+        }
+
+
+class FirestoreSearchIndex:
+    """
+    컬렉션별 CollectionIndex 관리 - 페이지 단위 생성, 만료 시 재생성, 쓰기 반영
+
+    client.add_write_listener로 등록되어 MCPClient의 쓰기 도구 결과를 받습니다.
+    최신 색인이 없으면 search()는 페이지를 읽으며 바로 검색하고, 전체 색인은 백그라운드에서 생성합니다.
+    """
+
+    def __init__(
+        self,
+        client,
+        page_size: int = 100,
+        max_documents: int = 20000,
+        max_age_seconds: float = 600,
+        stream_max_documents: int = STREAM_MAX_DOCUMENTS,
+        stream_max_seconds: float = STREAM_MAX_SECONDS
+    ):
+        self.client = client
+        self.page_size = page_size
+        self.max_documents = max_documents
+        self.max_age_seconds = max_age_seconds
+        self.stream_max_documents = stream_max_documents
+        self.stream_max_seconds = stream_max_seconds
+        self._indexes: Dict[str, CollectionIndex] = {}
+        self._build_locks: Dict[str, asyncio.Lock] = {}
+        self._build_tasks: Dict[str, asyncio.Task] = {}
+        # 컬렉션별 쓰기 횟수 - 페이지를 읽는 도중 쓰기가 있었는지 확인용
+        self._write_generation: Dict[str, int] = {}
+        self.builds = 0
+        self.build_ms_total = 0.0
+        self.searches = 0
+        self.search_ms_total = 0.0
+        self.stream_searches = 0
+        self.stream_stops: Dict[str, int] = {}
+        self.write_updates = 0
+        self.mirror = None  # 🪞 로컬 SQLite 미러 (use_mirror로 설정)
+        self.mirror_searches = 0
+        client.add_write_listener(self.on_write)
+
+    def use_mirror(self, mirror):
+        """최신 상태인 컬렉션은 원격 페이지 대신 로컬 미러에서 읽기"""
+        self.mirror = mirror
+
+    async def get_index(self, collection: str, session_id: Optional[str] = None) -> CollectionIndex:
+        """최신 색인 반환 (없거나 만료/무효화되었으면 재생성, 실패 시 SearchIndexError)"""
+        name = collection_id(collection)
+        index = self._fresh_index(name)
+        if index is not None:
+            return index
+
+        lock = self._build_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            index = self._fresh_index(name)
+            if index is not None:
+                return index  # 다른 요청이 먼저 재생성함
+            return await self._build(name, session_id)
+
+    async def search(
+        self,
+        collection: str,
+        query: str,
+        k: Optional[int] = DEFAULT_TOP_K,
+        session_id: Optional[str] = None,
+        field_weights: Optional[Dict[str, float]] = None,
+        force_remote: bool = False
+    ) -> SearchResults:
+        """
+        컬렉션에서 상위 k개 검색
+
+        - 최신 색인이 있으면 색인 검색 (컬렉션 전체)
+        - 없고 미러가 최신이면 미러 FTS 후보로 순위 매김 + 전체 색인 백그라운드 생성
+        - 그 외에는 페이지를 읽으며 검색 (조기 종료 가능) + 전체 색인 백그라운드 생성
+        - force_remote=True면 색인/미러를 건너뛰고 원격 페이지를 읽으며 검색
+        """
+        name = collection_id(collection)
+        if force_remote:
+            return await self._stream_search(name, query, k, session_id, field_weights, use_mirror=False)
+        index = self._fresh_index(name)
+        if index is None:
+            if self._mirror_fresh(name):
+                results = self._mirror_search(name, query, k, field_weights)
+                if results is not None:
+                    return results
+            return await self._stream_search(name, query, k, session_id, field_weights)
+
+        started = time.perf_counter()
+        hits, total = index.search(query, k, field_weights)
+        self.searches += 1
+        self.search_ms_total += (time.perf_counter() - started) * 1000
+        return SearchResults(hits, total, scanned_documents=len(index))
+
+    def _fresh_index(self, name: str) -> Optional[CollectionIndex]:
+        index = self._indexes.get(name)
+        if index is None or index.stale or time.monotonic() - index.built_at > self.max_age_seconds:
+            return None
+        return index
+
+    def _mirror_fresh(self, name: str) -> bool:
+        return self.mirror is not None and self.mirror.is_fresh(name)
+
+    def _mirror_search(
+        self,
+        name: str,
+        query: str,
+        k: Optional[int],
+        field_weights: Optional[Dict[str, float]]
+    ) -> Optional[SearchResults]:
+        """
+        미러 FTS(trigram)로 질의를 포함하는 문서만 가져와 순위 매김
+
+        초성 질의, FTS 결과 없음(오타 검색 필요), 후보가 너무 많음 → None (페이지 검색으로 대체)
+        """
+        prepared = PreparedQuery(query)
+        if not prepared.normalized or prepared.is_choseong:
+            return None
+        candidates = self.mirror.match_documents(name, prepared.normalized, MIRROR_CANDIDATE_LIMIT)
+        if not candidates or len(candidates) >= MIRROR_CANDIDATE_LIMIT:
+            return None
+
+        started = time.perf_counter()
+        index = CollectionIndex(name)
+        for doc in candidates:
+            index.add(doc)
+        hits, total = index.search(query, k, field_weights)
+        self._schedule_build(name)
+        self.mirror_searches += 1
+        print(f"🪞 미러 FTS 검색: {name} '{query}' - 후보 {len(candidates)}개, {(time.perf_counter() - started) * 1000:.0f}ms")
+        return SearchResults(hits, total, scanned_documents=len(candidates))
+
+    async def iter_pages(
+        self,
+        name: str,
+        session_id: Optional[str] = None,
+        use_mirror: bool = True
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """컬렉션 문서를 페이지 단위로 반환 - 미러가 최신이면 미러에서, 아니면 다음 페이지를 미리 요청하며 원격에서"""
+        if use_mirror and self._mirror_fresh(name):
+            for documents in self.mirror.iter_pages(name, self.page_size):
+                yield documents
+                await asyncio.sleep(0)  # 큰 컬렉션에서도 이벤트 루프를 오래 막지 않도록
+            return
+
+        fetch = asyncio.ensure_future(self._fetch_page(name, None, session_id))
+        try:
+            while fetch is not None:
+                documents, next_token = await fetch
+                fetch = None
+                if next_token and len(documents) >= self.page_size:
+                    fetch = asyncio.ensure_future(self._fetch_page(name, next_token, session_id))
+                yield documents
+        finally:
+            # 소비 측이 중간에 멈추면(조기 종료) 미리 요청한 페이지 취소
+            if fetch is not None:
+                if fetch.done():
+                    if not fetch.cancelled():
+                        fetch.exception()
+                else:
+                    fetch.cancel()
+
+    async def _fetch_page(self, name: str, page_token: Optional[str], session_id: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        params = {"collectionId": name, "limit": self.page_size}
+        if page_token:
+            params["pageToken"] = page_token
+        result = await self.client.call_tool("firestore_query_collection_group", params, session_id)
+        payload = result.get("result") if isinstance(result, dict) else None
+        if not isinstance(payload, dict):
+            raise SearchIndexError(result if isinstance(result, dict) else {"error": str(result)})
+        return payload.get("documents") or [], payload.get("nextPageToken")
+
+    async def _build(self, name: str, session_id: Optional[str]) -> CollectionIndex:
+        started = time.perf_counter()
+        index = CollectionIndex(name)
+        generation = self._write_generation.get(name, 0)
+        pages = self.iter_pages(name, session_id)
+        try:
+            async for documents in pages:
+                for doc in documents:
+                    index.add(doc)
+                if len(index) >= self.max_documents:
+                    break
+        finally:
+            await pages.aclose()
+        self._install(name, index, generation)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.builds += 1
+        self.build_ms_total += elapsed_ms
+        print(f"🔎 검색 색인 생성: {name} (문서 {len(index)}개, n-gram {index.stats()['ngrams']}개, {elapsed_ms:.0f}ms)")
+        return index
+
+    def _install(self, name: str, index: CollectionIndex, generation: int):
+        # 페이지를 읽는 도중 들어온 쓰기는 이미 읽은 페이지에 반영되지 않았을 수 있음 → 다음 검색에서 재생성
+        if self._write_generation.get(name, 0) != generation:
+            index.stale = True
+        self._indexes[name] = index
+
+    def _schedule_build(self, name: str):
+        """전체 색인 백그라운드 생성 (요청 시간 예산과 무관하게 끝까지 진행)"""
+        task = self._build_tasks.get(name)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self.get_index(name), context=detached_context())
+        self._build_tasks[name] = task
+        task.add_done_callback(lambda t: self._on_build_done(name, t))
+
+    def _on_build_done(self, name: str, task: asyncio.Task):
+        if self._build_tasks.get(name) is task:
+            del self._build_tasks[name]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ 검색 색인 백그라운드 생성 실패: {name} ({task.exception()})")
+
+    async def _stream_search(
+        self,
+        name: str,
+        query: str,
+        k: Optional[int],
+        session_id: Optional[str],
+        field_weights: Optional[Dict[str, float]],
+        use_mirror: bool = True
+    ) -> SearchResults:
+        """
+        색인 없이 페이지를 읽으며 검색
+
+        종료 조건 (먼저 만족하는 것):
+        - confident: 확신도 높은 결과(HIGH_CONFIDENCE_SCORE 이상)가 k개 모임
+        - document_cap: 스캔 문서 수 stream_max_documents 도달
+        - time_cap: stream_max_seconds (요청 남은 시간 예산이 더 짧으면 그 값) 경과
+        - exhausted: 컬렉션 끝까지 읽음 → 그대로 전체 색인으로 사용
+        """
+        started = time.perf_counter()
+        prepared = PreparedQuery(query)
+        weights = DEFAULT_FIELD_WEIGHTS if field_weights is None else field_weights
+        index = CollectionIndex(name)
+        generation = self._write_generation.get(name, 0)
+        top = TopK(k)
+        confident = 0
+        stop_reason = "exhausted"
+
+        time_limit = self.stream_max_seconds
+        remaining = remaining_time()
+        if remaining is not None:
+            time_limit = max(0.0, min(time_limit, remaining - 0.5))  # 응답 생성 여유 남김
+
+        pages = self.iter_pages(name, session_id, use_mirror)
+        try:
+            async with asyncio.timeout(time_limit):
+                async for documents in pages:
+                    for doc in documents:
+                        index.add(doc)
+                        doc_id = str(doc.get("id", ""))
+                        if not prepared.normalized or doc_id not in index.documents:
+                            continue
+                        scored = index.score_document(doc_id, prepared, weights, fuzzy=True)
+                        if scored is not None:
+                            top.offer(scored[0], index._order[doc_id], doc_id, scored[1])
+                            if scored[0] >= HIGH_CONFIDENCE_SCORE:
+                                confident += 1
+                    if k is not None and confident >= k:
+                        stop_reason = "confident"
+                        break
+                    if len(index) >= self.stream_max_documents:
+                        stop_reason = "document_cap"
+                        break
+        except TimeoutError:
+            stop_reason = "time_cap"
+        finally:
+            await pages.aclose()
+
+        complete = stop_reason == "exhausted"
+        if complete:
+            self._install(name, index, generation)
+        else:
+            self._schedule_build(name)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stream_searches += 1
+        self.stream_stops[stop_reason] = self.stream_stops.get(stop_reason, 0) + 1
+        print(f"📄 페이지 스트리밍 검색: {name} '{query}' - 문서 {len(index)}개 스캔, {stop_reason}, {elapsed_ms:.0f}ms")
+        hits = [SearchHit(index.documents[doc_id], score, matches) for score, doc_id, matches in top.ranked()]
+        return SearchResults(hits, top.total, complete=complete, scanned_documents=len(index), stop_reason=stop_reason)
+
+    def on_write(self, tool_name: str, arguments: Dict[str, Any], result: Dict[str, Any]):
+        """MCPClient 쓰기 리스너 - 성공한 쓰기는 색인에 반영, 결과를 알 수 없으면 무효화"""
+        collection = (arguments or {}).get("collection")
+        if not collection:
+            return
+        name = collection_id(collection)
+        self._write_generation[name] = self._write_generation.get(name, 0) + 1
+        index = self._indexes.get(name)
+        if index is None:
+            return
+
+        payload = result.get("result") if isinstance(result, dict) else None
+        if not isinstance(payload, dict) or "error" in result:
+            index.stale = True
+            return
+
+        doc_id = arguments.get("id")
+        applied = False
+        if tool_name == "firestore_delete_document" and doc_id:
+            index.remove(str(doc_id))
+            applied = True
+        elif tool_name == "firestore_update_document" and doc_id:
+            applied = index.update(str(doc_id), arguments.get("data") or {})
+        elif tool_name == "firestore_add_document":
+            new_id = payload.get("id") or (payload.get("document") or {}).get("id")
+            if new_id:
+                index.add({"id": str(new_id), "data": arguments.get("data") or {}})
+                applied = True
+
+        if applied:
+            self.write_updates += 1
+        else:
+            index.stale = True
+
+    def invalidate(self, collection: Optional[str] = None):
+        if collection is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(collection_id(collection), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "collections": {name: index.stats() for name, index in self._indexes.items()},
+            "builds": self.builds,
+            "avg_build_ms": round(self.build_ms_total / self.builds, 1) if self.builds else 0.0,
+            "searches": self.searches,
+            "avg_search_ms": round(self.search_ms_total / self.searches, 3) if self.searches else 0.0,
+            "stream_searches": self.stream_searches,
+            "stream_stops": dict(self.stream_stops),
+            "background_builds_running": len(self._build_tasks),
+            "mirror_searches": self.mirror_searches,
+            "write_updates": self.write_updates
+        }
+
+
+# ========================================
+# 🌐 Firebase MCP 검색 색인 인스턴스
+# ========================================
+firebase_search_index = FirestoreSearchIndex(firebase_client)
@@ -0,0 +1,76 @@
+"""
+🛬 Singleflight - 동일한 진행 중 조회 호출 합치기
+
+🎯 목적:
+여러 채팅 세션이 같은 주소/컬렉션을 동시에 조회하면 세션마다
+firestore_query_collection_group 같은 MCP 호출이 따로 나갔습니다.
+같은 키의 호출이 진행 중이면 새로 보내지 않고 그 결과를 함께 기다립니다.
+
+🔧 특징:
+- 키별로 실제 호출(leader) 1건만 실행, 나머지(follower)는 결과 공유
+- asyncio.shield로 보호: 한 대기자가 취소되어도 다른 대기자의 호출은 계속 진행
+- follower에게는 깊은 복사본 전달 (결과를 수정하는 호출 측 보호)
+- 공유 호출은 leader의 시간 예산(deadline)이 아닌 자체 상한(max_seconds)으로 실행하고,
+  대기자는 각자 남은 예산만큼만 기다림 (예산이 긴 follower가 leader의 짧은 예산 때문에 실패하지 않음)
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict
+
+from .deadline import DeadlineExceeded, deadline_scope, detached_context, remaining_time
+
+
+class SingleFlight:
+    """키 단위 진행 중 호출 합치기"""
+
+    def __init__(self, max_seconds: float = 30.0):
+        self.max_seconds = max_seconds  # 공유 호출 자체 시간 상한 (요청 예산과 무관)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            print(f"🛬 진행 중 호출 공유: {key[:80]}")
+            result = await self._wait(task)
+            return copy.deepcopy(result)
+
+        self.leaders += 1
+        # leader의 시간 예산을 물려받지 않도록 예산 없는 컨텍스트에서 자체 상한으로 실행
+        task = asyncio.get_running_loop().create_task(self._run(factory), context=detached_context())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._forget(key, task))
+        return await self._wait(task)
+
+    async def _run(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        with deadline_scope(self.max_seconds):
+            return await factory()
+
+    @staticmethod
+    async def _wait(task: asyncio.Future) -> Any:
+        """대기자 자신의 남은 예산만큼만 대기 (초과 시 DeadlineExceeded, 공유 호출은 계속 진행)"""
+        remaining = remaining_time()
+        if remaining is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout=max(remaining, 0.0))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("진행 중 호출을 기다리는 동안 요청 시간 예산을 모두 사용했습니다") from None
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 대기자가 모두 취소된 경우 "never retrieved" 경고 방지
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.shared
+        return {
+            "inflight": len(self._inflight),
+            "leader_calls": self.leaders,
+            "coalesced_calls": self.shared,
+            "coalesce_rate": round(self.shared / total, 4) if total else 0.0
+        }
@@ -0,0 +1,153 @@
+"""
+📡 증분 SSE / JSON-RPC 응답 파서
+
+🎯 목적:
+기존 call_tool은 response.text()로 응답 전체를 버퍼링한 뒤 줄 단위로 split하여
+data: 라인을 찾았습니다. 큰 firestore_list_documents 응답에서 메모리를 많이 쓰고,
+스트림이 닫히기 전에는 결과를 반환할 수 없었습니다.
+
+🔧 주요 특징:
+- response.content를 청크 단위로 읽으며 SSE 이벤트를 즉시 조립
+- 여러 줄 data: 필드, CRLF/LF 혼용, 주석(:) 라인 처리 (SSE 표준)
+- 일반 application/json 응답(단일 객체 또는 배치 배열)도 동일한 인터페이스로 제공
+- 비-JSON data는 진단용으로 일부만 보관 (raw_response)
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+# 진단용으로 보관하는 비-JSON 응답 최대 길이
+MAX_RAW_TEXT = 2000
+
+
+class SSEEvent:
+    """조립이 끝난 SSE 이벤트 하나"""
+
+    __slots__ = ("event", "data", "id")
+
+    def __init__(self, event: str = "message", data: str = "", id: Optional[str] = None):
+        self.event = event
+        self.data = data
+        self.id = id
+
+    def __repr__(self) -> str:
+        return f"SSEEvent(event={self.event!r}, data={self.data[:50]!r}, id={self.id!r})"
+
+
+class SSEParser:
+    """바이트 청크를 받아 완성된 SSE 이벤트를 돌려주는 증분 파서"""
+
+    def __init__(self):
+        self._buffer = b""
+        self._event = "message"
+        self._data: List[str] = []
+        self._id: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """청크를 추가하고, 빈 줄로 끝난 이벤트들을 반환"""
+        self._buffer += chunk
+        events = []
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                break
+            line = self._buffer[:newline]
+            self._buffer = self._buffer[newline + 1:]
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            event = self._process_line(line.decode("utf-8", errors="replace"))
+            if event is not None:
+                events.append(event)
+        return events
+
+    def flush(self) -> List[SSEEvent]:
+        """스트림 종료 시 마지막 빈 줄 없이 끝난 이벤트 처리"""
+        events = []
+        if self._buffer:
+            line = self._buffer.rstrip(b"\r").decode("utf-8", errors="replace")
+            self._buffer = b""
+            event = self._process_line(line)
+            if event is not None:
+                events.append(event)
+        event = self._dispatch()
+        if event is not None:
+            events.append(event)
+        return events
+
+    def _process_line(self, line: str) -> Optional[SSEEvent]:
+        if line == "":
+            return self._dispatch()
+        if line.startswith(":"):
+            return None  # 주석 / keepalive
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value or "message"
+        elif field == "id":
+            self._id = value
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        if not self._data:
+            self._event = "message"
+            return None
+        event = SSEEvent(self._event, "\n".join(self._data), self._id)
+        self._event = "message"
+        self._data = []
+        return event
+
+
+def is_event_stream(response) -> bool:
+    return "text/event-stream" in (response.headers.get("Content-Type") or "")
+
+
+async def iter_sse_events(content) -> AsyncIterator[SSEEvent]:
+    """aiohttp StreamReader에서 SSE 이벤트를 도착하는 대로 반환"""
+    parser = SSEParser()
+    async for chunk in content.iter_any():
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.flush():
+        yield event
+
+
+async def iter_jsonrpc_messages(response, raw_sink: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    응답 본문에서 JSON-RPC 메시지를 하나씩 반환
+
+    - text/event-stream: 이벤트가 완성되는 즉시 반환
+    - application/json: 본문 전체가 필요하므로 읽은 뒤 객체/배열을 풀어서 반환
+    - JSON이 아닌 데이터는 raw_sink에 일부 보관
+    """
+    if is_event_stream(response):
+        async for event in iter_sse_events(response.content):
+            for message in _decode_messages(event.data, raw_sink):
+                yield message
+        return
+
+    body = await response.read()
+    for message in _decode_messages(body.decode("utf-8", errors="replace"), raw_sink):
+        yield message
+
+
+def _decode_messages(text: str, raw_sink: Optional[List[str]]) -> List[Dict[str, Any]]:
+    text = text.strip()
+    if not text:
+        return []
+    try:
+        decoded = json.loads(text)
+    except json.JSONDecodeError as parse_error:
+        print(f"JSON 파싱 오류: {parse_error}")
+        if raw_sink is not None and sum(len(part) for part in raw_sink) < MAX_RAW_TEXT:
+            raw_sink.append(text[:MAX_RAW_TEXT])
+        return []
+    if isinstance(decoded, list):
+        return [message for message in decoded if isinstance(message, dict)]
+    if isinstance(decoded, dict):
+        return [decoded]
+    return []
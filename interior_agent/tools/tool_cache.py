@@ -0,0 +1,148 @@
+"""
+🗃️ Firestore MCP 조회 결과 캐시 - Read-through TTL + LRU
+
+🎯 목적:
+firebase_agent의 조회 도구들은 LLM이 호출할 때마다 Firebase MCP 서버를 다시 호출했습니다.
+몇 초 전에 받은 addressesJson / estimateVersionsV3 조회 결과도 매번 원격 왕복이 필요했습니다.
+
+🔧 동작 방식:
+- 키: 도구 이름 + 정규화된 인자(JSON, 키 정렬)
+- TTL 만료 + 최대 개수 초과 시 LRU 제거
+- firestore_add/update/delete_document 호출 시 해당 컬렉션 항목 무효화
+- 반환/저장 시 깊은 복사 (호출 측에서 결과를 수정해도 캐시가 오염되지 않음)
+"""
+
+import copy
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+# 캐시 가능한 조회 도구
+CACHEABLE_TOOLS = {
+    "firestore_get_document",
+    "firestore_list_documents",
+    "firestore_list_collections",
+    "firestore_query_collection_group",
+}
+
+# 컬렉션 데이터를 바꾸는 쓰기 도구
+WRITE_TOOLS = {
+    "firestore_add_document",
+    "firestore_update_document",
+    "firestore_delete_document",
+}
+
+# firestore_list_collections 결과에 붙이는 태그 (컬렉션 추가/삭제 시 무효화)
+COLLECTIONS_TAG = "__collections__"
+
+
+def make_tool_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """도구 이름 + 정규화된 인자로 캐시 키 생성"""
+    canonical = json.dumps(arguments or {}, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"{tool_name}:{canonical}"
+
+
+def collection_tags(tool_name: str, arguments: Dict[str, Any]) -> Set[str]:
+    """도구 호출이 영향을 주거나 의존하는 컬렉션 태그"""
+    if tool_name == "firestore_list_collections":
+        return {COLLECTIONS_TAG}
+    collection = (arguments or {}).get("collection") or (arguments or {}).get("collectionId")
+    if not collection:
+        return set()
+    collection = str(collection).strip("/")
+    # 하위 컬렉션 경로(a/b/c)는 컬렉션 그룹 쿼리(c)와도 연결
+    return {collection, collection.rsplit("/", 1)[-1]}
+
+
+class ToolResultCache:
+    """조회 도구 결과용 TTL + LRU 캐시 (컬렉션 단위 무효화 지원)"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key → (만료 시각, 결과, 태그)
+        self._by_tag: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.collection_hits: Dict[str, int] = {}
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        return tool_name in CACHEABLE_TOOLS
+
+    def get(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = make_tool_key(tool_name, arguments)
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, result, tags = item
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        for tag in tags:
+            self.collection_hits[tag] = self.collection_hits.get(tag, 0) + 1
+        return copy.deepcopy(result)
+
+    def put(self, tool_name: str, arguments: Dict[str, Any], result: Dict[str, Any]):
+        # 오류/비정상 응답은 캐시하지 않음
+        if not isinstance(result, dict) or "error" in result or "raw_response" in result:
+            return
+        key = make_tool_key(tool_name, arguments)
+        if key in self._entries:
+            self._remove(key)
+        tags = collection_tags(tool_name, arguments)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(result), tags)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_for_write(self, tool_name: str, arguments: Dict[str, Any]):
+        """쓰기 도구 호출 후 영향받는 컬렉션 항목 무효화"""
+        tags = collection_tags(tool_name, arguments)
+        if tool_name in ("firestore_add_document", "firestore_delete_document"):
+            tags.add(COLLECTIONS_TAG)  # 컬렉션이 새로 생기거나 비워질 수 있음
+        for tag in tags:
+            self.invalidate_tag(tag)
+
+    def invalidate_tag(self, tag: str):
+        keys = self._by_tag.pop(tag, set())
+        for key in keys:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._by_tag.clear()
+
+    def _remove(self, key: str):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "collection_hits": dict(self.collection_hits)
+        }
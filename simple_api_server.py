@@ -118,11 +118,16 @@ AS 챗봇과 일반 챗봇이 모두 완벽하게 기능하는 상태로 복구
 import os
 import sys
 import asyncio
+import json
+import re
 import time
-from fastapi import FastAPI, HTTPException, Request
+from urllib.parse import unquote
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import MutableHeaders
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, Set
 
 # 환경변수 설정
 from dotenv import load_dotenv
@@ -148,6 +153,9 @@ if os.environ.get('NODE_ENV') == 'production':
 # ========================================
 ADK_AVAILABLE = False
 import_errors = []
+mcp_lifecycle = None  # ♨️ MCP 연결 수명 주기 관리 (ADK 표준 구조 로드 시 설정)
+as_workflow = None  # 🔧 AS 접수 상태 기계 (ADK 표준 구조 로드 시 설정)
+adk_session_lifecycle = None  # ♻️ ADK 세션 수명 주기 관리 (ADK 표준 구조 로드 시 설정)
 
 print("🔍 ADK 표준 구조 로드 진단 시작...")
 
@@ -156,6 +164,12 @@ try:
     print("1️⃣ 새로운 ADK 표준 인테리어 에이전트 로드 중...")
     from interior_agent import root_agent, runner, session_service, print_adk_info
     
+    # 🚦 키워드 사전 라우터 + 하위 에이전트 직접 실행 Runner
+    from interior_agent.agent import keyword_router, direct_runners
+    
+    # 🔧 AS 접수 상태 기계 (단계 안내는 고정 문구, LLM은 문제 내용 정리에만 사용)
+    from interior_agent.agents import as_agent, as_workflow
+    
     # 🔧 AS 전용 루트 에이전트 import 추가
     from interior_agent.as_root_agent import as_root_agent, as_runner, as_session_service
     
@@ -180,6 +194,13 @@ try:
     for i, sub_agent in enumerate(estimate_root_agent.sub_agents):
         print(f"   {i+1}. {sub_agent.name}")
     
+    # ♨️ MCP 클라이언트 연결 수명 주기 (사전 연결 + keepalive + 종료 정리)
+    from interior_agent.tools import firebase_client, email_client, MCPLifecycle
+    mcp_lifecycle = MCPLifecycle(
+        {"firebase": firebase_client, "email": email_client},
+        keepalive_interval=float(os.getenv("MCP_KEEPALIVE_SECONDS", "240"))
+    )
+    
     # ADK 정보 출력
     print_adk_info()
     
@@ -310,74 +331,223 @@ app.add_middleware(
 )
 
 # ========================================
-# 🎯 세션 ID 기반 라우팅 미들웨어
+# ♨️ 서버 시작/종료 - MCP 연결 사전 준비 및 정리
 # ========================================
-@app.middleware("http")
-async def session_routing_middleware(request: Request, call_next):
+@app.on_event("startup")
+async def startup_mcp_connections():
+    """
+    Cloud Run 콜드 스타트 직후 첫 채팅 요청이 DNS/TLS/initialize 지연을
+    떠안지 않도록 Firebase/Email MCP 연결을 미리 맺어둡니다.
+    (MCP_WARMUP_ENABLED=false로 비활성화 가능)
     """
-    모든 HTTP 요청을 가로채서 세션 ID를 확인하고,
-    적절한 에이전트 정보를 request.state에 저장합니다.
+    if mcp_lifecycle is None or os.getenv("MCP_WARMUP_ENABLED", "true").lower() == "false":
+        return
+    try:
+        await mcp_lifecycle.startup()
+    except Exception as e:
+        # 사전 연결 실패는 치명적이지 않음 - 첫 요청에서 다시 연결
+        print(f"⚠️ MCP 사전 연결 실패 (요청 시 재시도): {e}")
+
+@app.on_event("startup")
+async def startup_firestore_mirror():
+    """🪞 로컬 Firestore 미러 전체 적재 + 주기적 갱신 시작 (FIRESTORE_MIRROR_ENABLED=true일 때, 백그라운드)"""
+    if not ADK_AVAILABLE:
+        return
+    from interior_agent.tools.firestore_mirror import firestore_mirror
+    if firestore_mirror is not None:
+        await firestore_mirror.start()
+
+@app.on_event("startup")
+async def startup_conversation_sweeper():
+    """💬 대화 히스토리 TTL + ♻️ 유휴 ADK 세션 백그라운드 정리 시작"""
+    conversation_storage.start()
+    if adk_session_lifecycle is not None:
+        adk_session_lifecycle.start()
+
+@app.on_event("shutdown")
+async def shutdown_conversation_sweeper():
+    await conversation_storage.close()
+    if adk_session_lifecycle is not None:
+        await adk_session_lifecycle.close()
+    await conversation_compactor.close()
+
+@app.on_event("shutdown")
+async def shutdown_mcp_connections():
+    """Firestore 미러 갱신 중지 후 MCP 클라이언트 세션과 공유 커넥터 정리"""
+    if ADK_AVAILABLE:
+        from interior_agent.tools.firestore_mirror import firestore_mirror
+        if firestore_mirror is not None:
+            await firestore_mirror.close()
+    if mcp_lifecycle is not None:
+        await mcp_lifecycle.shutdown()
+
+# ========================================
+# 🎯 세션 ID 기반 라우팅 미들웨어 (순수 ASGI)
+# ========================================
+# 이전 @app.middleware("http") 방식은 /chat 본문을 통째로 읽어 json.loads로 session_id를 찾은 뒤
+# ChatRequest가 같은 본문을 다시 파싱했고, BaseHTTPMiddleware의 요청별 태스크/스트림 비용이
+# /health 같은 모든 엔드포인트에 붙었습니다.
+# 이제 라우팅은 본문을 읽지 않고 X-Session-ID 헤더 또는 /sessions/{session_id}/chat 경로로만 결정하고,
+# 둘 다 없으면 엔드포인트가 이미 파싱한 ChatRequest.session_id로 라우팅합니다 (route_chat_request).
+SESSION_CHAT_PATH = re.compile(r"^/sessions/([^/]+)/chat$")
+CHAT_PATHS = ("/chat", "/chat/stream")
+
+class SessionRoutingMiddleware:
+    """
+    헤더/경로 기반 세션 라우팅 ASGI 미들웨어
     
-    이 미들웨어가 필요한 이유:
-    1. 같은 서버에서 다른 챗봇들이 서로 다른 에이전트를 사용해야 함
-    2. 코드 중복 없이 중앙 집중식 라우팅 관리
-    3. 성능 최적화 (요청마다 에이전트 선택 로직 실행 방지)
+    - 채팅 경로에서만 X-Session-ID 헤더 또는 /sessions/{session_id}/chat 경로로 세션 ID 추출
+      (/health 등 나머지 요청은 헤더만 추가하고 그대로 통과)
+    - resolve(session_id) 결과를 scope["state"]에 저장 (request.state로 접근)
+    - 응답 헤더에 X-Agent-Type / X-Session-ID 추가 (디버깅용)
     """
-    # 요청 정보 로깅
-    print(f"🌐 요청 수신: {request.method} {request.url.path}")
     
-    # POST 요청의 경우 body에서 session_id 추출 시도
-    if request.method == "POST" and request.url.path == "/chat":
-        try:
-            # body를 읽어서 session_id 확인 (한 번만 읽을 수 있으므로 주의)
-            body = await request.body()
-            if body:
-                import json
-                try:
-                    body_data = json.loads(body.decode())
-                    session_id = body_data.get("session_id", "")
-                    print(f"📝 POST body에서 세션 ID 추출: {session_id}")
-                    
-                    # 에이전트 선택 및 request.state에 저장
-                    selected_agent, agent_type, selected_runner = get_agent_by_session_id(session_id)
-                    request.state.selected_agent = selected_agent
-                    request.state.agent_type = agent_type
-                    request.state.selected_runner = selected_runner
-                    request.state.session_id = session_id
-                    
-                    print(f"✅ 에이전트 선택 완료: {agent_type}")
-                    
-                except json.JSONDecodeError:
-                    print("⚠️ JSON 파싱 실패, 기본 에이전트 사용")
-                    request.state.selected_agent = root_agent
-                    request.state.agent_type = "all_agents"
-                    request.state.selected_runner = runner
-                    request.state.session_id = "default"
-        except Exception as e:
-            print(f"❌ 세션 ID 추출 실패: {e}")
-            request.state.selected_agent = root_agent
-            request.state.agent_type = "all_agents"
-            request.state.selected_runner = runner
-            request.state.session_id = "default"
-    else:
-        # GET 요청이나 다른 경로의 경우 기본 에이전트 사용
-        request.state.selected_agent = root_agent
-        request.state.agent_type = "all_agents"
-        request.state.selected_runner = runner
-        request.state.session_id = "default"
+    def __init__(self, app, resolve):
+        self.app = app
+        self.resolve = resolve
     
-    # 다음 처리 과정으로 진행
-    response = await call_next(request)
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        state = scope.setdefault("state", {})
+        session_id = self._session_id_from_scope(scope) if self.resolve is not None else None
+        if session_id is not None:
+            selected_agent, agent_type, selected_runner = self.resolve(session_id)
+            state["selected_agent"] = selected_agent
+            state["agent_type"] = agent_type
+            state["selected_runner"] = selected_runner
+            state["session_id"] = session_id
+        
+        async def send_with_routing_headers(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "x-agent-type" not in headers:
+                    headers["X-Agent-Type"] = state.get("agent_type", "all_agents")
+                if "x-session-id" not in headers:
+                    headers["X-Session-ID"] = state.get("session_id", "default")
+            await send(message)
+        
+        await self.app(scope, receive, send_with_routing_headers)
+    
+    @staticmethod
+    def _session_id_from_scope(scope) -> Optional[str]:
+        path = scope.get("path", "")
+        match = SESSION_CHAT_PATH.match(path)
+        if match:
+            return unquote(match.group(1))
+        if path not in CHAT_PATHS:
+            return None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-session-id":
+                return value.decode("latin-1")
+        return None
+
+# ADK를 불러오지 못한 경우 라우팅할 에이전트가 없으므로 헤더만 추가
+app.add_middleware(SessionRoutingMiddleware, resolve=get_agent_by_session_id if ADK_AVAILABLE else None)
+
+def route_chat_request(req: Request, body_session_id: Optional[str]):
+    """
+    채팅 요청의 에이전트 라우팅 결정
     
-    # 응답 헤더에 사용된 에이전트 정보 추가 (디버깅용)
-    response.headers["X-Agent-Type"] = getattr(request.state, 'agent_type', 'unknown')
-    response.headers["X-Session-ID"] = getattr(request.state, 'session_id', 'unknown')
+    미들웨어가 헤더/경로로 이미 라우팅했으면 그 결과를, 아니면 파싱된 본문의 session_id를 사용합니다.
     
-    return response
+    Returns:
+        tuple: (에이전트 객체, 에이전트 타입 문자열, runner 객체, 세션 ID)
+    """
+    state = req.state
+    if getattr(state, 'selected_runner', None) is None:
+        session_id = body_session_id or "default"
+        selected_agent, agent_type, selected_runner = get_agent_by_session_id(session_id)
+        state.selected_agent = selected_agent
+        state.agent_type = agent_type
+        state.selected_runner = selected_runner
+        state.session_id = session_id
+    return state.selected_agent, state.agent_type, state.selected_runner, state.session_id
 
 # 세션 관리 - 애플리케이션 레벨 대화 히스토리 저장
-conversation_storage: Dict[str, list] = {}
-MAX_HISTORY_LENGTH = 10  # 세션당 최대 대화 기록 수
+# ============================================================================
+# 최근 활동 순 LRU (세션 수 / 전체 바이트 상한) + 백그라운드 TTL 정리
+# 저장 위치는 SESSION_BACKEND (sqlite 기본 / redis / memory) - ADK 세션, AS 접수 상태와 같은 저장소
+# sqlite/redis면 여러 uvicorn 워커(WEB_CONCURRENCY)와 인스턴스가 같은 대화를 이어갑니다.
+# ============================================================================
+from interior_agent.sessions import session_store
+conversation_storage = session_store
+if conversation_storage.backend == "memory" and int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+    print("⚠️ SESSION_BACKEND=memory는 워커 간 대화를 공유하지 않습니다 - WEB_CONCURRENCY>1이면 sqlite/redis를 사용하세요")
+
+# 제거 리스너(동기)에서 시작하는 저장소 작업 - 이벤트 루프에서 태스크로 실행 (참조 유지)
+_background_tasks: Set[asyncio.Task] = set()
+
+def run_in_background(coro):
+    try:
+        task = asyncio.get_running_loop().create_task(coro)
+    except RuntimeError:
+        coro.close()
+        return
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+# 🔧 AS 접수 진행 상태도 같은 저장소에 보관 (다음 턴이 다른 워커로 가도 이어서 접수)
+if as_workflow is not None:
+    as_workflow.use_store(conversation_storage)
+    conversation_storage.add_removal_listener(lambda session_id, reason: run_in_background(as_workflow.reset(session_id)))
+
+# ♻️ ADK 세션 수명 주기 - 세 세션 서비스의 유휴 세션 삭제 / 이벤트 수 상한
+# 대화 히스토리에서 세션이 제거되면(LRU/TTL/삭제 API) 같은 세션의 ADK 세션도 함께 삭제합니다.
+if ADK_AVAILABLE:
+    from interior_agent.sessions import ADKSessionLifecycle
+    adk_session_lifecycle = ADKSessionLifecycle(
+        {
+            "all_agents": session_service,
+            "as_root_agent": as_session_service,
+            "estimate_root_agent": estimate_session_service
+        },
+        idle_ttl=float(os.getenv("ADK_SESSION_TTL_SECONDS", "3600")),
+        max_events=int(os.getenv("ADK_SESSION_MAX_EVENTS", "200")),
+        sweep_interval=float(os.getenv("CONVERSATION_SWEEP_SECONDS", "60"))
+    )
+    conversation_storage.add_removal_listener(adk_session_lifecycle.forget_user)
+
+# 🔌 ADK 세션 서비스 어댑터 - 동기/비동기 호출 방식은 시작 시 한 번 확인, 세션 핸들은 (app_name, session_id)별 캐시
+# 두 번째 턴부터 세션 조회는 dict 조회 한 번입니다. 세션이 삭제되면 캐시에서도 제거합니다.
+from interior_agent.sessions import SessionServiceAdapter
+session_adapters: Dict[str, SessionServiceAdapter] = {}  # 서비스 이름 → 어댑터 (/health 보고용)
+_adapters_by_service: Dict[int, SessionServiceAdapter] = {}
+
+def session_adapter_for(service, name: Optional[str] = None) -> SessionServiceAdapter:
+    """세션 서비스의 어댑터 (처음 요청될 때 호출 방식 확인)"""
+    adapter = _adapters_by_service.get(id(service))
+    if adapter is None:
+        adapter = _adapters_by_service[id(service)] = SessionServiceAdapter(
+            service, max_events=int(os.getenv("ADK_SESSION_MAX_EVENTS", "200"))
+        )
+        session_adapters[name or f"{type(service).__name__}_{len(session_adapters)}"] = adapter
+        print(f"🔌 세션 서비스 어댑터: {name or type(service).__name__} ({'async' if adapter.is_async else 'sync'})")
+    return adapter
+
+def forget_session_handles(session_id: str):
+    """모든 세션 서비스 어댑터에서 세션 핸들 캐시 제거"""
+    for adapter in session_adapters.values():
+        adapter.forget(session_id)
+
+if ADK_AVAILABLE:
+    for service_name, service in adk_session_lifecycle.services.items():
+        session_adapter_for(service, service_name)
+    adk_session_lifecycle.add_delete_listener(
+        lambda name, app_name, user_id, session_id:
+            session_adapter_for(adk_session_lifecycle.services[name]).forget(session_id, app_name)
+    )
+conversation_storage.add_removal_listener(lambda session_id, reason: forget_session_handles(session_id))
+
+# 📏 컨텍스트 조립 - ADK 세션에 이미 있는 대화는 다시 붙이지 않음 + 에이전트별 토큰 예산
+from interior_agent.sessions import create_context_builder
+context_builder = create_context_builder()
+
+# 🗜️ 대화 요약 압축 - 최근 턴만 ADK 세션에 남기고 그 앞은 세션 상태의 요약으로 대체 (긴 상담 세션의 프롬프트 크기 고정)
+from interior_agent.sessions import SUMMARY_STATE_KEY, create_conversation_compactor
+conversation_compactor = create_conversation_compactor()
 
 # 요청/응답 모델
 class ChatRequest(BaseModel):
@@ -390,17 +560,46 @@ class ChatResponse(BaseModel):
 @app.get("/health")
 async def health():
     """서버 상태 확인"""
+    store_stats = await conversation_storage.offload(conversation_storage.stats)
     return {
         "status": "healthy", 
         "adk_available": ADK_AVAILABLE,
-        "active_sessions": len(conversation_storage),
+        "active_sessions": store_stats["sessions"],
+        "conversation_store": store_stats,
+        "adk_sessions": adk_session_lifecycle.stats() if adk_session_lifecycle is not None else None,
+        "session_adapters": {name: adapter.stats() for name, adapter in session_adapters.items()},
+        "context_builder": context_builder.stats(),
+        "conversation_compactor": conversation_compactor.stats(),
         "agent_structure": "ADK_Standard_with_SessionRouting" if ADK_AVAILABLE else "Unavailable",
         "supported_session_patterns": [
             "customer-service-*: AS 전용 에이전트",
             "estimate-consultation-*: 견적 상담 전용 에이전트",
             "react-session-*: 전체 에이전트",
             "기타: 기본 전체 에이전트"
-        ]
+        ],
+        "mcp": get_mcp_health() if mcp_lifecycle is not None else None,
+        "keyword_router": keyword_router.stats() if ADK_AVAILABLE else None,
+        "as_workflow": await conversation_storage.offload(as_workflow.stats) if as_workflow is not None else None,
+        "chat_metrics": chat_metrics
+    }
+
+def get_mcp_health() -> dict:
+    """MCP 연결 상태 (사전 연결 소요 시간, 세션 풀, 캐시, 재시도/서킷 상태, 검색 색인)"""
+    clients = {}
+    for name, client in mcp_lifecycle.clients.items():
+        clients[name] = {
+            "pool": client.pool_stats(),
+            "cache": client.cache_stats(),
+            "singleflight": client.singleflight_stats(),
+            "resilience": client.resilience_stats()
+        }
+    from interior_agent.tools.search_index import firebase_search_index
+    from interior_agent.tools.firestore_mirror import firestore_mirror
+    return {
+        "lifecycle": mcp_lifecycle.stats(),
+        "clients": clients,
+        "search_index": firebase_search_index.stats(),
+        "firestore_mirror": firestore_mirror.stats() if firestore_mirror is not None else None
     }
 
 @app.get("/status")
@@ -410,7 +609,7 @@ async def status():
         "mode": "ADK_Standard" if ADK_AVAILABLE else "Error",
         "status": "healthy",
         "adk_available": ADK_AVAILABLE,
-        "active_sessions": len(conversation_storage),
+        "active_sessions": await conversation_storage.offload(len, conversation_storage),
         "session_management": "enabled_with_routing",
         "agent_info": {
             "main_agent": root_agent.name if ADK_AVAILABLE else None,
@@ -428,10 +627,11 @@ async def chat(request: ChatRequest, req: Request) -> ChatResponse:
     채팅 API - 세션 ID 기반 에이전트 라우팅 지원
     
     이 엔드포인트가 하는 일:
-    1. 미들웨어에서 설정된 에이전트 정보 사용
+    1. 세션 ID 기반 에이전트 라우팅 (X-Session-ID 헤더 / 경로 / 본문 session_id)
     2. 세션별 대화 히스토리 관리  
     3. 선택된 에이전트로 요청 처리
     4. 일관된 응답 형식 제공
+    5. 요청 시간 예산(X-Request-Deadline-Ms / CHAT_DEADLINE_SECONDS) 초과 시 부분 답변 반환
     """
     
     if not ADK_AVAILABLE:
@@ -442,29 +642,19 @@ async def chat(request: ChatRequest, req: Request) -> ChatResponse:
     try:
         print(f"🔄 사용자 요청: {request.message}")
         
-        # 🎯 미들웨어에서 설정된 에이전트 정보 사용
-        selected_agent = getattr(req.state, 'selected_agent', root_agent)
-        agent_type = getattr(req.state, 'agent_type', 'all_agents')
-        selected_runner = getattr(req.state, 'selected_runner', runner)
-        session_id = getattr(req.state, 'session_id', request.session_id)
+        # 🎯 세션 라우팅 (헤더/경로로 미들웨어가 결정했거나, 본문의 session_id 사용)
+        selected_agent, agent_type, selected_runner, session_id = route_chat_request(req, request.session_id)
         
         print(f"🤖 선택된 에이전트: {agent_type}")
         print(f"🏃 선택된 Runner: {selected_runner.app_name}")
         print(f"🔄 세션 ID 사용: {session_id}")
         
         # 애플리케이션 레벨 세션 초기화 (필요시)
-        if session_id not in conversation_storage:
-            conversation_storage[session_id] = []
+        if await conversation_storage.offload(conversation_storage.ensure, session_id):
             print(f"🆕 새 앱 세션 생성: {session_id}")
+            forget_session_handles(session_id)  # 다른 워커가 세션을 정리했을 수 있음
         else:
-            print(f"🔄 기존 앱 세션 재사용: {session_id} (기록 {len(conversation_storage[session_id])}개)")
-        
-        # 오래된 세션 정리
-        cleanup_old_sessions()
-        
-        # 컨텍스트 포함 메시지 생성
-        context_message = create_context_message(session_id, request.message)
-        print(f"📝 컨텍스트 메시지 길이: {len(context_message)} 문자")
+            print(f"🔄 기존 앱 세션 재사용: {session_id}")
         
         # ========================================
         # 🎯 선택된 에이전트로 요청 처리
@@ -475,7 +665,7 @@ async def chat(request: ChatRequest, req: Request) -> ChatResponse:
         selected_session_service = selected_runner.session_service
         app_name = selected_runner.app_name
         
-        # 🔄 세션 연속성 보장을 위한 ADK 세션 처리 (동기 방식)
+        # 🔄 세션 연속성 보장을 위한 ADK 세션 처리 (세션 서비스 어댑터)
         # ============================================================================
         # 📝 세션 연속성 문제 해결 과정 상세 기록
         # ============================================================================
@@ -516,86 +706,29 @@ async def chat(request: ChatRequest, req: Request) -> ChatResponse:
         #    - 기존 세션 재사용으로 메모리 효율성 향상
         #    - 불필요한 세션 생성 비용 절약
         #    - 대화 히스토리 자동 연결
+        #    - 동기/비동기 호출 방식은 시작 시 한 번만 확인 (턴마다 시도/예외 반복 없음)
+        #    - 세션 핸들은 (app_name, session_id)별 캐시 → 두 번째 턴부터 dict 조회 한 번
         # ============================================================================
         
-        adk_session = None
-        session_creation_success = False
-        
-        # 🔄 환경별 세션 처리 방식 자동 감지 및 적용
-        # ============================================================================
-        # 문제: 로컬과 Cloud Run에서 ADK 세션 서비스 동작이 다름
-        # 해결: 동기/비동기 방식을 모두 시도하여 환경에 맞는 방식 자동 선택
-        # ============================================================================
-        
-        # 방법 1: 동기 방식 시도 (Cloud Run에서 성공)
-        try:
-            print(f"🔄 방법 1: 동기 방식으로 세션 처리 시도...")
-            
-            # 🔍 1단계: 기존 세션 먼저 조회 (세션 연속성의 핵심)
-            try:
-                # 동기 방식으로 기존 세션 조회
-                adk_session = selected_session_service.get_session(
-                    app_name=app_name,      # 에이전트별 세션 분리 (as_root_agent vs all_agents)
-                    user_id=session_id,     # 사용자 식별자
-                    session_id=session_id   # 세션 식별자 (동일값으로 세션 연결)
-                )
-                print(f"✅ 동기 방식 - 기존 ADK 세션 재사용: {adk_session.id}")
-                session_creation_success = True
-                
-            except Exception as get_error:
-                # 🆕 2단계: 기존 세션이 없을 경우에만 새로 생성
-                print(f"🔄 동기 방식 - 기존 세션 없음, 새 세션 생성...")
-                
-                # 동기 방식으로 새 세션 생성
-                adk_session = selected_session_service.create_session(
-                    app_name=app_name,      # 에이전트별 세션 분리
-                    user_id=session_id,     # 사용자 식별자  
-                    session_id=session_id   # 세션 식별자
-                )
-                print(f"✅ 동기 방식 - 새 ADK 세션 생성: {adk_session.id}")
-                session_creation_success = True
-                
-        except Exception as sync_error:
-            print(f"⚠️ 동기 방식 실패: {sync_error}")
-            
-            # 방법 2: 비동기 방식 시도 (로컬에서 필요할 수 있음)
-            try:
-                print(f"🔄 방법 2: 비동기 방식으로 세션 처리 시도...")
-                
-                # 비동기 방식으로 기존 세션 조회
-                try:
-                    adk_session = await selected_session_service.get_session(
-                        app_name=app_name,
-                        user_id=session_id,
-                        session_id=session_id
-                    )
-                    print(f"✅ 비동기 방식 - 기존 ADK 세션 재사용: {adk_session.id}")
-                    session_creation_success = True
-                    
-                except Exception as async_get_error:
-                    print(f"🔄 비동기 방식 - 기존 세션 없음, 새 세션 생성...")
-                    
-                    # 비동기 방식으로 새 세션 생성
-                    adk_session = await selected_session_service.create_session(
-                        app_name=app_name,
-                        user_id=session_id,
-                        session_id=session_id
-                    )
-                    print(f"✅ 비동기 방식 - 새 ADK 세션 생성: {adk_session.id}")
-                    session_creation_success = True
-                    
-            except Exception as async_error:
-                print(f"❌ 비동기 방식도 실패: {async_error}")
-                
-        if not session_creation_success:
-            # 🚨 모든 방식 실패 시 처리
-            print(f"❌ 모든 세션 생성 방식 실패 - 동기/비동기 모두 시도했으나 실패")
-            print(f"   🔍 환경 정보: Python {sys.version}")
-            print(f"   🔍 ADK 사용 가능: {ADK_AVAILABLE}")
-            
+        adk_session = await resolve_adk_session(selected_session_service, app_name, session_id)
+        if adk_session is None:
             # 사용자에게 친화적인 오류 메시지 반환
             return ChatResponse(response="세션 생성에 실패했습니다. 다시 시도해주세요.")
         
+        # 🚦 키워드가 하위 에이전트 하나만 가리키면 라우팅 LLM 호출 없이 바로 실행
+        selected_runner = await select_turn_runner(selected_runner, adk_session, session_id, request.message)
+        
+        # 🔧 AS 접수 턴은 상태 기계가 바로 응답 (에이전트 실행 없음)
+        workflow_reply = await run_as_workflow_turn(selected_runner, session_id, request.message, resolve_chat_deadline(req))
+        if workflow_reply is not None:
+            await add_to_history(session_id, "user", request.message)
+            await add_to_history(session_id, "assistant", workflow_reply)
+            return ChatResponse(response=workflow_reply)
+        
+        # 📏 컨텍스트 포함 메시지 생성 (ADK 세션에 이미 있는 대화는 제외, 에이전트별 토큰 예산)
+        context_message = await create_context_message(session_id, request.message, selected_runner, adk_session)
+        print(f"📝 컨텍스트 메시지 길이: {len(context_message)} 문자")
+        
         # 🤖 ADK Runner를 통한 에이전트 실행 (세션 연결 완료 후)
         # ============================================================================
         # ADK Runner 실행 과정:
@@ -626,27 +759,42 @@ async def chat(request: ChatRequest, req: Request) -> ChatResponse:
             # run_async()는 제대로 된 async 함수이므로 await 사용
             # 세션 ID를 통해 이전 대화 맥락과 연결
             # ============================================================================
-            final_response = None
-            event_count = 0
+            # ⏱️ 요청 전체 시간 예산 - ADK Runner → 도구 → MCP 호출까지 전파
+            # ============================================================================
+            # deadline_scope 안에서 만든 태스크는 ContextVar를 복사하므로
+            # 에이전트가 호출하는 모든 MCP 요청이 남은 예산 기준으로 타임아웃을 잡습니다.
+            # 예산이 끝나면 실행 중인 태스크(진행 중인 MCP 호출 포함)를 취소하고
+            # 그때까지 받은 응답으로 부분 답변을 돌려줍니다.
+            # ============================================================================
+            from interior_agent.tools.deadline import deadline_scope
+            chat_budget = resolve_chat_deadline(req)
+            collected_texts = []
+            event_counter = {"count": 0, "tokens": 0, "started": time.monotonic()}
             
-            async for event in selected_runner.run_async(
-                user_id=session_id,             # 사용자 식별 (세션과 동일)
-                session_id=adk_session.id,      # ADK 세션 ID (연속성 보장)
-                new_message=content             # Content 객체 (올바른 형식)
-            ):
-                event_count += 1
-                print(f"📨 이벤트 {event_count}: {type(event).__name__}")
-                
-                # 🎯 최종 응답 추출 (이벤트 스트림에서)
-                if hasattr(event, 'content') and event.content:
-                    if hasattr(event.content, 'parts') and event.content.parts:
-                        for part in event.content.parts:
-                            if hasattr(part, 'text') and part.text:
-                                final_response = part.text
-                                print(f"💬 응답 미리보기: {part.text[:100]}...")
+            with deadline_scope(chat_budget):
+                run_task = asyncio.create_task(collect_agent_response(
+                    selected_runner, session_id, adk_session.id, content, collected_texts, event_counter
+                ))
+                # 🔌 완료 / 시간 예산 초과 / 클라이언트 연결 끊김 중 먼저 일어나는 것을 기다림
+                outcome = await wait_for_agent_or_disconnect(run_task, req, chat_budget)
+            
+            final_response = collected_texts[-1] if collected_texts else None
+            event_count = event_counter["count"]
+            record_turn_metrics(outcome, event_counter)
+            
+            if outcome == "disconnected":
+                # 아무도 읽지 않을 응답이므로 히스토리에 저장하지 않고 종료
+                print(f"🔌 클라이언트 연결 끊김 - 에이전트 실행 취소 ({agent_type}, 이벤트 {event_count}개 처리 후)")
+                return ChatResponse(response="")
+            timed_out = outcome == "timeout"
+            if timed_out:
+                print(f"⏱️ 시간 예산 {chat_budget:.1f}초 초과 - 에이전트 실행 취소 ({agent_type})")
         
             # 🎯 응답 검증 및 후처리
-            response_text = final_response if final_response else "에이전트가 응답을 생성하지 못했습니다."
+            if timed_out:
+                response_text = build_timeout_response(final_response)
+            else:
+                response_text = final_response if final_response else "에이전트가 응답을 생성하지 못했습니다."
             print(f"💬 {agent_type} 최종 응답: {len(response_text)}자")
             print(f"📊 처리된 이벤트 수: {event_count}개")
             
@@ -682,8 +830,8 @@ async def chat(request: ChatRequest, req: Request) -> ChatResponse:
         # - 최대 길이 제한으로 메모리 효율성 보장
         # - 타임스탬프 기록으로 세션 정리 지원
         # ============================================================================
-        add_to_history(session_id, "user", request.message)
-        add_to_history(session_id, "assistant", response_text)
+        await add_to_history(session_id, "user", request.message)
+        await add_to_history(session_id, "assistant", response_text)
         print(f"💾 대화 히스토리 저장 완료: 세션 {session_id}")
         
         return ChatResponse(response=response_text)
@@ -698,41 +846,592 @@ async def chat(request: ChatRequest, req: Request) -> ChatResponse:
             detail=f"세션 라우팅 기반 처리 오류: {str(e)}"
         )
 
+@app.post("/sessions/{session_id}/chat")
+async def chat_for_session(session_id: str, request: ChatRequest, req: Request) -> ChatResponse:
+    """경로의 세션 ID로 라우팅되는 채팅 API (본문의 session_id는 무시)"""
+    request.session_id = session_id
+    return await chat(request, req)
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, req: Request):
+    """
+    채팅 스트리밍 API (Server-Sent Events)
+    
+    /chat과 같은 세션 라우팅·대화 히스토리·시간 예산을 사용하지만,
+    ADK Runner 이벤트가 도착하는 즉시 클라이언트로 전달합니다.
+    
+    이벤트 형식 (event: <type> / data: <JSON>):
+    - session: 라우팅된 에이전트 정보 (연결 직후 1회)
+    - delta: 모델이 생성 중인 부분 텍스트
+    - message: 완성된 텍스트 (에이전트별)
+    - tool_call / tool_result: 도구 호출 진행 상황
+    - error: 처리 중 오류
+    - done: 최종 응답 (/chat 응답과 동일한 문자열)
+    """
+    if not ADK_AVAILABLE:
+        raise HTTPException(status_code=503, detail="ADK 표준 구조를 사용할 수 없습니다. 서버 로그를 확인해주세요.")
+    
+    # 🎯 /chat과 동일한 세션 ID 기반 라우팅
+    selected_agent, agent_type, selected_runner, session_id = route_chat_request(req, request.session_id)
+    print(f"🔄 [stream] 사용자 요청: {request.message}")
+    print(f"🤖 [stream] 선택된 에이전트: {agent_type} (세션 {session_id})")
+    
+    adk_session = await prepare_agent_turn(selected_runner, session_id)
+    if adk_session is None:
+        raise HTTPException(status_code=500, detail="세션 생성에 실패했습니다. 다시 시도해주세요.")
+    selected_runner = await select_turn_runner(selected_runner, adk_session, session_id, request.message)
+    
+    workflow_reply = await run_as_workflow_turn(selected_runner, session_id, request.message, resolve_chat_deadline(req))
+    if workflow_reply is not None:
+        turn_stream = (format_sse(event_type, data) for event_type, data in
+                       await workflow_turn_events(agent_type, session_id, request.message, workflow_reply))
+    else:
+        content = await build_turn_content(selected_runner, session_id, request.message, adk_session)
+        turn_stream = stream_agent_turn(selected_runner, agent_type, session_id, adk_session.id, content, request.message, resolve_chat_deadline(req))
+    
+    return StreamingResponse(
+        turn_stream,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # 프록시 버퍼링 방지 (첫 바이트 지연 방지)
+            "X-Agent-Type": agent_type,
+            "X-Session-ID": session_id
+        }
+    )
+
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    """
+    채팅 WebSocket API - 브라우저 탭당 연결 1개로 여러 세션 처리
+    
+    /chat처럼 메시지마다 HTTP 요청(미들웨어 body 파싱, 라우팅, 헤더 추가)을 만들지 않고,
+    연결 하나에서 session_id별로 get_agent_by_session_id 라우팅을 적용합니다.
+    
+    클라이언트 → 서버:
+        {"type": "chat", "session_id": "...", "message": "...", "request_id": "...",
+         "stream": true, "deadline_ms": 30000}
+        {"type": "ping"}
+    서버 → 클라이언트:
+        /chat/stream과 같은 이벤트(session, delta, message, tool_call, tool_result, error, done)에
+        session_id / request_id를 붙여 전송 (stream=false면 done만 전송)
+    
+    같은 세션의 메시지는 순서대로 처리하고, 서로 다른 세션은 동시에 처리합니다.
+    연결이 끊기면 진행 중인 모든 턴을 취소합니다.
+    """
+    await websocket.accept()
+    connection_deadline_ms = websocket.headers.get("x-request-deadline-ms")
+    send_lock = asyncio.Lock()
+    session_locks: Dict[str, asyncio.Lock] = {}
+    turn_tasks = set()
+    print(f"🔌 [ws] 연결 수립: {websocket.client}")
+    
+    async def send_json(payload: dict):
+        async with send_lock:
+            await websocket.send_text(json.dumps(payload, ensure_ascii=False, default=str))
+    
+    async def handle_turn(payload: dict):
+        session_id = payload.get("session_id") or "default"
+        request_id = payload.get("request_id")
+        stream = payload.get("stream", True)
+        envelope = {"session_id": session_id, "request_id": request_id}
+        
+        lock = session_locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            try:
+                selected_agent, agent_type, selected_runner = get_agent_by_session_id(session_id)
+                print(f"🔄 [ws] 사용자 요청: {payload.get('message')} ({agent_type}, 세션 {session_id})")
+                adk_session = await prepare_agent_turn(selected_runner, session_id)
+                if adk_session is None:
+                    await send_json({"type": "error", "message": "세션 생성에 실패했습니다. 다시 시도해주세요.", **envelope})
+                    return
+                selected_runner = await select_turn_runner(selected_runner, adk_session, session_id, payload["message"])
+                
+                chat_budget = parse_deadline_ms(payload.get("deadline_ms") or connection_deadline_ms)
+                workflow_reply = await run_as_workflow_turn(selected_runner, session_id, payload["message"], chat_budget)
+                if workflow_reply is not None:
+                    for event_type, data in await workflow_turn_events(agent_type, session_id, payload["message"], workflow_reply):
+                        if stream or event_type == "done":
+                            await send_json({"type": event_type, **data, **envelope})
+                    return
+                
+                content = await build_turn_content(selected_runner, session_id, payload["message"], adk_session)
+                turn_events = run_agent_turn_events(
+                    selected_runner, agent_type, session_id, adk_session.id, content, payload["message"], chat_budget
+                )
+                try:
+                    async for event_type, data in turn_events:
+                        if stream or event_type == "done":
+                            await send_json({"type": event_type, **data, **envelope})
+                finally:
+                    await turn_events.aclose()
+            except (WebSocketDisconnect, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                print(f"❌ [ws] 턴 처리 오류: {e}")
+                await send_json({"type": "error", "message": f"죄송합니다. 요청 처리 중 오류가 발생했습니다: {str(e)}", **envelope})
+    
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                payload = json.loads(raw)
+            except json.JSONDecodeError:
+                await send_json({"type": "error", "message": "JSON 형식이 아닌 메시지입니다."})
+                continue
+            if not isinstance(payload, dict):
+                # [], "hi", 1 같은 JSON 값 - 연결과 진행 중인 턴은 유지
+                await send_json({"type": "error", "message": "JSON 객체 형식의 메시지만 지원합니다."})
+                continue
+            
+            message_type = payload.get("type", "chat")
+            if message_type == "ping":
+                await send_json({"type": "pong"})
+            elif (message_type == "chat" and payload.get("message") and isinstance(payload["message"], str)
+                  and isinstance(payload.get("session_id") or "default", str)):
+                task = asyncio.create_task(handle_turn(payload))
+                turn_tasks.add(task)
+                task.add_done_callback(turn_tasks.discard)
+            else:
+                await send_json({"type": "error", "message": f"지원하지 않는 메시지입니다: {message_type}",
+                                 "request_id": payload.get("request_id")})
+    except WebSocketDisconnect:
+        print(f"🔌 [ws] 연결 종료: {websocket.client} (진행 중 턴 {len(turn_tasks)}개 취소)")
+    finally:
+        for task in list(turn_tasks):
+            task.cancel()
+        if turn_tasks:
+            await asyncio.gather(*turn_tasks, return_exceptions=True)
+
+# ========================================
+# 🔄 ADK 세션 조회/생성 헬퍼
+# ========================================
+async def resolve_adk_session(selected_session_service, app_name: str, session_id: str):
+    """
+    ADK 세션 조회 또는 생성 (기존 세션 우선 → 없으면 새로 생성)
+    
+    동기/비동기 호출 방식은 세션 서비스 어댑터가 시작 시 한 번 확인하고,
+    두 번째 턴부터는 캐시된 세션 핸들을 그대로 사용합니다. 자세한 배경은 chat() 주석 참고.
+    
+    Returns:
+        ADK 세션 객체, 조회/생성이 실패하면 None
+    """
+    try:
+        adk_session = await session_adapter_for(selected_session_service).get_or_create(app_name, session_id)
+    except Exception as e:
+        print(f"❌ ADK 세션 조회/생성 실패: {e}")
+        print(f"   🔍 환경 정보: Python {sys.version}")
+        print(f"   🔍 ADK 사용 가능: {ADK_AVAILABLE}")
+        return None
+    
+    # ♻️ 마지막 사용 시각 갱신 + 이벤트 수 상한 적용
+    if adk_session_lifecycle is not None:
+        await adk_session_lifecycle.touch(selected_session_service, app_name, session_id, adk_session.id)
+    # 🗜️ 오래된 턴은 요약으로 대체 (캐시된 핸들에도 반영)
+    try:
+        await conversation_compactor.compact(selected_session_service, app_name, session_id, adk_session.id, adk_session)
+    except Exception as e:
+        print(f"⚠️ 대화 요약 압축 실패 - 그대로 진행: {type(e).__name__}: {e}")
+    return adk_session
+
+# ========================================
+# ⏱️ 요청 시간 예산 (deadline) 및 에이전트 실행 헬퍼
+# ========================================
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "60"))  # 기본 예산
+CHAT_DEADLINE_MAX_SECONDS = float(os.getenv("CHAT_DEADLINE_MAX_SECONDS", "300"))  # 헤더로 요청 가능한 최대값
+
+def resolve_chat_deadline(req: Request) -> float:
+    """
+    요청별 시간 예산(초) 결정
+    - X-Request-Deadline-Ms 헤더가 있으면 사용 (1초 ~ CHAT_DEADLINE_MAX_SECONDS로 제한)
+    - 없으면 CHAT_DEADLINE_SECONDS 환경변수 값
+    """
+    return parse_deadline_ms(req.headers.get("x-request-deadline-ms"))
+
+def parse_deadline_ms(value) -> float:
+    """밀리초 예산 값을 초 단위로 변환 (1초 ~ CHAT_DEADLINE_MAX_SECONDS, 없거나 잘못되면 기본값)"""
+    if value:
+        try:
+            return min(max(float(value) / 1000, 1.0), CHAT_DEADLINE_MAX_SECONDS)
+        except (TypeError, ValueError):
+            print(f"⚠️ 잘못된 시간 예산 값 무시: {value}")
+    return CHAT_DEADLINE_SECONDS
+
+async def collect_agent_response(selected_runner, session_id: str, adk_session_id: str, content, collected_texts: list, event_counter: dict):
+    """ADK Runner 이벤트 스트림을 소비하며 텍스트 응답을 collected_texts에 누적"""
+    session_adapter_for(selected_runner.session_service).observe_message(selected_runner.app_name, adk_session_id, content)
+    async for event in selected_runner.run_async(
+        user_id=session_id,             # 사용자 식별 (세션과 동일)
+        session_id=adk_session_id,      # ADK 세션 ID (연속성 보장)
+        new_message=content             # Content 객체 (올바른 형식)
+    ):
+        event_counter["count"] += 1
+        print(f"📨 이벤트 {event_counter['count']}: {type(event).__name__}")
+        note_routing_event(selected_runner, event, event_counter)
+        session_adapter_for(selected_runner.session_service).observe(selected_runner.app_name, adk_session_id, event)
+        
+        # 📊 토큰 사용량 집계 (LLM 응답 이벤트에만 존재)
+        usage = getattr(event, 'usage_metadata', None)
+        if usage is not None and getattr(usage, 'total_token_count', None):
+            event_counter["tokens"] = event_counter.get("tokens", 0) + usage.total_token_count
+        
+        # 🎯 최종 응답 추출 (이벤트 스트림에서)
+        if hasattr(event, 'content') and event.content:
+            if hasattr(event.content, 'parts') and event.content.parts:
+                for part in event.content.parts:
+                    if hasattr(part, 'text') and part.text:
+                        collected_texts.append(part.text)
+                        print(f"💬 응답 미리보기: {part.text[:100]}...")
+
+# 🔌 클라이언트 연결 끊김 감지 주기 (초)
+DISCONNECT_POLL_SECONDS = 0.5
+
+# 📊 채팅 턴 실행 지표 (/health 노출)
+chat_metrics = {
+    "completed_turns": 0,
+    "completed_turn_tokens": 0,
+    "timed_out_turns": 0,
+    "disconnected_turns": 0,
+    "tokens_spent_before_disconnect": 0,
+    "estimated_tokens_saved": 0
+}
+
+async def watch_client_disconnect(req: Request):
+    """클라이언트(브라우저)가 연결을 끊으면 반환"""
+    while not await req.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+async def wait_for_agent_or_disconnect(run_task: asyncio.Task, req: Request, timeout: float) -> str:
+    """
+    에이전트 실행 태스크를 기다리되, 시간 예산 초과나 클라이언트 연결 끊김 시 취소
+    
+    태스크를 취소하면 그 안에서 대기 중인 MCPClient 호출도 함께 취소됩니다.
+    (singleflight로 다른 세션과 공유 중인 호출은 shield로 보호되어 계속 진행)
+    
+    Returns:
+        "done" | "timeout" | "disconnected"
+    """
+    watcher = asyncio.create_task(watch_client_disconnect(req))
+    try:
+        done, _ = await asyncio.wait({run_task, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        run_task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    
+    if run_task in done:
+        run_task.result()  # 에이전트 실행 중 예외가 있으면 그대로 전달
+        return "done"
+    
+    run_task.cancel()
+    try:
+        await run_task
+    except asyncio.CancelledError:
+        pass
+    return "disconnected" if watcher in done else "timeout"
+
+def record_turn_metrics(outcome: str, event_counter: dict):
+    """턴 결과별 지표 기록 - 연결 끊김 시 아낀 토큰은 완료된 턴의 평균 사용량으로 추정"""
+    if "routed_ms" in event_counter:
+        keyword_router.record_llm_routing(event_counter["routed_ms"])
+    tokens = event_counter.get("tokens", 0)
+    if outcome == "done":
+        chat_metrics["completed_turns"] += 1
+        chat_metrics["completed_turn_tokens"] += tokens
+    elif outcome == "timeout":
+        chat_metrics["timed_out_turns"] += 1
+    elif outcome == "disconnected":
+        chat_metrics["disconnected_turns"] += 1
+        chat_metrics["tokens_spent_before_disconnect"] += tokens
+        completed = chat_metrics["completed_turns"]
+        if completed:
+            average = chat_metrics["completed_turn_tokens"] / completed
+            chat_metrics["estimated_tokens_saved"] += int(max(average - tokens, 0))
+
+# ========================================
+# 🚦 키워드 사전 라우팅
+# ========================================
+KEYWORD_ROUTER_ENABLED = os.getenv("KEYWORD_ROUTER_ENABLED", "true").lower() != "false"
+
+def last_responding_agent(adk_session) -> Optional[str]:
+    """세션에서 마지막으로 응답한 에이전트 이름 (메인 에이전트면 None)"""
+    for event in reversed(getattr(adk_session, 'events', None) or []):
+        author = getattr(event, 'author', None)
+        if author and author != "user":
+            return None if author == root_agent.name else author
+    return None
+
+async def select_turn_runner(selected_runner, adk_session, session_id: str, message: str):
+    """
+    전체 에이전트(runner) 턴에서 키워드가 하위 에이전트 하나만 가리키면 그 에이전트의 직접 실행 Runner 반환
+    
+    키워드가 없거나 여러 에이전트에 걸치면(모호) 기존 LLM 라우터(runner)를 그대로 사용합니다.
+    AS 접수처럼 여러 턴 절차가 진행 중이면 가로채지 않습니다.
+    """
+    if not KEYWORD_ROUTER_ENABLED or selected_runner is not runner or await as_workflow_active(session_id):
+        return selected_runner
+    decision = keyword_router.route(message, last_responding_agent(adk_session))
+    if decision.target is None:
+        print(f"🚦 키워드 라우팅 보류 ({decision.reason}) → LLM 라우터 {decision.matches}")
+        return selected_runner
+    keyword_router.record_direct_dispatch()
+    print(f"🚦 키워드 라우팅: {decision.target} (키워드 {decision.matches[decision.target]}) - 라우팅 LLM 호출 생략")
+    return direct_runners[decision.target]
+
+def note_routing_event(selected_runner, event, event_counter: dict):
+    """LLM 라우터 턴에서 메인 에이전트 이후 첫 하위 에이전트 이벤트까지 걸린 시간 기록 (아낀 시간 추정용)"""
+    if selected_runner is not runner or "routed_ms" in event_counter:
+        return
+    author = getattr(event, 'author', None)
+    if author == root_agent.name:
+        event_counter["root_seen"] = True
+    elif author and author != "user" and event_counter.get("root_seen"):
+        event_counter["routed_ms"] = (time.monotonic() - event_counter["started"]) * 1000
+
+# ========================================
+# 🔧 AS 접수 상태 기계 턴
+# ========================================
+AS_WORKFLOW_ENABLED = os.getenv("AS_WORKFLOW_ENABLED", "true").lower() != "false"
+
+async def as_workflow_active(session_id: str) -> bool:
+    return as_workflow is not None and AS_WORKFLOW_ENABLED and await as_workflow.is_active(session_id)
+
+async def run_as_workflow_turn(selected_runner, session_id: str, message: str, chat_budget: float) -> Optional[str]:
+    """
+    AS 접수 턴이면 상태 기계 응답, 아니면 None (에이전트 실행)
+    
+    - 접수 진행 중인 세션: 다음 단계 처리
+    - AS 전용 세션(as_runner) 또는 키워드 라우터가 as_agent로 보낸 턴: 새 접수 시작
+    AS_WORKFLOW_ENABLED=false면 기존 as_agent(LLM)가 처리합니다.
+    """
+    if as_workflow is None or not AS_WORKFLOW_ENABLED:
+        return None
+    if await as_workflow.is_active(session_id):
+        from interior_agent.tools.deadline import deadline_scope
+        with deadline_scope(chat_budget):
+            return await as_workflow.handle(session_id, message)
+    if selected_runner is as_runner or selected_runner is direct_runners.get(as_agent.name):
+        return await as_workflow.start(session_id)
+    return None
+
+async def workflow_turn_events(agent_type: str, session_id: str, user_message: str, reply: str) -> list:
+    """상태 기계 응답을 스트리밍 이벤트 형식으로 (/chat/stream, /ws/chat 공용) + 대화 히스토리 저장"""
+    await add_to_history(session_id, "user", user_message)
+    await add_to_history(session_id, "assistant", reply)
+    return [
+        ("session", {"session_id": session_id, "agent_type": agent_type}),
+        ("message", {"agent": as_agent.name, "text": reply}),
+        ("done", {"response": reply, "timed_out": False})
+    ]
+
+def build_timeout_response(partial_text: Optional[str]) -> str:
+    """시간 예산 초과 시 부분 답변 구성"""
+    if partial_text:
+        return f"{partial_text}\n\n(처리 시간이 길어져 여기까지만 안내드립니다. 이어서 확인이 필요하시면 다시 요청해주세요.)"
+    return "죄송합니다. 요청 처리 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+
+# ========================================
+# 📡 /chat/stream 스트리밍 헬퍼
+# ========================================
+def format_sse(event_type: str, data: dict) -> str:
+    """SSE 이벤트 한 건 직렬화"""
+    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+def build_streaming_run_config():
+    """토큰 단위 부분 응답을 받기 위한 RunConfig (지원하지 않는 ADK 버전이면 None)"""
+    try:
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        return RunConfig(streaming_mode=StreamingMode.SSE)
+    except ImportError:
+        return None
+
+def agent_event_to_stream_items(event) -> list:
+    """ADK 이벤트 → (SSE 이벤트 타입, 데이터) 목록"""
+    items = []
+    author = getattr(event, 'author', None)
+    
+    # 🔧 도구 호출 / 결과 (진행 상황 표시용, 인자·결과는 요약만)
+    if hasattr(event, 'get_function_calls'):
+        for call in event.get_function_calls() or []:
+            items.append(("tool_call", {"agent": author, "tool": call.name, "args": call.args or {}}))
+        for response in event.get_function_responses() or []:
+            items.append(("tool_result", {
+                "agent": author,
+                "tool": response.name,
+                "summary": str(response.response)[:200] if response.response else ""
+            }))
+    
+    # 💬 텍스트 (partial=True는 생성 중인 조각, 그 외는 완성된 텍스트)
+    content = getattr(event, 'content', None)
+    if content and getattr(content, 'parts', None):
+        text = "".join(part.text for part in content.parts if getattr(part, 'text', None))
+        if text:
+            items.append(("delta" if getattr(event, 'partial', False) else "message", {"agent": author, "text": text}))
+    return items
+
+async def produce_agent_events(selected_runner, session_id: str, adk_session_id: str, content, queue: asyncio.Queue, event_counter: dict):
+    """ADK Runner 이벤트를 SSE 항목으로 변환해 큐에 넣는 생산자 태스크 (종료 시 None)"""
+    run_kwargs = {"user_id": session_id, "session_id": adk_session_id, "new_message": content}
+    run_config = build_streaming_run_config()
+    if run_config is not None:
+        run_kwargs["run_config"] = run_config
+    session_adapter_for(selected_runner.session_service).observe_message(selected_runner.app_name, adk_session_id, content)
+    try:
+        async for event in selected_runner.run_async(**run_kwargs):
+            event_counter["count"] += 1
+            note_routing_event(selected_runner, event, event_counter)
+            session_adapter_for(selected_runner.session_service).observe(selected_runner.app_name, adk_session_id, event)
+            usage = getattr(event, 'usage_metadata', None)
+            if usage is not None and getattr(usage, 'total_token_count', None) and not getattr(event, 'partial', False):
+                event_counter["tokens"] = event_counter.get("tokens", 0) + usage.total_token_count
+            for item in agent_event_to_stream_items(event):
+                await queue.put(item)
+    except Exception as e:
+        print(f"❌ [stream] 에이전트 실행 오류: {e}")
+        await queue.put(("error", {"message": f"죄송합니다. 요청 처리 중 오류가 발생했습니다: {str(e)}"}))
+    finally:
+        await queue.put(None)
+
+async def prepare_agent_turn(selected_runner, session_id: str):
+    """
+    스트리밍/WebSocket 턴 준비 - 앱 세션 초기화, ADK 세션 조회/생성
+    
+    Returns:
+        ADK 세션 - 세션 생성 실패 시 None
+    """
+    if await conversation_storage.offload(conversation_storage.ensure, session_id):
+        print(f"🆕 새 앱 세션 생성: {session_id}")
+        forget_session_handles(session_id)  # 다른 워커가 세션을 정리했을 수 있음
+    
+    return await resolve_adk_session(selected_runner.session_service, selected_runner.app_name, session_id)
+
+async def build_turn_content(selected_runner, session_id: str, message: str, adk_session):
+    """
+    에이전트 실행용 Content (컨텍스트 메시지 포함)
+    
+    /chat처럼 키워드 라우팅과 AS 상태 기계 확인 뒤에 호출 - 상태 기계가 응답하는 턴은
+    히스토리 조회/컨텍스트 조립을 하지 않습니다.
+    """
+    context_message = await create_context_message(session_id, message, selected_runner, adk_session)
+    
+    from google.genai import types
+    return types.Content(role='user', parts=[types.Part(text=context_message)])
+
+async def run_agent_turn_events(selected_runner, agent_type: str, session_id: str, adk_session_id: str, content, user_message: str, chat_budget: float):
+    """
+    에이전트 한 턴의 진행 이벤트를 (타입, 데이터)로 반환 (/chat/stream, /ws/chat 공용)
+    
+    - 생산자 태스크는 deadline_scope 안에서 만들어 MCP 호출까지 시간 예산 전파
+    - 예산 초과 시 생산자를 취소하고 부분 답변으로 done 반환
+    - 소비 측이 중간에 멈추면(연결 끊김) 생산자 취소, 히스토리 저장 안 함
+    """
+    from interior_agent.tools.deadline import deadline_scope
+    deadline_at = time.monotonic() + chat_budget
+    queue: asyncio.Queue = asyncio.Queue()
+    event_counter = {"count": 0, "tokens": 0, "started": time.monotonic()}
+    
+    with deadline_scope(chat_budget):
+        producer = asyncio.create_task(produce_agent_events(
+            selected_runner, session_id, adk_session_id, content, queue, event_counter
+        ))
+    
+    outcome = "disconnected"
+    final_text = None
+    partial_text = ""
+    error_text = None
+    try:
+        yield "session", {"session_id": session_id, "agent_type": agent_type}
+        
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                outcome = "timeout"
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                break
+            if item is None:
+                outcome = "done"
+                break
+            event_type, data = item
+            if event_type == "delta":
+                partial_text += data["text"]
+            elif event_type == "message":
+                final_text = data["text"]
+                partial_text = ""
+            elif event_type == "error":
+                error_text = data["message"]
+            yield event_type, data
+        
+        if outcome == "timeout":
+            print(f"⏱️ [stream] 시간 예산 {chat_budget:.1f}초 초과 - 에이전트 실행 취소 ({agent_type})")
+            response_text = build_timeout_response(final_text or partial_text or None)
+        else:
+            response_text = final_text or error_text or "에이전트가 응답을 생성하지 못했습니다."
+        
+        await add_to_history(session_id, "user", user_message)
+        await add_to_history(session_id, "assistant", response_text)
+        print(f"💾 [stream] 대화 히스토리 저장 완료: 세션 {session_id} ({event_counter['count']}개 이벤트)")
+        yield "done", {"response": response_text, "timed_out": outcome == "timeout"}
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+        if outcome == "disconnected":
+            print(f"🔌 [stream] 클라이언트 연결 끊김 - 에이전트 실행 취소 ({agent_type}, 이벤트 {event_counter['count']}개 처리 후)")
+        record_turn_metrics(outcome, event_counter)
+
+async def stream_agent_turn(selected_runner, agent_type: str, session_id: str, adk_session_id: str, content, user_message: str, chat_budget: float):
+    """에이전트 한 턴을 SSE 문자열로 스트리밍"""
+    turn_events = run_agent_turn_events(selected_runner, agent_type, session_id, adk_session_id, content, user_message, chat_budget)
+    try:
+        async for event_type, data in turn_events:
+            yield format_sse(event_type, data)
+    finally:
+        await turn_events.aclose()
+
 # 세션 관리 API
 @app.delete("/sessions/{session_id}")
 async def delete_session(session_id: str):
     """특정 세션 삭제"""
-    if session_id in conversation_storage:
-        del conversation_storage[session_id]
+    if as_workflow is not None:
+        await as_workflow.reset(session_id)
+    if await conversation_storage.offload(conversation_storage.delete, session_id):
         return {"message": f"세션 {session_id} 삭제됨"}
     return {"message": "세션을 찾을 수 없음"}
 
 @app.delete("/sessions")
 async def delete_all_sessions():
     """모든 세션 삭제"""
-    count = len(conversation_storage)
-    conversation_storage.clear()
+    count = await conversation_storage.offload(conversation_storage.clear)
     return {"message": f"총 {count}개 세션 삭제됨"}
 
 @app.get("/sessions")
 async def list_sessions():
     """모든 세션 목록 조회"""
     session_info = {}
-    for session_id, history in conversation_storage.items():
+    sessions = await conversation_storage.offload(lambda: list(conversation_storage.items()))
+    for session_id, history in sessions:
         session_info[session_id] = {
             "message_count": len(history),
             "last_message_time": history[-1]["timestamp"] if history else None,
             "created_time": history[0]["timestamp"] if history else None
         }
-    return {"sessions": session_info, "total_sessions": len(conversation_storage)}
+    return {"sessions": session_info, "total_sessions": len(sessions)}
 
 @app.get("/sessions/{session_id}")
 async def get_session_history(session_id: str):
     """특정 세션의 대화 히스토리 조회"""
-    if session_id not in conversation_storage:
+    history = await conversation_storage.offload(conversation_storage.get, session_id)
+    if history is None:
         raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
     
-    history = conversation_storage[session_id]
     return {
         "session_id": session_id,
         "message_count": len(history),
@@ -740,61 +1439,28 @@ async def get_session_history(session_id: str):
     }
 
 # 대화 히스토리 관리 함수들
-def get_conversation_history(session_id: str) -> list:
-    """세션의 대화 히스토리 조회"""
-    return conversation_storage.get(session_id, [])
+async def get_conversation_history(session_id: str) -> list:
+    """세션의 대화 히스토리 조회 (sqlite/redis는 스레드에서)"""
+    return await conversation_storage.offload(conversation_storage.get, session_id) or []
 
-def add_to_history(session_id: str, role: str, content: str):
-    """대화 히스토리에 메시지 추가"""
-    if session_id not in conversation_storage:
-        conversation_storage[session_id] = []
-    
-    conversation_storage[session_id].append({
-        "role": role,
-        "content": content,
-        "timestamp": time.time()
-    })
-    
-    # 최대 길이 초과시 오래된 기록 삭제
-    if len(conversation_storage[session_id]) > MAX_HISTORY_LENGTH:
-        conversation_storage[session_id] = conversation_storage[session_id][-MAX_HISTORY_LENGTH:]
+async def add_to_history(session_id: str, role: str, content: str):
+    """대화 히스토리에 메시지 추가 (세션당 MAX_HISTORY_LENGTH개, 상한 초과 시 LRU 제거)"""
+    await conversation_storage.offload(conversation_storage.append, session_id, role, content)
 
-def create_context_message(session_id: str, new_message: str) -> str:
-    """이전 대화 히스토리를 포함한 컨텍스트 메시지 생성"""
-    history = get_conversation_history(session_id)
-    
-    if not history:
-        return new_message
-    
-    # 최근 5개 대화만 컨텍스트로 사용
-    recent_history = history[-5:]
-    context_lines = []
-    
-    for msg in recent_history:
-        role_kr = "사용자" if msg["role"] == "user" else "어시스턴트"
-        context_lines.append(f"{role_kr}: {msg['content']}")
-    
-    context = "\n".join(context_lines)
-    
-    return f"""이전 대화:
-{context}
-
-현재 질문: {new_message}
-
-위 대화 맥락을 참고하여 자연스럽게 답변해주세요."""
-
-def cleanup_old_sessions():
-    """오래된 세션 정리 (메모리 관리)"""
-    current_time = time.time()
-    sessions_to_remove = []
-    
-    for session_id, history in conversation_storage.items():
-        if history and current_time - history[-1]["timestamp"] > 3600:  # 1시간 후 삭제
-            sessions_to_remove.append(session_id)
+async def create_context_message(session_id: str, new_message: str, selected_runner=None, adk_session=None) -> str:
+    """
+    이전 대화 히스토리를 포함한 컨텍스트 메시지 생성
     
-    for session_id in sessions_to_remove:
-        del conversation_storage[session_id]
-        print(f"🗑️ 오래된 세션 삭제: {session_id}")
+    ADK 세션 이벤트에 이미 있는 대화는 다시 붙이지 않고, 에이전트(app_name)별 토큰 예산 안에서만 첨부합니다.
+    대화 요약 압축으로 세션 상태에 저장된 요약이 있으면 함께 첨부합니다.
+    """
+    return context_builder.build(
+        await get_conversation_history(session_id),
+        new_message,
+        agent_name=getattr(selected_runner, 'app_name', None),
+        session_events=getattr(adk_session, 'events', None),
+        summary=(getattr(adk_session, 'state', None) or {}).get(SUMMARY_STATE_KEY)
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -818,4 +1484,6 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", 8506))
     print(f"🚀 서버 시작: 포트 {port} ({'Cloud Run' if 'PORT' in os.environ else '로컬'})")
     
-    uvicorn.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
+    # WEB_CONCURRENCY > 1: 워커 여러 개 (세션은 SESSION_BACKEND 저장소로 공유)
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run("simple_api_server:app" if workers > 1 else app, host="0.0.0.0", port=port, workers=workers) 
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""pytest 공통 설정 - 저장소 루트를 import 경로에 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+class FakeRedis:
+    """RedisSessionStore가 쓰는 명령만 구현한 메모리 대역 (redis 서버 없이 저장소 로직 검증)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def zadd(self, key, mapping):
+        zset = self.data.setdefault(key, {})
+        added = sum(1 for member in mapping if member not in zset)
+        zset.update(mapping)
+        return added
+
+    def zscore(self, key, member):
+        return self.data.get(key, {}).get(member)
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def _sorted(self, key):
+        return [member for member, _ in sorted(self.data.get(key, {}).items(), key=lambda item: item[1])]
+
+    def zrange(self, key, start, end):
+        members = self._sorted(key)
+        return members[start:] if end == -1 else members[start:end + 1]
+
+    def zrangebyscore(self, key, low, high):
+        return [member for member in self._sorted(key) if self.data[key][member] <= float(high)]
+
+    def zrem(self, key, member):
+        return 1 if self.data.get(key, {}).pop(member, None) is not None else 0
+
+    def rpush(self, key, value):
+        self.data.setdefault(key, []).append(value)
+
+    def ltrim(self, key, start, end):
+        values = self.data.get(key, [])
+        self.data[key] = values[start:] if end == -1 else values[start:end + 1]
+
+    def lrange(self, key, start, end):
+        values = self.data.get(key, [])
+        return values[start:] if end == -1 else values[start:end + 1]
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def hget(self, key, field):
+        value = self.data.get(key, {}).get(field)
+        return None if value is None else str(value)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = str(value)
+
+    def hdel(self, key, field):
+        self.data.get(key, {}).pop(field, None)
+
+    def hkeys(self, key):
+        return list(self.data.get(key, {}))
+
+    def get(self, key):
+        value = self.data.get(key)
+        return None if value is None else str(value)
+
+    def incrby(self, key, amount):
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+
+def make_store(backend: str, tmp_path, **limits):
+    from interior_agent.sessions import ConversationStore, RedisSessionStore, SQLiteSessionStore
+    if backend == "memory":
+        return ConversationStore(**limits)
+    if backend == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), **limits)
+    return RedisSessionStore(FakeRedis(), **limits)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request):
+    return request.param
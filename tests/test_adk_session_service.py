@@ -0,0 +1,114 @@
+"""🧩 StoreSessionService - 메모리 / SQLite / Redis 대역 저장소에서 ADK 세션 저장·조회 왕복"""
+
+import asyncio
+
+import pytest
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from conftest import make_store
+from interior_agent.sessions.adk_session_service import StoreSessionService
+
+APP = "estimate_root_agent"
+
+
+def make_event(author: str, text: str, state_delta=None) -> Event:
+    return Event(
+        author=author,
+        invocation_id="inv",
+        content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {})
+    )
+
+
+@pytest.fixture
+def service(backend, tmp_path):
+    return StoreSessionService(make_store(backend, tmp_path))
+
+
+def test_state_prefixes_round_trip(service):
+    async def scenario():
+        session = await service.create_session(
+            app_name=APP, user_id="u1", session_id="u1",
+            state={"k": 1, "app:shared": 2, "user:pref": 3, "temp:scratch": 4}
+        )
+        assert session.state == {"k": 1, "app:shared": 2, "user:pref": 3}
+        await service.append_event(session, make_event("user", "안녕하세요", {"k": 2, "user:pref": 5, "temp:x": 1}))
+        await service.append_event(session, make_event("estimate_agent", "견적 안내입니다."))
+
+        loaded = await service.get_session(app_name=APP, user_id="u1", session_id="u1")
+        assert [event.content.parts[0].text for event in loaded.events] == ["안녕하세요", "견적 안내입니다."]
+        assert loaded.state == {"k": 2, "app:shared": 2, "user:pref": 5}
+        assert await service.get_user_state(app_name=APP, user_id="u1") == {"pref": 5}
+
+        # app: 상태는 같은 앱의 다른 세션에도 보임
+        other = await service.create_session(app_name=APP, user_id="u2", session_id="u2")
+        assert other.state == {"app:shared": 2}
+
+    asyncio.run(scenario())
+
+
+def test_get_session_config_and_missing(service):
+    async def scenario():
+        session = await service.create_session(app_name=APP, user_id="u", session_id="u")
+        for i in range(4):
+            await service.append_event(session, make_event("user" if i % 2 == 0 else "agent", f"t{i}"))
+        recent = await service.get_session(app_name=APP, user_id="u", session_id="u",
+                                           config=GetSessionConfig(num_recent_events=2))
+        assert [event.content.parts[0].text for event in recent.events] == ["t2", "t3"]
+        assert await service.get_session(app_name=APP, user_id="u", session_id="missing") is None
+
+    asyncio.run(scenario())
+
+
+def test_create_existing_session_raises(service):
+    async def scenario():
+        await service.create_session(app_name=APP, user_id="u", session_id="u")
+        with pytest.raises(AlreadyExistsError):
+            await service.create_session(app_name=APP, user_id="u", session_id="u")
+
+    asyncio.run(scenario())
+
+
+def test_list_and_delete(service):
+    async def scenario():
+        for user_id in ("a", "b"):
+            session = await service.create_session(app_name=APP, user_id=user_id, session_id=user_id)
+            await service.append_event(session, make_event("user", "hi"))
+        await service.create_session(app_name="as_root_agent", user_id="a", session_id="a")
+
+        listed = await service.list_sessions(app_name=APP)
+        assert sorted(session.id for session in listed.sessions) == ["a", "b"]
+        assert all(not session.events for session in listed.sessions)
+        assert [s.id for s in (await service.list_sessions(app_name=APP, user_id="b")).sessions] == ["b"]
+        assert service.usage(APP) == {"sessions": 2, "events": 2}
+
+        await service.delete_session(app_name=APP, user_id="a", session_id="a")
+        assert await service.get_session(app_name=APP, user_id="a", session_id="a") is None
+        assert await service.get_session(app_name="as_root_agent", user_id="a", session_id="a") is not None
+
+    asyncio.run(scenario())
+
+
+def test_trim_and_compact_cut_at_user_boundary(service):
+    async def scenario():
+        session = await service.create_session(app_name=APP, user_id="u", session_id="u")
+        for author in ("user", "agent", "agent", "user", "agent", "user", "agent"):
+            await service.append_event(session, make_event(author, author))
+        assert service.event_count(APP, "u", "u") == 7
+
+        # 뒤에서 4개를 남기려면 index 3부터지만 사용자 메시지 경계(index 3)에서 자름
+        assert service.trim_events(APP, "u", "u", 4) == 3
+        loaded = await service.get_session(app_name=APP, user_id="u", session_id="u")
+        assert [event.author for event in loaded.events] == ["user", "agent", "user", "agent"]
+
+        assert service.compact_events(APP, "u", "u", 2, {"conversation_summary": "요약"})
+        loaded = await service.get_session(app_name=APP, user_id="u", session_id="u")
+        assert [event.author for event in loaded.events] == ["user", "agent"]
+        assert loaded.state["conversation_summary"] == "요약"
+        assert not service.compact_events(APP, "u", "missing", 1, {})
+
+    asyncio.run(scenario())
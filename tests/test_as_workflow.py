@@ -0,0 +1,121 @@
+"""🔧 AS 접수 - 주소/전화번호/누수 검사기와 세션 저장소 기반 상태 기계"""
+
+import asyncio
+import importlib
+
+import pytest
+
+from conftest import make_store
+from interior_agent.agents.as_workflow import (
+    ADDRESS_REJECT_MESSAGE, ADDRESS_RETRY_PROMPT, ASIntakeWorkflow, ProblemCleaner, detect_leak, parse_address,
+    parse_phone
+)
+
+# interior_agent.agents.as_workflow 이름은 패키지에서 워크플로 인스턴스로 다시 내보내므로 모듈은 따로 가져옴
+as_workflow = importlib.import_module("interior_agent.agents.as_workflow")
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("010-1234-5678", "010-1234-5678"),
+    ("01012345678", "010-1234-5678"),
+    ("제 번호는 010 1234 5678 입니다", "010-1234-5678"),
+    ("+82 10-1234-5678", "010-1234-5678"),
+    ("０１０．１２３４．５６７８", "010-1234-5678"),  # 전각
+    ("(02) 123-4567", "02-123-4567"),
+    ("053-123-4567", "053-123-4567"),
+    ("010-123-4567", None),  # 010은 가운데 4자리
+    ("1234", None),
+    ("010-1234-56789", None),
+])
+def test_parse_phone(text, expected):
+    assert parse_phone(text) == expected
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("대구 달서구 월배로 123", "대구 달서구 월배로 123"),
+    ("  월배아이파크   101동 202호 ", "월배아이파크 101동 202호"),
+    ("서울특별시 강남구", "서울특별시 강남구"),
+    ("모르겠어요", None),
+    ("우리 집", None),
+    ("1234-5678", None),  # 한글 없음
+    ("ㄱㄴㄷㄹ", None),
+    ("안녕하세요 반갑습니다", None),  # 주소 표지 없음
+    ("경기도 성남시", "경기도 성남시"),
+    ("세종특별자치시 한누리대로 2130", "세종특별자치시 한누리대로 2130"),
+    # 행정구역 접미사처럼 보이는 조사/어미
+    ("저도 몰라요", None),
+    ("집으로 와주세요", None),
+    ("아마도 나중에", None),
+    ("그러면 내일 할게요", None),
+    ("학교로 와주세요", None),
+])
+def test_parse_address(text, expected):
+    assert parse_address(text) == expected
+
+
+def test_detect_leak():
+    assert detect_leak("욕실 천장에서 물 이 새요") == "물이새"
+    assert detect_leak("베란다가 젖어 있어요") == "젖어"
+    assert detect_leak("문이 잘 안 닫혀요") is None
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    requests = []
+
+    async def store_as_request(address, phone, problem, session_id):
+        requests.append((address, phone, problem, session_id))
+
+    monkeypatch.setattr(as_workflow, "store_as_request", store_as_request)
+    return requests
+
+
+def make_workflow(backend, tmp_path):
+    workflow = ASIntakeWorkflow(ProblemCleaner("test-model", enabled=False))
+    workflow.use_store(make_store(backend, tmp_path))
+    return workflow
+
+
+def test_intake_completes_across_workers(backend, tmp_path, saved):
+    async def scenario():
+        worker_a = make_workflow(backend, tmp_path)
+        await worker_a.start("s1")
+        await worker_a.handle("s1", "월배아이파크 101동 202호")
+        # 공유 저장소면 다음 턴이 다른 워커로 가도 이어서 진행 (메모리 저장소는 같은 워커에서 확인)
+        worker_b = worker_a
+        if worker_a.store is not None:
+            worker_b = ASIntakeWorkflow(worker_a.cleaner)
+            worker_b.use_store(worker_a.store)
+        assert await worker_b.is_active("s1")
+        await worker_b.handle("s1", "010-1234-5678")
+        reply = await worker_b.handle("s1", "화장실 천장에서 물이 새요")
+        assert reply.startswith(as_workflow.EMERGENCY_MESSAGE)
+        assert not await worker_b.is_active("s1")
+
+    asyncio.run(scenario())
+    assert saved == [("월배아이파크 101동 202호", "010-1234-5678", "화장실 천장에서 물이 새요", "s1")]
+
+
+def test_second_invalid_address_rejects(backend, tmp_path, saved):
+    async def scenario():
+        workflow = make_workflow(backend, tmp_path)
+        await workflow.start("s1")
+        assert await workflow.handle("s1", "몰라요") == ADDRESS_RETRY_PROMPT
+        assert await workflow.handle("s1", "나중에") == ADDRESS_REJECT_MESSAGE
+        assert not await workflow.is_active("s1")
+        assert workflow.counters["rejected"] == 1
+
+    asyncio.run(scenario())
+    assert saved == []
+
+
+def test_stale_intake_expires(tmp_path, saved):
+    async def scenario():
+        workflow = make_workflow("sqlite", tmp_path)
+        workflow.ttl_seconds = 0.0
+        await workflow.start("s1")
+        await asyncio.sleep(0.01)
+        assert not await workflow.is_active("s1")
+        assert workflow.counters["expired"] == 1
+
+    asyncio.run(scenario())
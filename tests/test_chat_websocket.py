@@ -0,0 +1,47 @@
+"""chat WebSocket 수신 루프 - 잘못된 프레임이 연결을 끊지 않는지 확인"""
+
+import json
+
+import pytest
+
+fastapi_testclient = pytest.importorskip("fastapi.testclient")
+
+
+@pytest.fixture(scope="module")
+def client():
+    import simple_api_server
+
+    return fastapi_testclient.TestClient(simple_api_server.app)
+
+
+@pytest.mark.parametrize("frame", ["[]", '"hi"', "1", "null", "not json",
+                                   '{"type": "chat", "message": ["x"]}',
+                                   '{"type": "chat", "message": "hi", "session_id": ["x"]}'])
+def test_invalid_frame_keeps_connection_open(client, frame):
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_text(frame)
+        assert json.loads(ws.receive_text())["type"] == "error"
+        ws.send_text(json.dumps({"type": "ping"}))
+        assert json.loads(ws.receive_text()) == {"type": "pong"}
+
+
+def test_workflow_turn_skips_context_building(client, monkeypatch):
+    import simple_api_server
+
+    async def workflow_reply(selected_runner, session_id, message, chat_budget):
+        return "주소를 입력해주세요."
+
+    async def no_context(*args, **kwargs):
+        raise AssertionError("상태 기계 턴에서 컨텍스트 메시지를 만들면 안 됨")
+
+    monkeypatch.setattr(simple_api_server, "run_as_workflow_turn", workflow_reply)
+    monkeypatch.setattr(simple_api_server, "create_context_message", no_context)
+
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.send_text(json.dumps({"type": "chat", "session_id": "as-ws-test", "message": "AS 요청", "stream": False}))
+        assert json.loads(ws.receive_text()) == {"type": "done", "response": "주소를 입력해주세요.", "timed_out": False,
+                                                 "session_id": "as-ws-test", "request_id": None}
+
+    response = client.post("/chat/stream", json={"message": "AS 요청", "session_id": "as-stream-test"})
+    assert response.status_code == 200
+    assert "주소를 입력해주세요." in response.text
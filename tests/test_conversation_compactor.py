@@ -0,0 +1,106 @@
+"""🗜️ 대화 요약 압축 - 추출 요약, 사용자 턴 경계 압축, 캐시 핸들 반영, LLM 요약 교체"""
+
+import asyncio
+
+import pytest
+from google.adk.events.event import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from conftest import make_store
+from interior_agent.sessions.adk_session_service import StoreSessionService
+from interior_agent.sessions.conversation_compactor import (
+    SUMMARY_STATE_KEY, ConversationCompactor, ExtractiveSummarizer
+)
+
+APP = "estimate_root_agent"
+
+
+def make_event(author: str, text: str) -> Event:
+    return Event(author=author, invocation_id="inv",
+                 content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]))
+
+
+async def fill(service, turns: int, start: int = 0):
+    session = await service.get_session(app_name=APP, user_id="u", session_id="u")
+    if session is None:
+        session = await service.create_session(app_name=APP, user_id="u", session_id="u")
+    for i in range(start, start + turns):
+        await service.append_event(session, make_event("user", f"질문 {i}"))
+        await service.append_event(session, make_event("estimate_agent", f"답변 {i}. 부가 설명입니다. 금액은 {i}00만원입니다."))
+
+
+def test_extractive_summary_keeps_first_and_numeric_sentences():
+    summarizer = ExtractiveSummarizer()
+    events = [make_event("user", "32평 욕실 견적 알려주세요"),
+              make_event("estimate_agent", "욕실 리모델링 견적입니다. 자재는 다양합니다. 총 450만원입니다.")]
+    assert summarizer.summarize("- 이전 요약", events) == (
+        "- 이전 요약\n- 사용자: 32평 욕실 견적 알려주세요 → 답변: 욕실 리모델링 견적입니다. 총 450만원입니다."
+    )
+
+
+def test_summary_drops_oldest_lines_over_limit():
+    summarizer = ExtractiveSummarizer(max_chars=40)
+    events = [make_event("user", f"질문 번호 {i}") for i in range(5)]
+    summary = summarizer.summarize("", events)
+    assert summary.splitlines() == ["- 사용자: 질문 번호 3", "- 사용자: 질문 번호 4"]
+
+
+@pytest.fixture(params=["in_memory", "memory", "sqlite", "redis"])
+def service(request, tmp_path):
+    if request.param == "in_memory":
+        return InMemorySessionService()
+    return StoreSessionService(make_store(request.param, tmp_path))
+
+
+def test_compacts_old_turns_once_per_batch(service):
+    compactor = ConversationCompactor(keep_turns=2, batch_turns=2)
+
+    async def scenario():
+        await fill(service, 4)
+        assert await compactor.compact(service, APP, "u", "u") == 0  # keep + batch 이하
+        await fill(service, 1, start=4)
+        handle = await service.get_session(app_name=APP, user_id="u", session_id="u")
+        assert await compactor.compact(service, APP, "u", "u", handle) == 6  # 앞 3턴(6개 이벤트)
+
+        stored = await service.get_session(app_name=APP, user_id="u", session_id="u")
+        assert [event.content.parts[0].text for event in stored.events if event.author == "user"] == ["질문 3", "질문 4"]
+        summary = stored.state[SUMMARY_STATE_KEY]
+        assert summary.splitlines()[0] == "- 사용자: 질문 0 → 답변: 답변 0. 금액은 000만원입니다."
+        # 캐시된 핸들에도 같은 삭제/요약 반영
+        assert [event.id for event in handle.events] == [event.id for event in stored.events]
+        assert handle.state[SUMMARY_STATE_KEY] == summary
+        # 바로 다음 턴에는 다시 압축하지 않음
+        assert await compactor.compact(service, APP, "u", "u") == 0
+
+    asyncio.run(scenario())
+    assert compactor.counters["compactions"] == 1
+
+
+class FakeLLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    async def summarize(self, previous, transcript):
+        self.calls += 1
+        assert "사용자: 질문 0" in transcript
+        return self.reply
+
+    def stats(self):
+        return {"calls": self.calls}
+
+
+def test_llm_summary_replaces_extractive_summary(tmp_path):
+    service = StoreSessionService(make_store("sqlite", tmp_path))
+    compactor = ConversationCompactor(keep_turns=1, batch_turns=1, llm=FakeLLM("- 32평 욕실, 예산 450만원"))
+
+    async def scenario():
+        await fill(service, 3)
+        assert await compactor.compact(service, APP, "u", "u") > 0
+        await compactor.close()
+        stored = await service.get_session(app_name=APP, user_id="u", session_id="u")
+        return stored.state[SUMMARY_STATE_KEY]
+
+    assert asyncio.run(scenario()) == "- 32평 욕실, 예산 450만원"
+    assert compactor.counters["llm_applied"] == 1
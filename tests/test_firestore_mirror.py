@@ -0,0 +1,81 @@
+"""🪞 FirestoreMirror - 페이지 갱신(해시 비교, 삭제), 스레드 실행, write-through"""
+
+import asyncio
+import sqlite3
+import threading
+
+from interior_agent.tools.firestore_mirror import FirestoreMirror
+
+
+class FakeClient:
+    """firestore_query_collection_group만 흉내내는 MCP 클라이언트"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.listeners = []
+
+    def add_write_listener(self, listener):
+        self.listeners.append(listener)
+
+    async def call_tool(self, tool_name, params):
+        start = int(params.get("pageToken") or 0)
+        page = self.documents[start:start + params["limit"]]
+        next_token = str(start + len(page)) if start + len(page) < len(self.documents) else None
+        return {"result": {"documents": page, "nextPageToken": next_token}}
+
+
+def make_mirror(documents, tmp_path, **kwargs) -> FirestoreMirror:
+    return FirestoreMirror(FakeClient(documents), collections=("addressesJson",),
+                           db_path=str(tmp_path / "mirror.db"), page_size=2, **kwargs)
+
+
+def doc(doc_id, address):
+    return {"id": doc_id, "data": {"address": address}}
+
+
+def test_refresh_writes_only_changed_documents_and_drops_missing(tmp_path):
+    documents = [doc("a", "대구 달서구"), doc("b", "부산 해운대구"), doc("c", "서울 강남구")]
+    mirror = make_mirror(documents, tmp_path)
+
+    asyncio.run(mirror.refresh("addressesJson"))
+    assert mirror.changed_documents == 3
+    assert mirror.get_document("addressesJson", "c")["data"]["address"] == "서울 강남구"
+
+    mirror.client.documents = [doc("a", "대구 달서구"), doc("b", "부산 수영구")]
+    asyncio.run(mirror.refresh("addressesJson"))
+    assert mirror.changed_documents == 4  # b만 다시 씀
+    assert mirror.deleted_documents == 1
+    assert mirror.get_document("addressesJson", "b")["data"]["address"] == "부산 수영구"
+    assert mirror.get_document("addressesJson", "c") is None
+    assert mirror.match_documents("addressesJson", "수영구", 10)[0]["id"] == "b"
+
+
+def test_refresh_runs_sqlite_work_off_the_event_loop(tmp_path):
+    mirror = make_mirror([doc("a", "대구 달서구")], tmp_path)
+    threads = set()
+    apply_page = mirror._apply_page
+
+    def recording_apply_page(*args):
+        threads.add(threading.get_ident())
+        return apply_page(*args)
+
+    mirror._apply_page = recording_apply_page
+    asyncio.run(mirror.refresh("addressesJson"))
+    assert threads and threading.get_ident() not in threads
+
+
+def test_mirror_file_without_hash_column_is_migrated(tmp_path):
+    path = tmp_path / "mirror.db"
+    db = sqlite3.connect(str(path))
+    db.execute(
+        "CREATE TABLE documents (rowid INTEGER PRIMARY KEY, collection TEXT NOT NULL, id TEXT NOT NULL, "
+        "doc TEXT NOT NULL, synced_at REAL NOT NULL, UNIQUE (collection, id))"
+    )
+    db.execute("INSERT INTO documents (collection, id, doc, synced_at) VALUES ('addressesJson', 'a', '{}', 0)")
+    db.commit()
+    db.close()
+
+    mirror = make_mirror([doc("a", "대구 달서구")], tmp_path)
+    asyncio.run(mirror.refresh("addressesJson"))
+    assert mirror.changed_documents == 1  # 해시 없는 기존 행은 한 번 다시 씀
+    assert mirror.get_document("addressesJson", "a")["data"]["address"] == "대구 달서구"
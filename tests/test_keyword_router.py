@@ -0,0 +1,58 @@
+"""🚦 키워드 사전 라우터 - Aho-Corasick 일치, 정규화, 단어 경계, 라우팅 결정"""
+
+import pytest
+
+from interior_agent.tools.keyword_router import AhoCorasick, KeywordRouter, normalize_for_routing
+
+ROUTES = {
+    "firebase_agent": ["조회", "주소", "test"],
+    "email_agent": ["이메일", "메일 발송"],
+    "as_agent": ["A/S 요청", "하자"],
+}
+
+
+@pytest.fixture
+def router():
+    return KeywordRouter(ROUTES, sticky_agents=["as_agent"])
+
+
+def test_aho_corasick_finds_overlapping_and_suffix_patterns():
+    matcher = AhoCorasick({"he": 1, "she": 2, "hers": 3, "his": 4})
+    found = sorted((start, pattern) for start, _, pattern, _ in matcher.find_all("ushers"))
+    assert found == [(1, "she"), (2, "he"), (2, "hers")]
+    assert list(AhoCorasick({}).find_all("abc")) == []
+
+
+def test_normalize_for_routing():
+    assert normalize_for_routing("  A/S   요청!! ") == "as 요청"
+
+
+def test_single_target_routes_directly(router):
+    decision = router.route("월배아이파크 주소 좀 조회해줘")
+    assert (decision.target, decision.reason) == ("firebase_agent", "keyword")
+    assert decision.matches == {"firebase_agent": ["주소", "조회"]}
+
+
+def test_spaced_keyword_matches_joined_form(router):
+    assert router.route("AS요청 드립니다").target == "as_agent"
+    assert router.route("견적서 메일발송 부탁").target == "email_agent"
+
+
+def test_ascii_keywords_respect_word_boundaries(router):
+    assert router.route("latest 버전").reason == "no_match"
+    assert router.route("test 해줘").target == "firebase_agent"
+
+
+def test_ambiguous_sticky_and_stats(router):
+    assert router.route("조회 결과를 이메일로 보내줘").reason == "ambiguous"
+    assert router.route("조회", last_agent="as_agent").reason == "sticky"
+    router.record_llm_routing(800)
+    router.record_direct_dispatch()
+    stats = router.stats()
+    assert stats["decisions"] == {"ambiguous": 1, "sticky": 1}
+    assert stats["estimated_saved_ms"] == 800.0
+
+
+def test_duplicate_keyword_across_agents_is_rejected():
+    with pytest.raises(ValueError):
+        KeywordRouter({"a": ["조회"], "b": ["조 회"]})
@@ -0,0 +1,56 @@
+"""🔤 한글 검색 키 - 자모 분해, 초성, 제한 편집 거리, 색인의 초성/오타 검색"""
+
+import pytest
+
+from interior_agent.tools.korean_text import (
+    choseong, decompose_jamo, fuzzy_substring_distance, is_choseong_query, max_typo_distance, normalize_text
+)
+from interior_agent.tools.search_index import CollectionIndex
+
+
+def test_jamo_and_choseong_keys():
+    assert decompose_jamo("월배") == "ㅇㅜㅓㄹㅂㅐ"  # 겹모음 ㅝ → ㅜㅓ
+    assert decompose_jamo("닭a1") == "ㄷㅏㄹㄱa1"  # 겹받침 ㄺ → ㄹㄱ
+    assert choseong("월배아이파크101") == "ㅇㅂㅇㅇㅍㅋ101"
+    assert normalize_text("ᄋ") == "ㅇ"  # 첫가끝 자모 → 호환 자모
+
+
+def test_choseong_query_detection():
+    assert is_choseong_query("ㅇㅂㅇㅇㅍㅋ")
+    assert is_choseong_query("ㅇㅂ101")
+    assert not is_choseong_query("월배")
+    assert not is_choseong_query("ㅇㅏ")
+    assert not is_choseong_query("101")
+
+
+@pytest.mark.parametrize("pattern,text,max_distance,expected", [
+    ("abc", "xxabcxx", 1, 0),
+    ("abc", "xxabxx", 1, 1),
+    ("abcd", "xaxcxx", 1, 2),  # 한도 초과 → max_distance + 1
+    ("ab", "", 2, 2),  # 빈 텍스트 = 전부 삭제
+    ("abc", "", 2, 3),
+    ("", "abc", 1, 0),
+])
+def test_fuzzy_substring_distance(pattern, text, max_distance, expected):
+    assert fuzzy_substring_distance(pattern, text, max_distance) == expected
+
+
+def test_typo_budget_grows_with_query_length():
+    assert [max_typo_distance(n) for n in (5, 6, 11, 12)] == [0, 1, 1, 2]
+
+
+def test_index_choseong_and_typo_search():
+    index = CollectionIndex("addressesJson")
+    index.add({"id": "d1", "data": {"name": "월배아이파크"}})
+    index.add({"id": "d2", "data": {"name": "범어자이"}})
+
+    [hit], _ = index.search("ㅇㅂㅇㅇㅍㅋ")
+    assert hit.doc["id"] == "d1" and hit.matches[0][2] == "choseong"
+
+    [hit], _ = index.search("월베아이파크")  # ㅐ → ㅔ 오타 1회
+    assert hit.doc["id"] == "d1"
+    match = hit.explanation()["matches"][0]
+    assert (match["field"], match["match"], match["distance"]) == ("name", "fuzzy", 1)
+
+    assert index.search("범어")[0][0].matches[0][2] != "fuzzy"  # 정확 일치가 있으면 오타 검색 안 함
+    assert index.search("01012345678")[0] == []  # 숫자 질의는 오타 허용 안 함
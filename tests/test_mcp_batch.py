@@ -0,0 +1,92 @@
+"""📦 call_tools_batch - 배치 응답 상태별 서킷 브레이커 기록 / 배치 비활성화 판단"""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from interior_agent.tools.mcp_client import MCPClient
+from interior_agent.tools.resilience import CircuitBreaker, RetryPolicy
+
+CALLS = [{"name": "firestore_get_document", "arguments": {"path": f"addressesJson/{i}"}} for i in range(2)]
+
+
+def make_app(batch_status: int, session_header: bool = True) -> web.Application:
+    """initialize / 개별 tools/call은 정상 응답, 배치(JSON 배열) 요청은 batch_status로 응답하는 MCP 대역"""
+    async def mcp(request):
+        body = await request.json()
+        if isinstance(body, list):
+            if batch_status != 200:
+                return web.Response(status=batch_status, text="rejected")
+            return web.json_response([])  # 응답 없는 배치
+        headers = {"mcp-session-id": "srv-1"} if session_header else {}
+        if body.get("method") == "initialize":
+            return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": {}}, headers=headers)
+        if "id" not in body:
+            return web.Response(status=202)
+        result = {"jsonrpc": "2.0", "id": body["id"], "result": {"ok": body["params"]["arguments"]["path"]}}
+        return web.Response(text=f"event: message\ndata: {json.dumps(result)}\n\n", content_type="text/event-stream")
+
+    app = web.Application()
+    app.router.add_post("/mcp", mcp)
+    return app
+
+
+def run_batch(app: web.Application, breaker: CircuitBreaker, warm: bool = False):
+    async def scenario():
+        async with TestServer(app) as server:
+            client = MCPClient(str(server.make_url("/mcp")), retry_policy=RetryPolicy(max_attempts=1),
+                               circuit_breaker=breaker, singleflight=False, cache=None)
+            try:
+                if warm:  # 이미 초기화된 MCP 세션에서 배치 호출
+                    await client.call_tools_batch(CALLS[:1], "s1")
+                results = await client.call_tools_batch(CALLS, "s1")
+            finally:
+                await client.close()
+            return client, results
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("status", [502, 503])
+def test_transient_batch_error_counts_as_failure_and_keeps_batching(status):
+    breaker = CircuitBreaker("test", failure_threshold=5, recovery_timeout=60)
+    client, results = run_batch(make_app(status), breaker)
+    assert client.batch_supported  # 일시 오류로 배치를 영구히 끄지 않음
+    assert [result["ok"] for result in results] == ["addressesJson/0", "addressesJson/1"]
+    # 배치 실패 1회 기록 후 개별 호출 성공으로 복구
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_transient_batch_error_opens_breaker_at_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+    client, results = run_batch(make_app(503), breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert client.batch_supported
+    assert all("error" in result for result in results)
+
+
+@pytest.mark.parametrize("status", [400, 405])
+def test_definitive_rejection_disables_batching(status):
+    client, results = run_batch(make_app(status), CircuitBreaker("test"))
+    assert not client.batch_supported
+    assert [result["ok"] for result in results] == ["addressesJson/0", "addressesJson/1"]
+
+
+def test_empty_batch_reply_disables_batching():
+    client, results = run_batch(make_app(200), CircuitBreaker("test"))
+    assert not client.batch_supported
+    assert [result["ok"] for result in results] == ["addressesJson/0", "addressesJson/1"]
+
+
+def test_not_found_on_fresh_session_disables_batching():
+    client, _ = run_batch(make_app(404), CircuitBreaker("test"))
+    assert not client.batch_supported
+
+
+def test_not_found_on_existing_session_is_session_expiry():
+    client, results = run_batch(make_app(404), CircuitBreaker("test"), warm=True)
+    assert client.batch_supported
+    assert [result["ok"] for result in results] == ["addressesJson/0", "addressesJson/1"]
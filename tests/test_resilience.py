@@ -0,0 +1,102 @@
+"""🛡️ 서킷 브레이커 - half-open 시험 호출이 취소/시간 초과돼도 시험 슬롯이 반환되는지"""
+
+import asyncio
+import time
+
+import pytest
+
+from interior_agent.tools.mcp_client import MCPClient
+from interior_agent.tools.resilience import CircuitBreaker, RetryPolicy
+
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.0)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 1
+    return breaker
+
+
+def make_client(breaker: CircuitBreaker) -> MCPClient:
+    return MCPClient("http://mcp.invalid/mcp", retry_policy=RetryPolicy(max_attempts=1),
+                     circuit_breaker=breaker, singleflight=False)
+
+
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request()  # recovery_timeout 경과 → half-open 시험 호출
+    assert breaker.holds_trial()
+    assert not breaker.allow_request()  # 시험 호출은 1건만
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_call_releases_slot():
+    breaker = half_open_breaker()
+    client = make_client(breaker)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(3600)
+
+    client._call_tool_once = hang
+
+    async def scenario():
+        task = asyncio.ensure_future(client._call_with_retry("firestore_get_document", {}))
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.holds_trial()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert not breaker.holds_trial()
+    assert breaker.allow_request()  # 다음 호출이 다시 시험 호출로 통과
+
+
+def test_deadline_exceeded_trial_releases_slot():
+    breaker = half_open_breaker()
+    client = make_client(breaker)
+
+    async def deadline(*args, **kwargs):
+        return client._deadline_error_event()
+
+    client._call_tool_once = deadline
+    result = asyncio.run(client._call_with_retry("firestore_get_document", {}))
+    assert result.get("deadline_exceeded")
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_closed_stream_before_final_event_releases_slot():
+    breaker = half_open_breaker()
+    client = make_client(breaker)
+
+    async def notifications(*args, **kwargs):
+        yield {"type": "notification", "method": "progress", "params": {}}
+        await asyncio.sleep(3600)
+
+    client._stream_once = notifications
+
+    async def scenario():
+        stream = client.call_tool_stream("firestore_get_document", {})
+        first = await stream.__anext__()
+        assert first["type"] == "notification"
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    assert breaker.allow_request()
+
+
+def test_transient_failure_reopens_half_open_breaker():
+    breaker = half_open_breaker()
+    client = make_client(breaker)
+
+    async def transient(*args, **kwargs):
+        return {"type": "error", "error": "HTTP 503", "transient": True}
+
+    client._call_tool_once = transient
+    asyncio.run(client._call_with_retry("firestore_get_document", {}))
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,61 @@
+"""🔎 CollectionIndex - n-gram 역색인 추가/삭제/수정, 정규화, 후보 검증"""
+
+from interior_agent.tools.search_index import CollectionIndex, char_ngrams, flatten_fields
+
+
+def make_index(*docs) -> CollectionIndex:
+    index = CollectionIndex("addressesJson")
+    for doc in docs:
+        index.add(doc)
+    return index
+
+
+def ids(index: CollectionIndex, query: str, k=None):
+    hits, _ = index.search(query, k=k)
+    return [hit.doc["id"] for hit in hits]
+
+
+def test_char_ngrams_and_flatten_fields():
+    assert char_ngrams("월배아이", 2) == {"월배", "배아", "아이"}
+    assert char_ngrams("월", 2) == set()
+    assert flatten_fields({"a": {"b": [1, {"c": "x"}]}, "json": '{"k": "v"}', "empty": ""}) == {
+        "a.b[0]": "1", "a.b[1].c": "x", "json.k": "v"
+    }
+
+
+def test_spacing_and_punctuation_are_ignored():
+    index = make_index({"id": "d1", "data": {"address": "대구 달서구 월배아이파크 101동"}})
+    assert ids(index, "달서구월배") == ["d1"]
+    assert ids(index, "월배 아이파크, 101동") == ["d1"]
+    assert ids(index, "１０１동") == ["d1"]  # 전각 숫자 → NFKC
+
+
+def test_candidates_are_verified_as_substrings():
+    # 질의 3-gram("아이파", "이파크")을 모두 갖지만 "아이파크"는 없는 문서는 후보에서 걸러짐
+    index = make_index(
+        {"id": "d1", "data": {"name": "월배아이파크"}},
+        {"id": "d2", "data": {"name": "아이파 이파크"}},
+    )
+    assert index.candidates("아이파크") == {"d1", "d2"}
+    assert ids(index, "아이파크") == ["d1"]
+
+
+def test_remove_and_update_maintain_postings():
+    index = make_index({"id": "d1", "data": {"name": "월배아이파크", "phone": "010-1234-5678"}},
+                       {"id": "d2", "data": {"name": "범어자이"}})
+    assert ids(index, "01012345678") == ["d1"]
+
+    assert index.update("d1", {"phone": "010-9999-0000"})
+    assert ids(index, "01012345678") == []
+    assert ids(index, "월배아이파크") == ["d1"]  # 수정하지 않은 필드는 유지
+    assert not index.update("missing", {"name": "x"})
+
+    index.remove("d1")
+    assert len(index) == 1 and ids(index, "월배") == []
+    # 삭제된 문서의 포스팅이 남지 않음
+    assert all("d1" not in postings for postings in index._postings.values())
+
+
+def test_document_id_is_searchable():
+    index = make_index({"id": "EST-2024-0001", "data": {"name": "견적"}})
+    assert ids(index, "est20240001") == ["EST-2024-0001"]
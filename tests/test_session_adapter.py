@@ -0,0 +1,67 @@
+"""🔌 SessionServiceAdapter - 저장소를 공유하는 워커 간 세션 핸들 캐시 재검증"""
+
+import asyncio
+
+from google.adk.events.event import Event
+from google.genai import types
+
+from conftest import make_store
+from interior_agent.sessions.adk_session_service import StoreSessionService
+from interior_agent.sessions.session_adapter import SessionServiceAdapter
+
+APP = "estimate_root_agent"
+
+
+def make_event(author: str, text: str) -> Event:
+    return Event(author=author, invocation_id="inv",
+                 content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]))
+
+
+def texts(session):
+    return [event.content.parts[0].text for event in session.events]
+
+
+def test_refetches_after_other_worker_turn(backend, tmp_path):
+    async def scenario():
+        store = make_store(backend, tmp_path)
+        worker_a, worker_b = StoreSessionService(store), StoreSessionService(store)
+        adapter = SessionServiceAdapter(worker_a)
+
+        handle = await adapter.get_or_create(APP, "s")
+        # 이 워커의 턴: Runner가 저장한 이벤트를 observe로 반영 → 다시 조회하지 않음
+        event = await worker_a.append_event(await worker_a.get_session(app_name=APP, user_id="s", session_id="s"),
+                                            make_event("user", "A 워커 질문"))
+        adapter.observe(APP, "s", event)
+        assert await adapter.get_or_create(APP, "s") is handle
+        assert adapter.counters["stale"] == 0
+
+        # 다른 워커의 턴 → 캐시된 핸들은 낡았으므로 다시 조회
+        other = await worker_b.get_session(app_name=APP, user_id="s", session_id="s")
+        await worker_b.append_event(other, make_event("user", "B 워커 질문"))
+        refreshed = await adapter.get_or_create(APP, "s")
+        assert refreshed is not handle
+        assert texts(refreshed) == ["A 워커 질문", "B 워커 질문"]
+        assert adapter.counters["stale"] == 1
+
+        # 다른 워커의 요약 압축도 반영
+        worker_b.compact_events(APP, "s", "s", 1, {"conversation_summary": "요약"})
+        compacted = await adapter.get_or_create(APP, "s")
+        assert texts(compacted) == ["B 워커 질문"]
+        assert compacted.state["conversation_summary"] == "요약"
+
+    asyncio.run(scenario())
+
+
+def test_recreates_session_deleted_elsewhere(backend, tmp_path):
+    async def scenario():
+        store = make_store(backend, tmp_path)
+        worker_a, worker_b = StoreSessionService(store), StoreSessionService(store)
+        adapter = SessionServiceAdapter(worker_a)
+
+        await adapter.get_or_create(APP, "s")
+        await worker_b.delete_session(app_name=APP, user_id="s", session_id="s")
+        await adapter.get_or_create(APP, "s")
+        assert adapter.counters["created"] == 2
+        assert await worker_b.get_session(app_name=APP, user_id="s", session_id="s") is not None
+
+    asyncio.run(scenario())
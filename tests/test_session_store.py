@@ -0,0 +1,146 @@
+"""🗄️ 세션 저장소 (메모리 / SQLite / Redis 대역) - LRU·바이트 상한, TTL 정리, 제거 리스너, 기록/로그"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from conftest import make_store
+from interior_agent.sessions import SQLiteSessionStore
+from interior_agent.sessions.session_store import SessionStore
+
+
+def test_history_is_capped_per_session(backend, tmp_path):
+    store = make_store(backend, tmp_path, max_history=10)
+    assert store.ensure("a") is True
+    assert store.ensure("a") is False
+    for i in range(15):
+        store.append("a", "user", f"m{i}")
+    history = store.get("a")
+    assert len(history) == 10 and history[0]["content"] == "m5"
+    assert store.get("missing") is None
+
+
+def test_session_cap_evicts_least_recently_active(backend, tmp_path):
+    store = make_store(backend, tmp_path, max_sessions=3, max_bytes=10 ** 9)
+    removed = []
+    store.add_removal_listener(lambda session_id, reason: removed.append((session_id, reason)))
+    for session_id in ("a", "b", "c"):
+        store.ensure(session_id)
+        time.sleep(0.002)
+    store.append("a", "user", "still here")  # a가 가장 최근 활동
+    time.sleep(0.002)
+    store.ensure("d")
+    assert len(store) == 3
+    assert "b" not in store and "a" in store
+    assert removed == [("b", "sessions")]
+    assert store.evictions["sessions"] == 1
+
+
+def test_byte_cap_keeps_current_session(backend, tmp_path):
+    store = make_store(backend, tmp_path, max_sessions=100, max_bytes=1000)
+    store.append("old", "user", "x" * 400)
+    time.sleep(0.002)
+    store.append("new", "user", "y" * 400)
+    assert "old" not in store and "new" in store
+    assert store.usage()["bytes"] <= 1000
+    # 세션 하나가 상한을 넘어도 방금 활동한 세션은 지우지 않음
+    store.append("new", "user", "z" * 2000)
+    assert "new" in store
+
+
+def test_sweep_removes_expired_sessions(backend, tmp_path):
+    store = make_store(backend, tmp_path, ttl_seconds=3600)
+    removed = []
+    store.add_removal_listener(lambda session_id, reason: removed.append((session_id, reason)))
+    store.ensure("a")
+    store.ensure("b")
+    assert store.sweep() == 0
+    store.ttl_seconds = 0.0
+    time.sleep(0.002)
+    assert store.sweep() == 2
+    assert len(store) == 0
+    assert sorted(removed) == [("a", "expired"), ("b", "expired")]
+
+
+def test_delete_and_clear_notify_listeners(backend, tmp_path):
+    store = make_store(backend, tmp_path)
+    removed = []
+    store.add_removal_listener(lambda session_id, reason: removed.append((session_id, reason)))
+    for session_id in ("a", "b", "c"):
+        store.ensure(session_id)
+    assert store.delete("a") is True
+    assert store.delete("a") is False
+    assert store.clear() == 2
+    assert removed[0] == ("a", "deleted")
+    assert sorted(removed[1:]) == [("b", "cleared"), ("c", "cleared")]
+
+
+def test_records_and_logs(backend, tmp_path):
+    store = make_store(backend, tmp_path)
+    store.put_record("ns", '["x", "u", "1"]', "v1")
+    store.put_record("ns", '["x", "u", "2"]', "v2")
+    store.put_record("ns", '["y", "u", "1"]', "v3")
+    store.put_record("ns", '["x", "u", "1"]', "v1b")
+    assert store.get_record("ns", '["x", "u", "1"]') == "v1b"
+    assert sorted(store.list_record_keys("ns", '["x", ')) == ['["x", "u", "1"]', '["x", "u", "2"]']
+    store.delete_record("ns", '["x", "u", "2"]')
+    assert store.get_record("ns", '["x", "u", "2"]') is None
+
+    for i in range(5):
+        store.append_log("log", "k", str(i))
+    store.drop_log_head("log", "k", 2)
+    assert store.read_log("log", "k") == ["2", "3", "4"]
+    assert store.log_length("log", "k") == 3
+    store.delete_log("log", "k")
+    assert store.log_length("log", "k") == 0
+
+
+def test_offloaded_removal_notifies_on_event_loop_thread(backend, tmp_path):
+    store = make_store(backend, tmp_path, max_sessions=1, max_bytes=10 ** 9)
+    threads = []
+    store.add_removal_listener(lambda session_id, reason: threads.append(threading.get_ident()))
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        await store.offload(store.ensure, "a")
+        await store.offload(store.ensure, "b")
+        await asyncio.sleep(0.01)  # call_soon_threadsafe로 예약된 리스너 실행
+        return loop_thread
+
+    loop_thread = asyncio.run(scenario())
+    assert threads == [loop_thread]
+
+
+def test_sqlite_totals_match_table(tmp_path):
+    path = str(tmp_path / "totals.sqlite3")
+    store = SQLiteSessionStore(path, max_sessions=3, max_bytes=10 ** 9)
+    for i in range(6):
+        store.ensure(f"s{i}")
+        store.append(f"s{i}", "user", "x" * (50 * i))
+    store.append("s5", "assistant", "y" * 10)
+    store.delete("s4")
+
+    db = sqlite3.connect(path)
+    count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM conversations").fetchone()
+    assert store.usage()["sessions"] == count == 2
+    assert store.usage()["bytes"] == total
+
+    # 다른 워커가 같은 파일을 열어도 같은 집계
+    other = SQLiteSessionStore(path)
+    assert other.usage()["sessions"] == count and other.usage()["bytes"] == total
+    other.clear()
+    assert store.usage() == {"sessions": 0, "bytes": 0, "db_path": path}
+
+
+def test_incomplete_backend_fails_at_construction():
+    class PartialStore(SessionStore):
+        backend = "partial"
+
+        def get_record(self, namespace, key):
+            return None
+
+    with pytest.raises(TypeError, match="abstract"):
+        PartialStore()
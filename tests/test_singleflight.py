@@ -0,0 +1,65 @@
+"""🛬 SingleFlight - 호출 합치기 / 대기자별 시간 예산"""
+
+import asyncio
+
+from interior_agent.tools.deadline import DeadlineExceeded, deadline_scope, remaining_time
+from interior_agent.tools.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_flight():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"documents": [1]}
+
+    async def scenario():
+        return await asyncio.gather(*[flight.do("k", fetch) for _ in range(3)])
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [{"documents": [1]}] * 3
+    assert results[1] is not results[0]  # follower는 복사본
+    assert flight.stats()["coalesced_calls"] == 2 and flight.stats()["inflight"] == 0
+
+
+def test_shared_call_does_not_inherit_leader_deadline():
+    flight = SingleFlight(max_seconds=5.0)
+    budgets = []
+
+    async def fetch():
+        budgets.append(remaining_time())
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    async def leader():
+        with deadline_scope(0.02):
+            return await flight.do("k", fetch)
+
+    async def follower():
+        await asyncio.sleep(0)
+        with deadline_scope(2.0):
+            return await flight.do("k", fetch)
+
+    async def scenario():
+        return await asyncio.gather(leader(), follower(), return_exceptions=True)
+
+    leader_result, follower_result = asyncio.run(scenario())
+    assert isinstance(leader_result, DeadlineExceeded)  # leader만 자기 예산으로 종료
+    assert follower_result == "ok"  # 공유 호출은 계속 진행
+    assert budgets and 4.0 < budgets[0] <= 5.0  # leader의 0.02초가 아닌 자체 상한
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("down")
+
+    async def scenario():
+        return await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in asyncio.run(scenario()))
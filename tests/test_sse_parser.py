@@ -0,0 +1,66 @@
+"""📡 증분 SSE / JSON-RPC 파서 - 청크 경계, CRLF, 주석, 여러 줄 data, application/json 응답"""
+
+import asyncio
+import json
+
+from interior_agent.tools.sse_parser import SSEParser, iter_jsonrpc_messages
+
+
+class FakeContent:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def iter_any(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class FakeResponse:
+    def __init__(self, content_type: str, chunks):
+        self.headers = {"Content-Type": content_type}
+        self.content = FakeContent(chunks)
+
+    async def read(self):
+        return b"".join(self.content.chunks)
+
+
+def collect(response, raw_sink=None):
+    async def scenario():
+        return [message async for message in iter_jsonrpc_messages(response, raw_sink)]
+
+    return asyncio.run(scenario())
+
+
+def test_events_split_across_chunks_and_crlf():
+    stream = "event: message\r\ndata: {\"id\": 1}\r\n\r\n: keepalive\n\ndata: 두 번째\ndata: 줄\nid: 7\n\n".encode()
+    parser = SSEParser()
+    events = []
+    for i in range(0, len(stream), 5):  # 한글 바이트 중간에서도 잘림
+        events.extend(parser.feed(stream[i:i + 5]))
+    assert [(event.event, event.data, event.id) for event in events] == [
+        ("message", '{"id": 1}', None),
+        ("message", "두 번째\n줄", "7"),
+    ]
+
+
+def test_flush_emits_event_without_trailing_blank_line():
+    parser = SSEParser()
+    assert parser.feed(b"event: result\ndata: tail") == []
+    [event] = parser.flush()
+    assert (event.event, event.data) == ("result", "tail")
+    assert parser.flush() == []
+
+
+def test_jsonrpc_messages_from_event_stream():
+    messages = [{"jsonrpc": "2.0", "method": "notifications/progress"}, {"jsonrpc": "2.0", "id": 2, "result": {}}]
+    chunks = [f"data: {json.dumps(message)}\n\n".encode() for message in messages] + [b"data: not json\n\n"]
+    raw = []
+    assert collect(FakeResponse("text/event-stream", chunks), raw) == messages
+    assert raw == ["not json"]
+
+
+def test_jsonrpc_batch_array_from_json_body():
+    body = json.dumps([{"id": 2, "result": 1}, "skip", {"id": 3, "result": 2}]).encode()
+    response = FakeResponse("application/json", [body[:10], body[10:]])
+    assert collect(response) == [{"id": 2, "result": 1}, {"id": 3, "result": 2}]
+    assert collect(FakeResponse("application/json", [b""])) == []
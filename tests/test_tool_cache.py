@@ -0,0 +1,73 @@
+"""🗃️ ToolResultCache - TTL 만료, LRU 제거, 쓰기 도구 무효화, 복사본 반환"""
+
+import pytest
+
+from interior_agent.tools import tool_cache
+from interior_agent.tools.tool_cache import ToolResultCache
+
+GET = "firestore_get_document"
+LIST = "firestore_list_documents"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(tool_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl_expiry(clock):
+    cache = ToolResultCache(ttl_seconds=10)
+    cache.put(GET, {"path": "addressesJson/a"}, {"name": "월배아이파크"})
+    clock[0] += 9.9
+    assert cache.get(GET, {"path": "addressesJson/a"}) == {"name": "월배아이파크"}
+    clock[0] += 0.1
+    assert cache.get(GET, {"path": "addressesJson/a"}) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_eviction_keeps_recently_used(clock):
+    cache = ToolResultCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.put(GET, {"path": name}, {"v": name})
+    cache.get(GET, {"path": "a"})
+    cache.put(GET, {"path": "c"}, {"v": "c"})
+    assert cache.get(GET, {"path": "b"}) is None
+    assert cache.get(GET, {"path": "a"}) == {"v": "a"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_argument_order_and_copies(clock):
+    cache = ToolResultCache()
+    result = {"documents": [{"id": 1}]}
+    cache.put(LIST, {"collection": "estimateVersionsV3", "pageSize": 10}, result)
+    result["documents"].clear()
+    cached = cache.get(LIST, {"pageSize": 10, "collection": "estimateVersionsV3"})
+    assert cached == {"documents": [{"id": 1}]}
+    cached["documents"].clear()
+    assert cache.get(LIST, {"collection": "estimateVersionsV3", "pageSize": 10}) == {"documents": [{"id": 1}]}
+
+
+def test_errors_are_not_cached(clock):
+    cache = ToolResultCache()
+    cache.put(GET, {"path": "x"}, {"error": "HTTP 503"})
+    cache.put(GET, {"path": "y"}, {"raw_response": "<html>"})
+    assert cache.stats()["size"] == 0
+
+
+def test_write_invalidates_collection_and_collection_group(clock):
+    cache = ToolResultCache()
+    cache.put(LIST, {"collection": "addressesJson"}, {"documents": []})
+    cache.put("firestore_query_collection_group", {"collectionId": "versions"}, {"documents": []})
+    cache.put("firestore_list_collections", {}, {"collections": ["addressesJson"]})
+    cache.put(LIST, {"collection": "estimateVersionsV3"}, {"documents": []})
+
+    cache.invalidate_for_write("firestore_update_document", {"collection": "addressesJson"})
+    assert cache.get(LIST, {"collection": "addressesJson"}) is None
+    assert cache.get("firestore_list_collections", {}) is not None  # update는 컬렉션 목록을 바꾸지 않음
+
+    # 하위 컬렉션 경로 쓰기 → 같은 이름의 컬렉션 그룹 쿼리 + 컬렉션 목록 무효화
+    cache.invalidate_for_write("firestore_add_document", {"collection": "estimates/e1/versions"})
+    assert cache.get("firestore_query_collection_group", {"collectionId": "versions"}) is None
+    assert cache.get("firestore_list_collections", {}) is None
+    assert cache.get(LIST, {"collection": "estimateVersionsV3"}) is not None